@@ -0,0 +1,155 @@
+"""
+Switching-activity monitor for the Amaranth simulation
+
+ActivityMonitor listens to the same change notifications that
+sim.write_vcd() uses, but instead of formatting and writing every change it
+only counts them. For each signal it records:
+
+- toggles: bits flipped (popcount of old ^ new), summed over the run
+- changes: value changes, including delta-cycle glitches
+
+Memory writes are counted per memory in the same way. Signals are attributed
+to the deepest submodule that names them (top/computer/cpu/alu/...), so
+totals can be rolled up per submodule at any depth, e.g. depth=4 for the ALU,
+control logic, registers and RAM256x16.
+
+This relies on the Python simulation engine's internal observer list
+(Simulator._engine._vcd_writers), which is what write_vcd() registers with.
+"""
+
+from collections import defaultdict
+
+
+class ActivityMonitor:
+    """
+    Opt-in toggle counter for a Simulator
+
+    Usage:
+        with ActivityMonitor(sim) as monitor:
+            sim.run()
+        print(monitor.report(depth=4))
+    """
+
+    # Looked up by the engine on every registered observer
+    fs_per_delta = 0
+
+    def __init__(self, sim):
+        self._sim = sim
+        self._engine = sim._engine
+        self._state = self._engine._state
+        if not hasattr(self._engine, "_vcd_writers"):
+            raise RuntimeError("ActivityMonitor needs the Python simulation engine (amaranth.sim.pysim)")
+
+        # Owner path and name of every named signal, from the deepest fragment
+        self._names = {}
+        self._memory_names = {}
+        for fragment, info in sim._design.fragments.items():
+            path = "/".join(info.name)
+            if hasattr(fragment, "_data"):  # MemoryInstance
+                self._memory_names[id(fragment._data)] = path
+            for signal, name in info.signal_names.items():
+                known = self._names.get(id(signal))
+                if known is None or path.count("/") > known[0].count("/"):
+                    self._names[id(signal)] = (path, name)
+
+        # Format: id(signal) -> [path, name, slot, mask, last value, toggles, changes]
+        self._signals = {}
+        # Format: id(memory) -> [path, {addr: last value}, toggles, writes]
+        self._memories = {}
+
+    def __enter__(self):
+        self.attach()
+        return self
+
+    def __exit__(self, *exc):
+        self.detach()
+
+    def attach(self):
+        """Start counting; the counters keep accumulating across runs."""
+        if self not in self._engine._vcd_writers:
+            self._engine._vcd_writers.append(self)
+
+    def detach(self):
+        if self in self._engine._vcd_writers:
+            self._engine._vcd_writers.remove(self)
+
+    def clear(self):
+        self._signals.clear()
+        self._memories.clear()
+
+    # Observer interface, called by the engine after each delta cycle
+
+    def update_signal(self, timestamp, signal):
+        entry = self._signals.get(id(signal))
+        if entry is None:
+            path, name = self._names.get(id(signal), ("?", signal.name))
+            slot = self._state.slots[self._state.get_signal(signal)]
+            # The first change is counted from the initial value
+            entry = self._signals[id(signal)] = [path, name, slot, (1 << len(signal)) - 1, signal.init, 0, 0]
+        value = entry[2].curr
+        entry[5] += ((entry[4] ^ value) & entry[3]).bit_count()
+        entry[6] += 1
+        entry[4] = value
+
+    def update_memory(self, timestamp, memory, addr):
+        entry = self._memories.get(id(memory))
+        if entry is None:
+            entry = self._memories[id(memory)] = [self._memory_names.get(id(memory), memory.name), {}, 0, 0]
+        value = self._engine.get_value(memory[addr])
+        last = entry[1].get(addr)
+        if last is None:
+            last = memory.init[addr]
+        entry[1][addr] = value
+        entry[2] += (last ^ value).bit_count()
+        entry[3] += 1
+
+    def close(self, timestamp):
+        pass
+
+    # Results
+
+    def get(self, signal):
+        """(toggles, changes) of one signal; (0, 0) if it never changed."""
+        entry = self._signals.get(id(signal))
+        return (0, 0) if entry is None else (entry[5], entry[6])
+
+    def signal_counts(self):
+        """{"path/name": (toggles, changes)} for every signal that changed."""
+        counts = {f"{path}/{name}": (toggles, changes)
+                  for path, name, _, _, _, toggles, changes in self._signals.values()}
+        for path, _, toggles, writes in self._memories.values():
+            counts[f"{path}/[memory]"] = (toggles, writes)
+        return counts
+
+    def module_counts(self, depth=None):
+        """
+        Sum the counters per submodule
+
+        Inputs:
+        - depth: Cut submodule paths to this many levels (None for the full path)
+
+        Returns:
+        - {path: (signals, toggles, changes)}
+        """
+        modules = defaultdict(lambda: [0, 0, 0])
+        for key, (toggles, changes) in self.signal_counts().items():
+            path = "/".join(key.split("/")[:-1][:depth])
+            module = modules[path]
+            module[0] += 1
+            module[1] += toggles
+            module[2] += changes
+        return {path: tuple(module) for path, module in modules.items()}
+
+    def report(self, depth=4, top_signals=10):
+        """Per-submodule totals followed by the most active signals, as a table."""
+        modules = sorted(self.module_counts(depth).items(), key=lambda item: item[1][1], reverse=True)
+        signals = sorted(self.signal_counts().items(), key=lambda item: item[1][0], reverse=True)[:top_signals]
+
+        width = max([len("Submodule")] + [len(key) for key, _ in modules] + [len(key) for key, _ in signals])
+        lines = [f"{'Submodule':<{width}}  {'Signals':>7}  {'Toggles':>10}  {'Changes':>10}", "-" * (width + 35)]
+        for path, (count, toggles, changes) in modules:
+            lines.append(f"{path:<{width}}  {count:>7}  {toggles:>10,}  {changes:>10,}")
+        lines += ["", f"{'Signal':<{width}}  {'':>7}  {'Toggles':>10}  {'Changes':>10}", "-" * (width + 35)]
+        for key, (toggles, changes) in signals:
+            lines.append(f"{key:<{width}}  {'':>7}  {toggles:>10,}  {changes:>10,}")
+        return "\n".join(lines)
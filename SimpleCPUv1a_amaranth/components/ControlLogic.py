@@ -21,11 +21,13 @@ class ControlLogic(Elaboratable):
         self.ACC_EN = Signal()
         self.ACC_CTL = Signal(3)
 
+        self.rc = RingCounter()
+
     def elaborate(self, platform):
         m = Module()
 
         # === Dantiate Ring Counter and Decoder ===
-        m.submodules.rc = rc = RingCounter()
+        m.submodules.rc = rc = self.rc
         m.submodules.dec = dec = OneHotDecoder()
 
         # Connect inputs
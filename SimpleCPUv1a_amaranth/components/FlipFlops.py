@@ -52,12 +52,18 @@ class FDP(wiring.Component):
 class RingCounter(wiring.Component):
     Q: Out(3)
 
+    def __init__(self):
+        super().__init__()
+        self.fdp = FDP()
+        self.fdc1 = FDC()
+        self.fdc2 = FDC()
+
     def elaborate(self, platform):
         m = Module()
 
-        m.submodules.FDP = fdp = FDP()
-        m.submodules.FDC1 = fdc1 = FDC()
-        m.submodules.FDC2 = fdc2 = FDC()
+        m.submodules.FDP = fdp = self.fdp
+        m.submodules.FDC1 = fdc1 = self.fdc1
+        m.submodules.FDC2 = fdc2 = self.fdc2
 
         m.d.comb += [
             fdp.D.eq(self.Q[2]),
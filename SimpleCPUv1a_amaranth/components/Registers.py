@@ -11,12 +11,16 @@ class Register8bit(wiring.Component):
 
     Q: Out(8)
 
+    def __init__(self):
+        super().__init__()
+        self.fdces = [FDCE() for _ in range(8)]
+
     def elaborate(self, platform):
         m = Module()
 
         # Instantiate 8 FDCEs
         for i in range(8):
-            fdce = FDCE()
+            fdce = self.fdces[i]
             m.submodules += fdce
 
             m.d.comb += [
@@ -34,12 +38,16 @@ class Register16bit(wiring.Component):
 
     Q: Out(16)
 
+    def __init__(self):
+        super().__init__()
+        self.fdces = [FDCE() for _ in range(16)]
+
     def elaborate(self, platform):
         m = Module()
 
         # Instantiate 8 FDCEs
         for i in range(16):
-            fdce = FDCE()
+            fdce = self.fdces[i]
             m.submodules += fdce
 
             m.d.comb += [
@@ -58,10 +66,14 @@ class Counter8bit(wiring.Component):
 
     Q: Out(8)
 
+    def __init__(self):
+        super().__init__()
+        self.register = Register8bit()
+
     def elaborate(self, platform):
         m = Module()
 
-        m.submodules.register8bit = reg = Register8bit()
+        m.submodules.register8bit = reg = self.register
         m.submodules.fullAdder8bit = fullAdder = FullAdder8bit()
 
         muxOut = Signal(8)
@@ -9,12 +9,13 @@ class Computer(wiring.Component):
     
     def __init__(self, init_data=None):
         super().__init__()
+        self.cpu = Cpu()
         self.ram = RAM256x16(init_data)
 
     def elaborate(self, platform):
         m = Module()
         
-        m.submodules.cpu = cpu = Cpu()
+        m.submodules.cpu = cpu = self.cpu
         m.submodules.ram = ram = self.ram
 
         m.d.comb += [
@@ -0,0 +1,57 @@
+from amaranth import *
+from amaranth.lib import wiring
+from amaranth.lib.wiring import In, Out
+
+HALT_WORD = 0xFFFF
+
+
+class HaltDetector(wiring.Component):
+    """
+    Halt detector with a cycle budget, evaluated inside the simulator
+
+    Inputs:
+    - IR: Instruction register of the cpu
+    - BUDGET: Clock cycles allowed after reset before TIMEOUT is raised
+
+    Outputs:
+    - HALTED: IR holds 0xFFFF, or the optional predicate is true
+    - TIMEOUT: CYCLES has reached BUDGET
+    - DONE: HALTED | TIMEOUT
+    - CYCLES: Clock cycles since reset; stops counting once DONE
+
+    Parameters:
+    - predicate: Optional 1-bit Amaranth expression OR-ed into HALTED,
+      e.g. cpu.acc.Q == 20
+
+    A testbench waits for DONE with ctx.changed() instead of polling every
+    instruction, so the simulator runs uninterrupted until the program halts.
+    """
+    IR: In(16)
+    BUDGET: In(32)
+
+    HALTED: Out(1)
+    TIMEOUT: Out(1)
+    DONE: Out(1)
+    CYCLES: Out(32)
+
+    def __init__(self, predicate=None):
+        super().__init__()
+        self.predicate = predicate
+
+    def elaborate(self, platform):
+        m = Module()
+
+        halt = self.IR == HALT_WORD
+        if self.predicate is not None:
+            halt = halt | self.predicate
+
+        m.d.comb += [
+            self.HALTED.eq(halt),
+            self.TIMEOUT.eq(self.CYCLES >= self.BUDGET),
+            self.DONE.eq(self.HALTED | self.TIMEOUT),
+        ]
+
+        with m.If(~self.DONE):
+            m.d.sync += self.CYCLES.eq(self.CYCLES + 1)
+
+        return m
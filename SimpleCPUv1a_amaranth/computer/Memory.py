@@ -14,11 +14,13 @@ class RAM256x16(Elaboratable):
         # Optional initialization
         self.init_data = init_data if init_data else [0] * 256
 
+        # Memory block: 256 x 16 bits (kept on self so testbenches can rewrite it)
+        self.mem = Memory(width=16, depth=256, init=self.init_data)
+
     def elaborate(self, platform):
         m = Module()
 
-        # Memory block: 256 x 16 bits
-        mem = Memory(width=16, depth=256, init=self.init_data)
+        mem = self.mem
 
         # Create read and write ports
         #rp = mem.read_port(domain="neg", transparent=True)
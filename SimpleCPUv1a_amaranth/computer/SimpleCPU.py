@@ -15,15 +15,18 @@ class Cpu(wiring.Component):
     def __init__(self):
         super().__init__()
         self.ir = Register16bit()
+        self.acc = Register8bit()
+        self.pc = Counter8bit()
+        self.ctrl = ControlLogic()
 
     def elaborate(self, platform):
         m = Module()
 
         m.submodules.register16_IR = ir = self.ir
-        m.submodules.register8_ACC = acc = Register8bit()
-        m.submodules.counter_PC = pc = Counter8bit()
+        m.submodules.register8_ACC = acc = self.acc
+        m.submodules.counter_PC = pc = self.pc
         m.submodules.alu = alu = Alu()
-        m.submodules.controlLogic = cl = ControlLogic()
+        m.submodules.controlLogic = cl = self.ctrl
 
         m.d.comb += [
             # Wire Instruction Register
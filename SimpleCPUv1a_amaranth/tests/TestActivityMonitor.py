@@ -0,0 +1,65 @@
+from amaranth.sim import Simulator
+
+from ActivityMonitor import ActivityMonitor
+from tests.TestComputer import TopModule, execute, load_dat_file
+from SimpleCPUv1a_common.ISS import ISS
+
+
+def run_test(trace=False, program_path="programs/multiply.dat"):
+    print("\n=== Activity Monitor Test Start ===\n")
+
+    mem = load_dat_file(program_path)
+    dut = TopModule(mem)
+    sim = Simulator(dut)
+    sim.add_clock(1e-6)
+
+    async def bench(ctx):
+        await execute(ctx, dut)
+
+    sim.add_testbench(bench)
+    with ActivityMonitor(sim) as monitor:
+        sim.run()
+
+    if trace:
+        print(monitor.report())
+        print()
+
+    # The accumulator only changes when an instruction writes it, so its
+    # register output must match the reference model's ACC sequence
+    acc_values = [0] + [record.acc for record in ISS(mem).iter_trace()]
+    transitions = [(a, b) for a, b in zip(acc_values, acc_values[1:]) if a != b]
+    expected = (sum((a ^ b).bit_count() for a, b in transitions), len(transitions))
+    actual = monitor.get(dut.computer.cpu.acc.Q)
+    passed = actual == expected
+    print(f"{'PASS' if passed else 'FAIL':<6}  ACC: {actual[0]} toggles in {actual[1]} changes, as in the ISS trace")
+    assert passed, f"FAIL: ACC activity {actual}, expected {expected}"
+
+    # The write port may fire on several cycles of a STORE, but only the
+    # value changes made by STOREs in the ISS trace flip RAM bits
+    ram = list(mem) + [0] * (256 - len(mem))
+    expected = 0
+    for record in ISS(mem).iter_trace():
+        if record.ram_write is not None:
+            address, data = record.ram_write
+            expected += (ram[address] ^ data).bit_count()
+            ram[address] = data
+    toggles = [toggles for key, (toggles, _) in monitor.signal_counts().items() if key.endswith("[memory]")]
+    passed = toggles == [expected]
+    print(f"{'PASS' if passed else 'FAIL':<6}  RAM256x16: {toggles} bits written, as in the ISS trace")
+    assert passed, f"FAIL: expected {expected} RAM bit toggles, got {toggles}"
+
+    # Submodule totals are sums of the signal counts
+    signals = monitor.signal_counts()
+    modules = monitor.module_counts(depth=4)
+    passed = (sum(toggles for toggles, _ in signals.values()) == sum(m[1] for m in modules.values())
+              and len(signals) == sum(m[0] for m in modules.values()))
+    print(f"{'PASS' if passed else 'FAIL':<6}  {len(modules)} submodule totals cover all {len(signals)} active signals")
+    assert passed, "FAIL: submodule totals do not add up"
+
+    for name in ("alu", "controlLogic", "register16_IR", "register8_ACC"):
+        key = f"top/computer/cpu/{name}"
+        passed = modules.get(key, (0, 0, 0))[1] > 0
+        print(f"{'PASS' if passed else 'FAIL':<6}  {key}: {modules.get(key, (0, 0, 0))[1]:,} toggles")
+        assert passed, f"FAIL: no activity recorded for {key}"
+
+    print("\n=== Activity Monitor Test Passed Successfully ===\n")
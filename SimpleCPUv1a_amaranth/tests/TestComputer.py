@@ -1,18 +1,35 @@
+import os
+import queue
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 from amaranth import *
 from amaranth.sim import Simulator
 
 from computer.Computer import *  # Update this with actual import
+from computer.HaltDetector import HaltDetector
+from ActivityMonitor import ActivityMonitor
+
+# The shared tools (SimpleCPUv1a_common) live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.VCDWriter import VCDWriter
+from SimpleCPUv1a_common import Snapshot
 
 class TopModule(Elaboratable):
-    def __init__(self, init_data = None):
+    def __init__(self, init_data = None, predicate = None):
         # External test-facing signals
         self.CLR = Signal()
         self.DATA_OUT = Signal(16)
         self.DATA_IN = Signal(16)
 
         self.init_data = init_data
+        self.computer = Computer(init_data)
+
+        # predicate(computer) -> 1-bit expression that also halts the run
+        self.halt = HaltDetector(predicate(self.computer) if predicate is not None else None)
 
 
     def elaborate(self, platform):
@@ -24,7 +41,9 @@ class TopModule(Elaboratable):
         m.domains += ClockDomain("neg", clk_edge="neg")
         m.d.comb += ClockSignal("neg").eq(ClockSignal("sync"))
 
-        m.submodules.computer = computer = Computer(self.init_data)
+        m.submodules.computer = computer = self.computer
+        m.submodules.halt = halt = self.halt
+        m.d.comb += halt.IR.eq(computer.cpu.ir.Q)
 
         # Connect outputs
         m.d.comb += [
@@ -36,9 +55,10 @@ class TopModule(Elaboratable):
 
 def load_dat_file(filename):
     """
-    Load a .dat file into memory.
+    Load a program file into memory.
 
-    The .dat file format is:
+    Accepts the .dat, .asc, .mem and .mif outputs of simpleCPUv1a_as.py; see
+    SimpleCPUv1a_common/Loader.py. The .dat file format is:
     <address> <binary_data>
 
     Example:
@@ -49,57 +69,252 @@ def load_dat_file(filename):
     Returns:
     - A list of 16-bit values representing memory contents
     """
-    mem = [0 for _ in range(256)]  # Initialize memory with 256 words of 0
-
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    parts = line.split()
-                    if len(parts) == 2:
-                        addr = int(parts[0], 10)  # Parse address as decimal
-                        data = int(parts[1], 2)  # Parse data as binary
-                        mem[addr] = data
-
-
+        mem = load_image(filename)
         print(f"Memory loaded from {filename}: {len([x for x in mem if x != 0])} non-zero words")
     except FileNotFoundError:
         print(f"Warning: File {filename} not found. Using default memory.")
+        mem = [0 for _ in range(256)]  # Initialize memory with 256 words of 0
 
     return mem
 
-async def bench(ctx):
+async def reset_computer(ctx, top):
     # Reset and initialize
-    ctx.set(dut.CLR, 1)
+    ctx.set(top.CLR, 1)
     await ctx.tick() ##Load RAM
     await ctx.tick()
-    ctx.set(dut.CLR, 0)
+    ctx.set(top.CLR, 0)
+
+
+async def run_computer(ctx, top, max_cycles=500):
+    """
+    Run until the IR latches the termination instruction (0xFFFF)
+
+    The HaltDetector counts cycles and compares the IR inside the simulator,
+    so the testbench sleeps until its DONE output changes.
+
+    Inputs:
+    - max_cycles: Budget in 3-tick instruction periods
+
+    Returns:
+    - Number of instruction periods simulated, including the one that
+      fetched 0xFFFF
+    """
+    ctx.set(top.halt.BUDGET, max_cycles * 3)
+    if not ctx.get(top.halt.DONE):
+        await ctx.changed(top.halt.DONE)
+
+    if ctx.get(top.halt.TIMEOUT):
+        return max_cycles
+    return ctx.get(top.halt.CYCLES) // 3 + 1
+
+
+async def execute(ctx, top, max_cycles=500):
+    await reset_computer(ctx, top)
+    return await run_computer(ctx, top, max_cycles)
+
+
+def trace_signals(top):
+    """Architectural signals available to the streaming VCDWriter, by name."""
+    cpu = top.computer.cpu
+    return {
+        "PC": cpu.pc.Q,
+        "ACC": cpu.acc.Q,
+        "IR": cpu.ir.Q,
+        "ADDR": cpu.ADDR,
+        "DATA_IN": cpu.DATA_IN,
+        "DATA_OUT": cpu.DATA_OUT,
+    }
+
+
+def vcd_sampler(top, vcd):
+    """Background testbench writing the selected signals at every clock edge."""
+    sigs = [trace_signals(top)[name] for name in vcd.names]
+
+    async def sample(ctx):
+        cycle = 0
+        async for _, _, *values in ctx.tick().sample(*sigs):
+            vcd.sample(cycle, values)
+            cycle += 1
+
+    return sample
+
+
+class ComputerSession:
+    """
+    Elaborated, warmed Amaranth simulation of the computer
+
+    The Simulator is built once; run_program() resets it, rewrites the
+    RAM256x16 contents from the testbench, pulses CLR and runs the program.
+    A session holds no module-level state, so separate sessions can be used
+    by separate workers.
+
+    snapshot() and restore() save and load the whole machine state (see
+    SimpleCPUv1a_common/Snapshot.py). resume() runs on from a restored
+    state: the testbench writes every flip-flop and the RAM instead of
+    pulsing CLR. halted says whether the last run ended on the termination
+    instruction (or the predicate) rather than on the cycle budget.
+    """
+
+    def __init__(self, predicate=None):
+        self.dut = TopModule(predicate=predicate)
+        self.sim = Simulator(self.dut)
+        self.sim.add_clock(1e-6)
+        self.sim.add_testbench(self._bench)
+
+        self.mem = None
+        self.max_cycles = 500
+        self.result = None
+        self.restored = None
+        self.machine = None
+        self.halted = False
 
-    # Feed a series of instructions (e.g., 0b0001 through 0b0011)
-    for _ in range(500):
-        DATA_IN = ctx.get(dut.DATA_IN)
+        # Warm-up run: no program loaded, the testbench returns immediately
+        self.sim.run()
 
-        await ctx.tick()
-        await ctx.tick()
-        await ctx.tick()
-        if int(DATA_IN) == 0xffff:
-            break
+    def _state_flops(self):
+        # Every flip-flop of the machine, as FDCE/FDC/FDP outputs LSB first per field
+        cpu = self.dut.computer.cpu
+        rc = cpu.ctrl.rc
+        return {
+            "pc": [fdce.Q for fdce in cpu.pc.register.fdces],
+            "acc": [fdce.Q for fdce in cpu.acc.fdces],
+            "ir": [fdce.Q for fdce in cpu.ir.fdces],
+            "ring": [rc.fdp.Q, rc.fdc1.Q, rc.fdc2.Q],
+        }
 
+    async def _bench(self, ctx):
+        if self.mem is None and self.restored is None:
+            return
 
-def run_test(trace=False, program_path="programs/code.dat"):
-    global dut
+        ram = self.dut.computer.ram.mem
+        if self.restored is not None:
+            state, self.restored = self.restored, None
+            for addr, value in enumerate(state.ram):
+                ctx.set(ram[addr], value)
+            for field, flops in self._state_flops().items():
+                for flop, bit in zip(flops, Snapshot.bits(getattr(state, field), len(flops))):
+                    ctx.set(flop, bit)
+            ctx.set(self.dut.halt.CYCLES, state.cycles)
+            cycles = await run_computer(ctx, self.dut, self.max_cycles)
+        else:
+            for addr, value in enumerate(self.mem):
+                ctx.set(ram[addr], value)
+            cycles = await execute(ctx, self.dut, self.max_cycles)
 
+        cpu = self.dut.computer.cpu
+        self.halted = bool(ctx.get(self.dut.halt.HALTED))
+        self.result = {
+            "PC": ctx.get(cpu.pc.Q),
+            "ACC": ctx.get(cpu.acc.Q),
+            "IR": ctx.get(cpu.ir.Q),
+            "RAM": [ctx.get(ram[addr]) for addr in range(256)],
+            "cycles": cycles,
+        }
+        self.machine = Snapshot.MachineState(
+            cycles=ctx.get(self.dut.halt.CYCLES),
+            ram=self.result["RAM"],
+            **{field: Snapshot.from_bits(ctx.get(flop) for flop in flops)
+               for field, flops in self._state_flops().items()},
+        )
+
+    def run_program(self, mem, max_cycles=500):
+        """Run one program image and return its final PC/ACC/IR/RAM."""
+        self.mem = mem
+        self.max_cycles = max_cycles
+
+        self.sim.reset()
+        self.sim.run()
+        return self.result
+
+    def snapshot(self):
+        """Machine state after the last run (or restore()), as a Snapshot blob."""
+        if self.restored is not None:
+            return Snapshot.pack(self.restored)
+        return Snapshot.pack(self.machine)
+
+    def restore(self, blob):
+        """Load a Snapshot blob; it is written into the design by the next resume()."""
+        self.restored = Snapshot.unpack(blob)
+
+    def resume(self, max_cycles=500):
+        """Run on from the restored state (or where the last run stopped), like run_program()."""
+        if self.restored is None:
+            if self.machine is None:
+                raise RuntimeError("Nothing to resume: run a program or restore() a snapshot first")
+            self.restored = self.machine
+        return self.run_program(None, max_cycles)
+
+
+class SessionPool:
+    """
+    Pool of ComputerSession objects shared by worker threads
+
+    Sessions are created lazily, up to one per worker, and returned to the
+    pool after each job so the elaboration cost is paid once per worker.
+    """
+
+    def __init__(self, workers=4):
+        self.workers = workers
+        self._idle = queue.Queue()
+
+    @contextmanager
+    def session(self):
+        try:
+            session = self._idle.get_nowait()
+        except queue.Empty:
+            session = ComputerSession()
+        try:
+            yield session
+        finally:
+            self._idle.put(session)
+
+    def run_program(self, mem, max_cycles=500):
+        with self.session() as session:
+            return session.run_program(mem, max_cycles)
+
+    def map(self, mems, max_cycles=500):
+        """Run every image on the pool and return the results in order."""
+        with ThreadPoolExecutor(self.workers) as executor:
+            return list(executor.map(lambda mem: self.run_program(mem, max_cycles), mems))
+
+
+def run_test(trace=False, program_path="programs/code.dat", max_cycles=500, signals=None, windows=None,
+             activity=False):
+    """
+    Run a program on the Computer testbench
+
+    Inputs:
+    - trace: Write waveforms/Computer.vcd
+    - signals: Optional allow-list (e.g. ["PC", "ACC", "IR"]); with trace, only
+      these signals are streamed to the VCD instead of the whole design
+    - windows: Optional list of (start, end) clock-cycle ranges to record
+    - activity: Count signal toggles per submodule (ActivityMonitor) and
+      print the table after the run
+    """
     mem = load_dat_file(program_path)
 
     dut = TopModule(mem)
+
+    async def bench(ctx):
+        if await execute(ctx, dut, max_cycles) == max_cycles:
+            print("Cycle limit reached")
+
     sim = Simulator(dut)
     sim.add_clock(1e-6)
     sim.add_testbench(bench)
 
+    monitor = ActivityMonitor(sim) if activity else None
+    if monitor is not None:
+        monitor.attach()
+
     start_time = time.perf_counter()
 
-    if trace:
+    if trace and signals:
+        with VCDWriter("waveforms/Computer.vcd", signals, windows) as vcd:
+            sim.add_testbench(vcd_sampler(dut, vcd), background=True)
+            sim.run()
+    elif trace:
         with sim.write_vcd("waveforms/Computer.vcd"):
             sim.run()
     else:
@@ -107,4 +322,21 @@ def run_test(trace=False, program_path="programs/code.dat"):
 
     end_time = time.perf_counter()
     elapsed = end_time - start_time
-    print(f"Simulation time: {elapsed:.6f} seconds")
\ No newline at end of file
+    print(f"Simulation time: {elapsed:.6f} seconds")
+
+    if monitor is not None:
+        monitor.detach()
+        print(f"\n{monitor.report()}")
+
+
+def run_batch(program_paths, workers=4):
+    """Run several programs through a SessionPool."""
+    pool = SessionPool(workers)
+    mems = [load_dat_file(program_path) for program_path in program_paths]
+
+    start_time = time.perf_counter()
+    results = pool.map(mems)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"Simulation time: {elapsed:.6f} seconds for {len(mems)} programs")
+    return dict(zip(program_paths, results))
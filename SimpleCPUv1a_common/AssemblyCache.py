@@ -0,0 +1,105 @@
+"""
+Content-addressed cache for simpleCPUv1a_as.assemble()
+
+Assembled programs are stored in asm_cache/ as two files per key:
+
+- <key>.bin: the 256-word image as little-endian uint16, the same layout as
+  the Loader's image_cache
+- <key>.json: the label table, {label: address}
+
+The key is a hash of the assembly text, the assembler options (address
+offset and byte addressing) and the assembler source itself, so an edited
+program, different options or a changed assembler all miss the cache, while
+identical sources assembled from any backend or checkout share one entry.
+"""
+
+import hashlib
+import json
+import os
+
+from SimpleCPUv1a_common.Loader import read_image_file, write_image_file
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSEMBLER_PATH = os.path.join(REPO_ROOT, "simpleCPUv1a_as.py")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "asm_cache")
+
+_assembler_hash = None
+_programs = {}
+
+
+def assembler_hash():
+    """Hash of simpleCPUv1a_as.py, so entries from an older assembler are not reused."""
+    global _assembler_hash
+    if _assembler_hash is None:
+        with open(ASSEMBLER_PATH, "rb") as f:
+            _assembler_hash = hashlib.sha256(f.read()).hexdigest()
+    return _assembler_hash
+
+
+def cache_key(source, address=0, byte_addressable=False):
+    """Key for one assembly: the assembler, its options and the source text."""
+    h = hashlib.sha256()
+    h.update(f"{assembler_hash()}\0{address}\0{int(bool(byte_addressable))}\0".encode())
+    h.update(source.encode())
+    return h.hexdigest()[:32]
+
+
+def _read_labels(label_file):
+    try:
+        with open(label_file) as f:
+            labels = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return labels if isinstance(labels, dict) else None
+
+
+def _write_labels(label_file, labels):
+    tmp_file = f"{label_file}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(label_file), exist_ok=True)
+        with open(tmp_file, "w") as f:
+            json.dump(labels, f, sort_keys=True)
+        os.replace(tmp_file, label_file)
+    except OSError:
+        # As with the image cache, a read-only checkout just assembles every time
+        pass
+
+
+def assemble_cached(source, address=0, byte_addressable=False, cache_dir=CACHE_DIR):
+    """
+    Assemble a program, reusing an earlier assembly of the same source
+
+    Inputs:
+    - source: Assembly text
+    - address: Start address offset (-a)
+    - byte_addressable: Byte addressed memory (-b)
+    - cache_dir: Directory holding the cached images and label tables
+
+    Returns:
+    - (image, labels): a new list of 256 16-bit words and a new {label: address}
+      dict
+
+    Raises:
+    - AssemblerError if the source cannot be assembled. Failures are not cached.
+    """
+    key = cache_key(source, address, byte_addressable)
+
+    if key in _programs:
+        image, labels = _programs[key]
+        return list(image), dict(labels)
+
+    image_file = os.path.join(cache_dir, key + ".bin")
+    label_file = os.path.join(cache_dir, key + ".json")
+
+    image = read_image_file(image_file)
+    labels = _read_labels(label_file) if image is not None else None
+    if labels is None:
+        from simpleCPUv1a_as import assemble
+
+        image, labels = assemble(source, address, byte_addressable)
+        # The image is written last, so a reader never finds it without its labels
+        _write_labels(label_file, labels)
+        write_image_file(image_file, image)
+
+    _programs[key] = (tuple(image), dict(labels))
+    return list(image), dict(labels)
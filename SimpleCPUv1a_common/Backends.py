@@ -0,0 +1,41 @@
+"""
+Where the four HDL backends live
+
+Every tool that runs a backend (Benchmark, BatchRunner, Lockstep, Sessions,
+NativeSim, ...) finds its project folder here and checks the name it was
+given with check_backend().
+"""
+
+import os
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Backend name -> project folder. A variant is selected with "name:option",
+# e.g. "pyrtl:compiled" (PyRTL engine), "pymtl:verilator" (PyMTL backend),
+# "myhdl:rtl" (behavioral component models) or "amaranth:native" (HDLs/cpu.v
+# compiled to C, see NativeSim.py).
+BACKENDS = {
+    "amaranth": "SimpleCPUv1a_amaranth",
+    "myhdl": "SimpleCPUv1a_myhdl",
+    "pymtl": "SimpleCPUv1a_pymtl",
+    "pyrtl": "SimpleCPUv1a_pyrtl",
+}
+
+# Backend name -> variants accepted after the colon; "" is the bare name,
+# which runs the backend's default (gate, python, interpreted)
+VARIANTS = {
+    "amaranth": ("", "native"),
+    "myhdl": ("", "gate", "rtl"),
+    "pymtl": ("", "python", "verilator"),
+    "pyrtl": ("", "interpreted", "fast", "compiled"),
+}
+
+
+def check_backend(backend):
+    """Raise ValueError unless backend is a known "name" or "name:option"."""
+    name, _, option = backend.partition(":")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {', '.join(BACKENDS)}")
+    if option not in VARIANTS[name]:
+        options = ", ".join(f"{name}:{variant}" for variant in VARIANTS[name] if variant)
+        raise ValueError(f"Unknown variant '{backend}', expected one of {options}")
@@ -0,0 +1,149 @@
+import numpy as np
+
+from SimpleCPUv1a_common.ISS import (
+    MOVE, ADD, SUB, AND, LOAD, STORE, ADDM, SUBM, JUMPU, JUMPZ, JUMPNZ,
+    HALT, CYCLES_PER_INSTRUCTION, MEMORY_SIZE, DEFAULT_INSTRUCTION_LIMIT,
+)
+
+
+class BatchISS:
+    """
+    Vectorized instruction-set simulator running N SimpleCPUv1a programs in lockstep
+
+    Inputs:
+    - images: (N, 256) array-like of 16-bit program images
+
+    State:
+    - ram: (N, 256) uint16 memory of every machine
+    - pc, acc, ir: (N,) vectors of architectural registers
+    - halted: (N,) bool vector, set once a lane fetches 0xFFFF
+    - instructions: (N,) count of retired instructions per lane
+
+    Behavior:
+    - step() fetches and executes one instruction on every running lane with
+      a handful of array operations; halted lanes are masked out.
+    - Results are identical to running each image through ISS.
+    """
+
+    def __init__(self, images):
+        images = np.asarray(images, dtype=np.uint16)
+        if images.ndim == 1:
+            images = images[np.newaxis, :]
+        if images.ndim != 2 or images.shape[1] != MEMORY_SIZE:
+            raise ValueError(f"Program images must have shape (N, {MEMORY_SIZE}), got {images.shape}")
+        self.images = images
+        self.reset()
+
+    def __len__(self):
+        return self.images.shape[0]
+
+    def reset(self):
+        """Restore every lane to the power-on state."""
+        n = len(self)
+        self.ram = self.images.copy()
+        self.pc = np.zeros(n, dtype=np.int64)
+        self.acc = np.zeros(n, dtype=np.int64)
+        self.ir = np.zeros(n, dtype=np.int64)
+        self.halted = np.zeros(n, dtype=bool)
+        self.instructions = np.zeros(n, dtype=np.int64)
+
+    @property
+    def cycles(self):
+        return self.instructions * CYCLES_PER_INSTRUCTION
+
+    @property
+    def running(self):
+        return int(np.count_nonzero(~self.halted))
+
+    def step(self):
+        """
+        Execute one instruction on every lane that has not halted
+
+        Returns:
+        - Number of lanes that retired an instruction
+        """
+        lanes = np.flatnonzero(~self.halted)
+        if lanes.size == 0:
+            return 0
+
+        flat = self.ram.reshape(-1)
+        base = lanes * MEMORY_SIZE
+
+        # === Fetch ===
+        pc = self.pc[lanes]
+        ir = flat[base + pc].astype(np.int64)
+        self.ir[lanes] = ir
+
+        halt = ir == HALT
+        if halt.any():
+            self.halted[lanes[halt]] = True
+            keep = ~halt
+            lanes, base, pc, ir = lanes[keep], base[keep], pc[keep], ir[keep]
+            if lanes.size == 0:
+                return 0
+
+        # === Decode ===
+        opcode = ir >> 12
+        operand = ir & 0xFF
+        acc = self.acc[lanes]
+        data = flat[base + operand].astype(np.int64) & 0xFF
+
+        # === Execute ===
+        acc = np.select(
+            [
+                opcode == MOVE,
+                opcode == ADD,
+                opcode == SUB,
+                opcode == AND,
+                opcode == LOAD,
+                opcode == ADDM,
+                opcode == SUBM,
+            ],
+            [
+                operand,
+                acc + operand,
+                acc - operand,
+                acc & operand,
+                data,
+                acc + data,
+                acc - data,
+            ],
+            default=acc,
+        ) & 0xFF
+
+        store = opcode == STORE
+        if store.any():
+            flat[base[store] + operand[store]] = (ir[store] & 0xF000) | acc[store]
+
+        zero = acc == 0
+        taken = (opcode == JUMPU) | ((opcode == JUMPZ) & zero) | ((opcode == JUMPNZ) & ~zero)
+
+        self.pc[lanes] = np.where(taken, operand, (pc + 1) & 0xFF)
+        self.acc[lanes] = acc
+        self.instructions[lanes] += 1
+
+        return lanes.size
+
+    def run(self, max_instructions=DEFAULT_INSTRUCTION_LIMIT):
+        """
+        Step all lanes until every lane has halted or max_instructions steps have run
+
+        Returns:
+        - Number of lockstep steps executed
+        """
+        steps = 0
+        while steps < max_instructions and self.step():
+            steps += 1
+        return steps
+
+    def state(self, lane):
+        """Architectural state of a single lane, in the same form as ISS.state()."""
+        return {
+            "PC": int(self.pc[lane]),
+            "ACC": int(self.acc[lane]),
+            "IR": int(self.ir[lane]),
+            "RAM": self.ram[lane].tolist(),
+            "instructions": int(self.instructions[lane]),
+            "cycles": int(self.instructions[lane]) * CYCLES_PER_INSTRUCTION,
+            "halted": bool(self.halted[lane]),
+        }
@@ -0,0 +1,191 @@
+"""
+Process-pool batch runner for program suites
+
+Runs a list of program images on one or more backends in parallel and
+collects the final PC/ACC/IR/RAM of each run. Each backend gets its own
+ProcessPoolExecutor whose workers elaborate one ComputerSession when they
+start and reuse it for every program they are given, so the import and
+elaboration cost is paid once per worker instead of once per program.
+
+Workers never change directory: the backend folder is put on sys.path (the
+four backends share module names such as tests and computer, so a worker
+serves a single backend), and program files are read by the driver with
+Loader.load_image, relative to the caller's working directory, and sent to
+the workers as images.
+
+Usage (from the repository root):
+
+    python -m SimpleCPUv1a_common.BatchRunner SimpleCPUv1a_myhdl/programs/*.dat
+    python -m SimpleCPUv1a_common.BatchRunner prog1.dat prog2.asm --backends amaranth pyrtl:compiled --workers 4
+
+API:
+
+    records = run_suite(["a.dat", "b.dat"], backends=["amaranth", "myhdl:rtl"], workers=2)
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from SimpleCPUv1a_common.Backends import check_backend
+from SimpleCPUv1a_common.ISS import ISS
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.Sessions import open_session, session_result
+
+DEFAULT_BACKENDS = ["amaranth", "myhdl", "pymtl", "pyrtl"]
+
+FIELDS = [
+    "backend", "program", "status", "PC", "ACC", "IR", "instructions", "halted", "matches_iss",
+    "simulate_s", "elaborate_s", "worker", "error",
+]
+
+
+# -------------------------------------------------------------------------
+# Worker side: one warm session per process
+# -------------------------------------------------------------------------
+
+_worker = {}
+
+
+def _start_worker(backend):
+    """ProcessPoolExecutor initializer: import the backend and elaborate its session."""
+    start = time.perf_counter()
+    _worker["session"] = open_session(backend)
+    _worker["elaborate_s"] = time.perf_counter() - start
+
+
+def _run_job(mem, max_cycles):
+    start = time.perf_counter()
+    session = _worker["session"]
+    instructions, state = session_result(session, session.run_program(mem, max_cycles))
+    return {
+        **state,
+        "instructions": instructions,
+        "halted": session.halted,
+        "simulate_s": time.perf_counter() - start,
+        "elaborate_s": _worker["elaborate_s"],
+        "worker": os.getpid(),
+    }
+
+
+# -------------------------------------------------------------------------
+# Driver side
+# -------------------------------------------------------------------------
+
+def iss_state(mem, max_cycles):
+    """Final PC/ACC/RAM of the reference model, for comparison."""
+    iss = ISS(mem)
+    iss.run(max_cycles)
+    return {"PC": iss.pc, "ACC": iss.acc, "RAM": list(iss.ram)}
+
+
+def run_suite(programs, backends=DEFAULT_BACKENDS, workers=None, max_cycles=500):
+    """
+    Run every program on every backend
+
+    Inputs:
+    - programs: Program files in any Loader format, or {name: image}
+    - backends: Backend names, optionally with a variant (e.g. "pyrtl:compiled")
+    - workers: Worker processes per backend (default: the CPU count shared
+      between the backends, and no more than the number of programs)
+    - max_cycles: Instruction-period budget per run
+
+    Returns:
+    - A record per (backend, program), in order, with the fields in FIELDS
+      plus RAM
+    """
+    for backend in backends:
+        check_backend(backend)
+
+    images = programs if isinstance(programs, dict) else {path: load_image(path) for path in programs}
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 1) // len(backends))
+    workers = max(1, min(workers, len(images)))
+    expected = {name: iss_state(mem, max_cycles) for name, mem in images.items()}
+
+    # spawn: each worker starts from a clean interpreter, whatever the driver has imported
+    context = multiprocessing.get_context("spawn")
+    pools = {backend: ProcessPoolExecutor(workers, context, _start_worker, (backend,)) for backend in backends}
+    try:
+        # Submit everything first so the backends run concurrently
+        jobs = [(backend, name, pools[backend].submit(_run_job, mem, max_cycles))
+                for backend in backends for name, mem in images.items()]
+
+        records = []
+        for backend, name, future in jobs:
+            record = {"backend": backend, "program": name}
+            try:
+                record.update(future.result())
+                record["status"] = "ok"
+                record["matches_iss"] = all(record[key] == value for key, value in expected[name].items())
+            except Exception as e:
+                record["status"] = "error"
+                record["error"] = f"{type(e).__name__}: {e}"
+            records.append(record)
+    finally:
+        for pool in pools.values():
+            pool.shutdown(cancel_futures=True)
+
+    return records
+
+
+def write_json(records, path):
+    with open(path, "w") as f:
+        json.dump(records, f, indent=2)
+
+
+def write_csv(records, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def print_summary(records):
+    width = max([len("Program")] + [len(r["program"]) for r in records])
+    print(f"{'Backend':<16} {'Program':<{width}} {'PC':>4} {'ACC':>4} {'IR':>6} {'Instr':>6} {'ISS':>4} "
+          f"{'Sim':>9} {'Elab':>8} {'Worker':>7}")
+    print("-" * (width + 76))
+    for r in records:
+        if r["status"] != "ok":
+            print(f"{r['backend']:<16} {r['program']:<{width}} {r['status']}: {r.get('error', '')}")
+            continue
+        print(f"{r['backend']:<16} {r['program']:<{width}} {r['PC']:>4} {r['ACC']:>4} {r['IR']:>#6x} "
+              f"{r['instructions']:>6} {'yes' if r['matches_iss'] else 'NO':>4} {r['simulate_s']:>9.4f} "
+              f"{r['elaborate_s']:>8.3f} {r['worker']:>7}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a suite of programs on the SimpleCPUv1a HDL backends "
+                                                 "in parallel.")
+    parser.add_argument("programs", nargs="+", help="program files (.dat, .asc, .mem, .mif or .asm)")
+    parser.add_argument("--backends", nargs="+", default=DEFAULT_BACKENDS,
+                        help="backends to run, optionally with a variant (e.g. pyrtl:compiled)")
+    parser.add_argument("--workers", type=int, help="worker processes per backend")
+    parser.add_argument("--max-cycles", type=int, default=500, help="instruction-period limit per run")
+    parser.add_argument("--json", help="write records (including RAM) to this JSON file")
+    parser.add_argument("--csv", help="write records to this CSV file")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        records = run_suite(args.programs, args.backends, args.workers, args.max_cycles)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - start
+
+    print_summary(records)
+    print(f"\n{len(records)} runs in {elapsed:.2f} s")
+
+    if args.json:
+        write_json(records, args.json)
+    if args.csv:
+        write_csv(records, args.csv)
+
+
+if __name__ == "__main__":
+    main()
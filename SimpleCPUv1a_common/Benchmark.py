@@ -0,0 +1,346 @@
+"""
+Cross-backend benchmark harness
+
+Runs every backend against every program in its programs/ folder, with
+tracing off and on, and records per-phase wall-clock times:
+
+- import: importing the backend's TestComputer module (HDL library + model)
+- elaborate: building the design and the simulator
+- reset: the CLR/rst pulse at the start of the run
+- simulate: running the program until 0xFFFF or the cycle limit
+- finalize: flushing the waveform, where the backend does this separately
+
+Each run happens in a fresh worker process with the backend folder as its
+working directory, because the four backends share module names (tests,
+computer, components) and because import time and peak RSS are only
+meaningful per process.
+
+Usage (from the repository root):
+
+    python -m SimpleCPUv1a_common.Benchmark --json results.json --csv results.csv
+    python -m SimpleCPUv1a_common.Benchmark --backends myhdl pyrtl:compiled --trace off
+"""
+
+import argparse
+import csv
+import glob
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+from SimpleCPUv1a_common.Backends import BACKENDS, REPO_ROOT, check_backend
+from SimpleCPUv1a_common.ISS import ISS, CYCLES_PER_INSTRUCTION
+from SimpleCPUv1a_common.Loader import load_image
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_BACKENDS = ["amaranth", "myhdl", "myhdl:rtl", "pymtl", "pyrtl", "pyrtl:fast", "pyrtl:compiled"]
+
+FIELDS = [
+    "backend", "program", "trace", "run", "status",
+    "import_s", "elaborate_s", "reset_s", "simulate_s", "finalize_s", "total_s",
+    "periods", "instructions", "cycles", "cycles_per_s", "halted", "iss_instructions", "peak_rss_mb", "error",
+]
+
+
+# -------------------------------------------------------------------------
+# Worker side: runs inside the backend folder
+# -------------------------------------------------------------------------
+
+@contextmanager
+def _phase(record, name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record[f"{name}_s"] = time.perf_counter() - start
+
+
+def _bench_amaranth(record, program, trace, option, max_cycles):
+    with _phase(record, "import"):
+        tb = importlib.import_module("tests.TestComputer")
+
+    mem = tb.load_dat_file(program)
+    with _phase(record, "elaborate"):
+        dut = tb.TopModule(mem)
+        sim = tb.Simulator(dut)
+        sim.add_clock(1e-6)
+
+    # Reset and run happen inside one testbench, so time them from within it
+    stamps = {}
+
+    async def bench(ctx):
+        stamps["start"] = time.perf_counter()
+        await tb.reset_computer(ctx, dut)
+        stamps["reset"] = time.perf_counter()
+        stamps["periods"] = await tb.run_computer(ctx, dut, max_cycles)
+        stamps["end"] = time.perf_counter()
+        stamps["halted"] = bool(ctx.get(dut.halt.HALTED))
+
+    sim.add_testbench(bench)
+
+    start = time.perf_counter()
+    if trace:
+        with sim.write_vcd("waveforms/Computer.vcd"):
+            sim.run()
+    else:
+        sim.run()
+    finish = time.perf_counter()
+
+    record["reset_s"] = stamps["reset"] - start
+    record["simulate_s"] = stamps["end"] - stamps["reset"]
+    record["finalize_s"] = finish - stamps["end"]
+    return stamps["periods"], stamps["halted"]
+
+
+def _bench_native(record, program, trace, option, max_cycles):
+    with _phase(record, "import"):
+        native = importlib.import_module("SimpleCPUv1a_common.NativeSim")
+
+    mem = load_image(program)
+    with _phase(record, "elaborate"):
+        session = native.NativeSession()
+    with _phase(record, "reset"):
+        session.load(mem)
+        session.reset()
+    with _phase(record, "simulate"):
+        periods = session.run(max_cycles)
+    record["finalize_s"] = 0.0  # No waveform support
+    return periods, session.halted
+
+
+def _bench_myhdl(record, program, trace, option, max_cycles):
+    with _phase(record, "import"):
+        tb = importlib.import_module("tests.TestComputer")
+
+    mem = tb.load_dat_file(program)
+    with _phase(record, "elaborate"):
+        session = tb.ComputerSession(trace=trace, model=option or "gate")
+    with _phase(record, "reset"):
+        session.load(mem)
+        session.reset()
+    with _phase(record, "simulate"):
+        periods = session.run(max_cycles)
+    with _phase(record, "finalize"):
+        session.close()
+    return periods, session.halted
+
+
+def _bench_pymtl(record, program, trace, option, max_cycles):
+    with _phase(record, "import"):
+        tb = importlib.import_module("tests.TestComputer")
+
+    with _phase(record, "elaborate"):
+        dut = tb.setup_test(trace, program, option or "python")
+    with _phase(record, "reset"):
+        tb.reset_computer(dut)
+    with _phase(record, "simulate"):
+        periods = tb.run_computer(dut, max_cycles)
+    record["finalize_s"] = 0.0  # The VCD pass flushes on every tick
+    return periods, bool(dut.halt.HALTED)
+
+
+def _bench_pyrtl(record, program, trace, option, max_cycles):
+    with _phase(record, "import"):
+        tb = importlib.import_module("tests.TestComputer")
+
+    with _phase(record, "elaborate"):
+        sim, sim_trace = tb.setup_sim(program, option or "interpreted", trace)
+    with _phase(record, "reset"):
+        tb.reset_computer(sim)
+    with _phase(record, "simulate"):
+        periods = tb.run_computer(sim, max_cycles)
+    with _phase(record, "finalize"):
+        if trace:
+            with open("waveforms/Computer.vcd", "w") as f:
+                sim_trace.print_vcd(f)
+    return periods, bool(sim.inspect('halted'))
+
+
+WORKERS = {
+    "amaranth": _bench_amaranth,
+    "myhdl": _bench_myhdl,
+    "pymtl": _bench_pymtl,
+    "pyrtl": _bench_pyrtl,
+    "amaranth:native": _bench_native,
+}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB, or None if unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_worker(backend, program, trace, max_cycles):
+    """Benchmark one backend/program pair in the current process and return a record."""
+    name, _, option = backend.partition(":")
+    sys.path.insert(0, os.getcwd())
+
+    record = {}
+    worker = WORKERS.get(backend, WORKERS[name])
+    periods, halted = worker(record, program, trace, option, max_cycles)
+
+    # The period that fetched 0xFFFF retires nothing, so a halted run is
+    # counted like the ISS counts it (as Streaming does)
+    record["periods"] = periods
+    record["halted"] = halted
+    record["instructions"] = periods - 1 if halted else periods
+    record["cycles"] = record["instructions"] * CYCLES_PER_INSTRUCTION
+    record["cycles_per_s"] = record["cycles"] / record["simulate_s"] if record["simulate_s"] else None
+    record["peak_rss_mb"] = peak_rss_mb()
+    return record
+
+
+# -------------------------------------------------------------------------
+# Driver side: spawns one worker per measurement
+# -------------------------------------------------------------------------
+
+def list_programs(backend):
+    folder = os.path.join(REPO_ROOT, BACKENDS[backend.partition(":")[0]])
+    return sorted(os.path.relpath(path, folder) for path in glob.glob(os.path.join(folder, "programs", "*.dat")))
+
+
+def iss_instructions(backend, program, max_cycles):
+    """Instructions the reference model retires for the same image, for comparison."""
+    image = load_image(os.path.join(REPO_ROOT, BACKENDS[backend.partition(":")[0]], program))
+    return ISS(image).run(max_cycles)
+
+
+def benchmark(backend, program, trace, max_cycles=500, timeout=600, verbose=False):
+    """
+    Run one measurement in a fresh interpreter
+
+    Returns:
+    - A record with the fields listed in FIELDS
+    """
+    record = {"backend": backend, "program": program, "trace": trace}
+    folder = os.path.join(REPO_ROOT, BACKENDS[backend.partition(":")[0]])
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+
+    fd, result_path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    command = [
+        sys.executable, "-m", "SimpleCPUv1a_common.Benchmark",
+        "--worker", backend, program, "--result", result_path, "--max-cycles", str(max_cycles),
+    ]
+    if trace:
+        command.append("--worker-trace")
+
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(command, cwd=folder, env=env, capture_output=True, text=True, timeout=timeout)
+        record["total_s"] = time.perf_counter() - start
+        if verbose:
+            print(proc.stdout, end="")
+        if proc.returncode != 0:
+            record["status"] = "error"
+            record["error"] = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+        else:
+            with open(result_path) as f:
+                record.update(json.load(f))
+            record["status"] = "ok"
+    except subprocess.TimeoutExpired:
+        record["total_s"] = time.perf_counter() - start
+        record["status"] = "timeout"
+    finally:
+        os.remove(result_path)
+
+    record["iss_instructions"] = iss_instructions(backend, program, max_cycles)
+    return record
+
+
+def write_json(records, path):
+    with open(path, "w") as f:
+        json.dump(records, f, indent=2)
+
+
+def write_csv(records, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def print_summary(records):
+    print(f"{'Backend':<16} {'Program':<22} {'Trace':<5} {'Import':>8} {'Elab':>8} {'Reset':>8} "
+          f"{'Sim':>9} {'Instr':>6} {'Cycles/s':>10} {'RSS MB':>7}")
+    print("-" * 108)
+    for r in records:
+        if r["status"] != "ok":
+            print(f"{r['backend']:<16} {r['program']:<22} {str(r['trace']):<5} {r['status']}: {r.get('error', '')}")
+            continue
+        print(f"{r['backend']:<16} {r['program']:<22} {str(r['trace']):<5} {r['import_s']:>8.3f} "
+              f"{r['elaborate_s']:>8.3f} {r['reset_s']:>8.4f} {r['simulate_s']:>9.4f} {r['instructions']:>6} "
+              f"{r['cycles_per_s']:>10,.0f} {r['peak_rss_mb'] or 0:>7.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the SimpleCPUv1a HDL backends.")
+    parser.add_argument("--backends", nargs="+", default=DEFAULT_BACKENDS,
+                        help="backends to run, optionally with a variant (e.g. pyrtl:compiled)")
+    parser.add_argument("--programs", nargs="+", help="program paths relative to each backend folder "
+                                                      "(default: every programs/*.dat)")
+    parser.add_argument("--trace", choices=["off", "on", "both"], default="both")
+    parser.add_argument("--repeat", type=int, default=1, help="measurements per configuration")
+    parser.add_argument("--max-cycles", type=int, default=500, help="instruction-period limit per run")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds before a run is abandoned")
+    parser.add_argument("--json", help="write records to this JSON file")
+    parser.add_argument("--csv", help="write records to this CSV file")
+    parser.add_argument("--verbose", action="store_true", help="show the testbench output")
+
+    # Internal: run a single measurement in this process
+    parser.add_argument("--worker", nargs=2, metavar=("BACKEND", "PROGRAM"), help=argparse.SUPPRESS)
+    parser.add_argument("--worker-trace", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        record = run_worker(*args.worker, args.worker_trace, args.max_cycles)
+        with open(args.result, "w") as f:
+            json.dump(record, f)
+        return
+
+    for backend in args.backends:
+        try:
+            check_backend(backend)
+        except ValueError as e:
+            parser.error(str(e))
+
+    traces = {"off": [False], "on": [True], "both": [False, True]}[args.trace]
+
+    records = []
+    for backend in args.backends:
+        for program in args.programs or list_programs(backend):
+            for trace in traces:
+                for run in range(args.repeat):
+                    record = benchmark(backend, program, trace, args.max_cycles, args.timeout, args.verbose)
+                    record["run"] = run
+                    records.append(record)
+                    print(f"{backend} {program} trace={trace} run={run}: {record['status']} "
+                          f"({record['total_s']:.2f} s)", flush=True)
+
+    print()
+    print_summary(records)
+
+    if args.json:
+        write_json(records, args.json)
+    if args.csv:
+        write_csv(records, args.csv)
+
+
+if __name__ == "__main__":
+    main()
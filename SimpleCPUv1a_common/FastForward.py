@@ -0,0 +1,252 @@
+"""
+Fast-forward hybrid runs: ISS up to a hand-off point, then RTL
+
+The reference ISS executes the program up to a chosen point: an
+instruction count, a PC value (optionally its n-th visit) or a label of an
+.asm program. Its PC, ACC, IR and RAM then become a Snapshot at the start of
+a fetch stage, which is restored into the Computer of one or more backends
+(see ComputerSession.restore). The backends carry on cycle-accurately from
+there, so only the region of interest is simulated at gate level.
+
+The hand-off state is exactly the state the RTL reaches by itself after
+the same number of instructions: the IR still holds the last instruction
+executed and the halt detector's cycle count is 3 per instruction. The
+RTL's results (instruction count, cycle budget) therefore read as if it had
+run the whole program.
+
+Usage (from the repository root):
+
+    python -m SimpleCPUv1a_common.FastForward prog.asm --label region --backends myhdl pyrtl
+    python -m SimpleCPUv1a_common.FastForward SimpleCPUv1a_myhdl/programs/multiply.dat --instructions 20
+    python -m SimpleCPUv1a_common.FastForward prog.dat --pc 0x0a --hits 3 --rtl-cycles 50 --compare
+
+API:
+
+    records = hybrid_run("prog.asm", ["amaranth"], label="region", rtl_cycles=100)
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from SimpleCPUv1a_common import Snapshot
+from SimpleCPUv1a_common.AssemblyCache import assemble_cached
+from SimpleCPUv1a_common.Backends import check_backend
+from SimpleCPUv1a_common.ISS import ISS, CYCLES_PER_INSTRUCTION, DEFAULT_INSTRUCTION_LIMIT
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.Sessions import open_session, quiet, session_result
+
+DEFAULT_BACKENDS = ["amaranth", "myhdl", "pymtl", "pyrtl"]
+
+FIELDS = [
+    "backend", "status", "handoff", "PC", "ACC", "IR", "instructions", "halted", "matches_iss",
+    "iss_s", "restore_s", "rtl_s", "full_rtl_s", "error",
+]
+
+
+# -------------------------------------------------------------------------
+# ISS side
+# -------------------------------------------------------------------------
+
+def program_labels(path):
+    """Label table of an .asm program ({} for the other formats)."""
+    if os.path.splitext(path)[1].lower() != ".asm":
+        return {}
+    with open(path) as f:
+        return assemble_cached(f.read())[1]
+
+
+def fast_forward(image, instructions=None, pc=None, hits=1, max_instructions=DEFAULT_INSTRUCTION_LIMIT):
+    """
+    Run the ISS up to a hand-off point
+
+    Inputs:
+    - image: 256-word program image
+    - instructions: Stop after this many instructions, or
+    - pc: Stop when the next instruction to fetch is at this address, for
+      the hits-th time (the reset PC counts as a visit)
+    - max_instructions: Give up if the point has not been reached by then
+
+    Returns:
+    - The ISS, stopped before the instruction at the hand-off point
+    """
+    if (instructions is None) == (pc is None):
+        raise ValueError("Give exactly one of instructions or pc")
+
+    iss = ISS(image)
+    if instructions is not None:
+        iss.run(instructions)
+        if iss.instructions < instructions:
+            raise ValueError(f"The program halts after {iss.instructions} instructions, before {instructions}")
+        return iss
+
+    seen = 0
+    while True:
+        if iss.pc == pc:
+            seen += 1
+            if seen == hits:
+                return iss
+        if iss.instructions >= max_instructions or iss.run(1) == 0:
+            raise ValueError(f"PC {pc:#04x} visited {seen} of {hits} times before the program "
+                             f"{'halted' if iss.halted else 'reached the instruction limit'}")
+
+
+def iss_snapshot(iss):
+    """Snapshot blob of the ISS state, at the start of the next fetch."""
+    return Snapshot.pack(Snapshot.MachineState(
+        pc=iss.pc,
+        acc=iss.acc,
+        ir=iss.ir,
+        ring=Snapshot.FETCH,
+        cycles=iss.instructions * CYCLES_PER_INSTRUCTION,
+        ram=list(iss.ram),
+    ))
+
+
+# -------------------------------------------------------------------------
+# RTL side: one worker process per backend
+# -------------------------------------------------------------------------
+
+def _hybrid_job(backend, blob, max_cycles, image=None):
+    # The testbenches report progress on stdout; keep the driver's output readable
+    with quiet():
+        session = open_session(backend)
+        record = {}
+
+        start = time.perf_counter()
+        session.restore(blob)
+        record["restore_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = session.resume(max_cycles)
+        record["rtl_s"] = time.perf_counter() - start
+        record["instructions"], state = session_result(session, result)
+        record["halted"] = session.halted
+        record.update(state)
+        record["snapshot"] = session.snapshot()
+
+        if image is not None:
+            # The same budget from reset, for the speed-up
+            start = time.perf_counter()
+            session.run_program(image, max_cycles)
+            record["full_rtl_s"] = time.perf_counter() - start
+            record["full_snapshot"] = session.snapshot()
+        return record
+
+
+def hybrid_run(program, backends=DEFAULT_BACKENDS, instructions=None, pc=None, label=None, hits=1,
+               rtl_cycles=500, compare=False):
+    """
+    Fast-forward a program on the ISS and continue on RTL backends
+
+    Inputs:
+    - program: Program file in any Loader format, or a 256-word image
+    - backends: Backend names, optionally with a variant (e.g. "myhdl:rtl")
+    - instructions / pc / label: Hand-off point (see fast_forward); label
+      needs an .asm program
+    - hits: Visit of pc or label to hand off at
+    - rtl_cycles: Instruction periods to simulate on the RTL after the hand-off
+    - compare: Also run the whole program on the RTL, from reset, to time it
+      and check that the hybrid run ends in the same state
+
+    Returns:
+    - A record per backend with the fields in FIELDS, plus RAM, the final
+      Snapshot blob as "snapshot" and, with compare, "matches_full_rtl"
+    """
+    for backend in backends:
+        check_backend(backend)
+
+    if isinstance(program, str):
+        image = load_image(program)
+        if label is not None:
+            labels = program_labels(program)
+            if label not in labels:
+                raise ValueError(f"No label '{label}' in {program}")
+            pc = labels[label]
+    else:
+        image = list(program)
+        if label is not None:
+            raise ValueError("Labels need an .asm program file")
+
+    start = time.perf_counter()
+    iss = fast_forward(image, instructions, pc, hits)
+    iss_s = time.perf_counter() - start
+    handoff = iss.instructions
+    blob = iss_snapshot(iss)
+    max_cycles = handoff + rtl_cycles
+
+    reference = ISS(image)
+    reference.run(max_cycles)
+    expected = {"PC": reference.pc, "ACC": reference.acc, "RAM": list(reference.ram)}
+
+    context = multiprocessing.get_context("spawn")
+    pools = {backend: ProcessPoolExecutor(1, context) for backend in backends}
+    try:
+        jobs = [(backend, pools[backend].submit(_hybrid_job, backend, blob, max_cycles, image if compare else None))
+                for backend in backends]
+
+        records = []
+        for backend, future in jobs:
+            record = {"backend": backend, "handoff": handoff, "iss_s": iss_s}
+            try:
+                record.update(future.result())
+                record["status"] = "ok"
+                record["matches_iss"] = all(record[key] == value for key, value in expected.items())
+                if compare:
+                    # Every flip-flop and RAM word as the uninterrupted run left them
+                    record["matches_full_rtl"] = record.pop("full_snapshot") == record["snapshot"]
+            except Exception as e:
+                record["status"] = "error"
+                record["error"] = f"{type(e).__name__}: {e}"
+            records.append(record)
+    finally:
+        for pool in pools.values():
+            pool.shutdown(cancel_futures=True)
+
+    return records
+
+
+def print_summary(records):
+    print(f"{'Backend':<16} {'Hand-off':>8} {'PC':>4} {'ACC':>4} {'IR':>6} {'Instr':>6} {'ISS':>4} "
+          f"{'ISS s':>8} {'RTL s':>8} {'Full s':>8}")
+    print("-" * 86)
+    for r in records:
+        if r["status"] != "ok":
+            print(f"{r['backend']:<16} {r['status']}: {r.get('error', '')}")
+            continue
+        full = f"{r['full_rtl_s']:>8.3f}" if "full_rtl_s" in r else f"{'':>8}"
+        mark = "" if r.get("matches_full_rtl", True) else "  (differs from the full RTL run)"
+        print(f"{r['backend']:<16} {r['handoff']:>8} {r['PC']:>4} {r['ACC']:>4} {r['IR']:>#6x} "
+              f"{r['instructions']:>6} {'yes' if r['matches_iss'] else 'NO':>4} {r['iss_s']:>8.4f} "
+              f"{r['rtl_s']:>8.3f} {full}{mark}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a program on the ISS up to a hand-off point, then "
+                                                 "continue cycle-accurately on the HDL backends.")
+    parser.add_argument("program", help="program file (.dat, .asc, .mem, .mif or .asm)")
+    point = parser.add_mutually_exclusive_group(required=True)
+    point.add_argument("--instructions", type=int, help="hand off after this many instructions")
+    point.add_argument("--pc", type=lambda text: int(text, 0), help="hand off when the PC reaches this address")
+    point.add_argument("--label", help="hand off when the PC reaches this label (.asm programs)")
+    parser.add_argument("--hits", type=int, default=1, help="hand off at this visit of --pc or --label")
+    parser.add_argument("--backends", nargs="+", default=DEFAULT_BACKENDS,
+                        help="backends to continue on, optionally with a variant (e.g. myhdl:rtl)")
+    parser.add_argument("--rtl-cycles", type=int, default=500,
+                        help="instruction periods to simulate on the RTL after the hand-off")
+    parser.add_argument("--compare", action="store_true",
+                        help="also run the whole program on the RTL, for timing and a state check")
+    args = parser.parse_args(argv)
+
+    try:
+        records = hybrid_run(args.program, args.backends, args.instructions, args.pc, args.label, args.hits,
+                             args.rtl_cycles, args.compare)
+    except ValueError as e:
+        parser.error(str(e))
+    print_summary(records)
+
+
+if __name__ == "__main__":
+    main()
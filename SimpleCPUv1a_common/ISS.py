@@ -0,0 +1,198 @@
+from collections import namedtuple
+
+# -------------------------------------------------------------------------
+# Instruction set
+# -------------------------------------------------------------------------
+
+MOVE, ADD, SUB, AND, LOAD, STORE, ADDM, SUBM, JUMPU, JUMPZ, JUMPNZ = range(11)
+
+OPCODE_NAMES = {
+    MOVE: "MOVE", ADD: "ADD", SUB: "SUB", AND: "AND",
+    LOAD: "LOAD", STORE: "STORE", ADDM: "ADDM", SUBM: "SUBM",
+    JUMPU: "JUMPU", JUMPZ: "JUMPZ", JUMPNZ: "JUMPNZ",
+}
+
+HALT = 0xFFFF                 # Termination word watched by every testbench
+CYCLES_PER_INSTRUCTION = 3    # Fetch, decode, execute (ring counter stages)
+MEMORY_SIZE = 256
+DEFAULT_INSTRUCTION_LIMIT = 1_000_000
+
+
+InstructionRecord = namedtuple("InstructionRecord", "cycle pc ir acc next_pc ram_write")
+InstructionRecord.__doc__ = """
+One retired instruction
+
+- cycle: Clock cycle at which the instruction was fetched (reset = cycle 0)
+- pc: Address the instruction was fetched from
+- ir: 16-bit instruction word
+- acc: Accumulator after execution
+- next_pc: Program counter after execution
+- ram_write: (address, data) written by STORE, otherwise None
+"""
+
+
+def disassemble(word):
+    """Return a readable mnemonic for a 16-bit instruction word."""
+    if word == HALT:
+        return "HALT"
+    name = OPCODE_NAMES.get(word >> 12)
+    if name is None:
+        return f"NOP ({word:04X})"
+    return f"{name} {word & 0xFF}"
+
+
+class ISS:
+    """
+    Instruction-set simulator for SimpleCPUv1a
+
+    Inputs:
+    - image: 256-word program image, as returned by load_dat_file()
+
+    Behavior:
+    - Executes MOVE/ADD/SUB/AND, LOAD/STORE/ADDM/SUBM and JUMPU/JUMPZ/JUMPNZ
+      with the same results as the gate-level Computer models.
+    - Each instruction takes CYCLES_PER_INSTRUCTION clock cycles.
+    - STORE writes IR[15:12] in the upper nibble and ACC in the low byte,
+      matching the DATA_OUT bus of the RTL cpu.
+    - Unused opcodes (0xB-0xF) only advance the PC, as in the control logic.
+    - Execution stops when the fetched word is 0xFFFF.
+    """
+
+    def __init__(self, image=None):
+        self.image = list(image) if image is not None else [0] * MEMORY_SIZE
+        if len(self.image) != MEMORY_SIZE:
+            raise ValueError(f"Program image must contain {MEMORY_SIZE} words, got {len(self.image)}")
+        self.reset()
+
+    def reset(self):
+        """Restore the power-on state and reload RAM from the program image."""
+        self.ram = list(self.image)
+        self.pc = 0
+        self.acc = 0
+        self.ir = 0
+        self.instructions = 0
+        self.halted = False
+
+    def load(self, image):
+        """Replace the program image and reset."""
+        self.__init__(image)
+
+    @property
+    def cycles(self):
+        return self.instructions * CYCLES_PER_INSTRUCTION
+
+    def step(self):
+        """
+        Execute a single instruction
+
+        Returns:
+        - An InstructionRecord, or None if the fetched word is the halt word
+        """
+        if self.halted:
+            return None
+
+        pc = self.pc
+        ir = self.ram[pc]
+        if ir == HALT:
+            self.ir = ir
+            self.halted = True
+            return None
+
+        cycle = self.cycles
+        self._execute(1)
+
+        ram_write = None
+        if ir >> 12 == STORE:
+            address = ir & 0xFF
+            ram_write = (address, self.ram[address])
+
+        return InstructionRecord(cycle, pc, ir, self.acc, self.pc, ram_write)
+
+    def iter_trace(self, max_instructions=DEFAULT_INSTRUCTION_LIMIT):
+        """Generator yielding an InstructionRecord for every retired instruction."""
+        for _ in range(max_instructions):
+            record = self.step()
+            if record is None:
+                return
+            yield record
+
+    def run(self, max_instructions=DEFAULT_INSTRUCTION_LIMIT):
+        """
+        Run until the halt word is fetched or max_instructions have retired
+
+        Returns:
+        - Number of instructions retired by this call
+        """
+        if self.halted:
+            return 0
+        return self._execute(max_instructions)
+
+    def _execute(self, budget):
+        # Hot loop: architectural state is kept in locals and written back once
+        ram = self.ram
+        pc = self.pc
+        acc = self.acc
+        ir = self.ir
+        retired = 0
+
+        while retired < budget:
+            ir = ram[pc]
+            if ir == HALT:
+                self.halted = True
+                break
+
+            opcode = ir >> 12
+            operand = ir & 0xFF
+            pc = (pc + 1) & 0xFF
+
+            if opcode == MOVE:
+                acc = operand
+            elif opcode == ADD:
+                acc = (acc + operand) & 0xFF
+            elif opcode == SUB:
+                acc = (acc - operand) & 0xFF
+            elif opcode == AND:
+                acc &= operand
+            elif opcode == LOAD:
+                acc = ram[operand] & 0xFF
+            elif opcode == STORE:
+                ram[operand] = (ir & 0xF000) | acc
+            elif opcode == ADDM:
+                acc = (acc + ram[operand]) & 0xFF
+            elif opcode == SUBM:
+                acc = (acc - ram[operand]) & 0xFF
+            elif opcode == JUMPU:
+                pc = operand
+            elif opcode == JUMPZ:
+                if acc == 0:
+                    pc = operand
+            elif opcode == JUMPNZ:
+                if acc != 0:
+                    pc = operand
+
+            retired += 1
+
+        self.pc = pc
+        self.acc = acc
+        self.ir = ir
+        self.instructions += retired
+        return retired
+
+    def state(self):
+        """Architectural state as a dictionary (PC, ACC, IR, RAM)."""
+        return {
+            "PC": self.pc,
+            "ACC": self.acc,
+            "IR": self.ir,
+            "RAM": list(self.ram),
+            "instructions": self.instructions,
+            "cycles": self.cycles,
+            "halted": self.halted,
+        }
+
+
+def run_program(image, max_instructions=DEFAULT_INSTRUCTION_LIMIT):
+    """Convenience wrapper: run an image to completion and return the final ISS."""
+    iss = ISS(image)
+    iss.run(max_instructions)
+    return iss
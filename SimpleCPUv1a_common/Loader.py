@@ -0,0 +1,246 @@
+"""
+Program image loader shared by every backend
+
+Parses the outputs of simpleCPUv1a_as.py into a 256-word memory image:
+
+- .dat: "<address> <16-bit binary>" per line, decimal address
+- .asc: "<start address> <word> <word> ..." in hex, up to 16 words per line
+  (the word file, not the _high_byte/_low_byte EPROM files)
+- .mem: "@<byte address> <word>" in hex, with the four hex digits of each
+  word written in reverse order, as the assembler does
+- .mif: "<address> : <16-bit binary>;" between BEGIN and END, hex address
+- .asm: assembly source, assembled in memory through the content-addressed
+  cache in AssemblyCache.py
+
+Other parsed images are cached as raw little-endian uint16 arrays in
+image_cache/, keyed on a hash of the file's path, modification time and
+size, so a repeated run skips the text parsing entirely. The same images are
+also kept in memory for the life of the process. Assembly sources are keyed
+on their content instead, see AssemblyCache.py.
+"""
+
+import hashlib
+import os
+import sys
+from array import array
+
+MEMORY_SIZE = 256
+WORD_MASK = 0xFFFF
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "image_cache")
+
+_images = {}
+
+
+class ProgramFormatError(ValueError):
+    """A program file that cannot be turned into a memory image."""
+
+    def __init__(self, path, line_number, message):
+        where = path if line_number is None else f"{path}:{line_number}"
+        super().__init__(f"{where}: {message}")
+        self.path = path
+        self.line_number = line_number
+
+
+def _store(image, path, line_number, addr, word):
+    if not 0 <= addr < MEMORY_SIZE:
+        raise ProgramFormatError(path, line_number, f"address {addr} outside 0-{MEMORY_SIZE - 1}")
+    if not 0 <= word <= WORD_MASK:
+        raise ProgramFormatError(path, line_number, f"word {word} is not a 16-bit value")
+    image[addr] = word
+
+
+def _parse_dat(lines, path):
+    image = [0] * MEMORY_SIZE
+    for number, line in enumerate(lines, 1):
+        parts = line.split()
+        if not parts:
+            continue
+        if len(parts) != 2:
+            raise ProgramFormatError(path, number, "expected '<address> <binary word>'")
+        try:
+            addr, word = int(parts[0], 10), int(parts[1], 2)
+        except ValueError:
+            raise ProgramFormatError(path, number, f"cannot parse '{line.strip()}'") from None
+        _store(image, path, number, addr, word)
+    return image
+
+
+def _parse_asc(lines, path):
+    image = [0] * MEMORY_SIZE
+    for number, line in enumerate(lines, 1):
+        parts = line.split()
+        if not parts:
+            continue
+        if any(len(part) != 4 for part in parts[1:]):
+            raise ProgramFormatError(path, number, "expected 4-digit hex words (byte .asc files are not supported)")
+        try:
+            start = int(parts[0], 16)
+            words = [int(part, 16) for part in parts[1:]]
+        except ValueError:
+            raise ProgramFormatError(path, number, f"cannot parse '{line.strip()}'") from None
+        for offset, word in enumerate(words):
+            _store(image, path, number, start + offset, word)
+    return image
+
+
+def _parse_mem(lines, path):
+    image = [0] * MEMORY_SIZE
+    for number, line in enumerate(lines, 1):
+        parts = line.split()
+        if not parts:
+            continue
+        if len(parts) != 2 or not parts[0].startswith("@") or len(parts[1]) != 4:
+            raise ProgramFormatError(path, number, "expected '@<byte address> <word>'")
+        try:
+            byte_addr = int(parts[0][1:], 16)
+            word = int(parts[1][::-1], 16)
+        except ValueError:
+            raise ProgramFormatError(path, number, f"cannot parse '{line.strip()}'") from None
+        if byte_addr % 2:
+            raise ProgramFormatError(path, number, f"odd byte address {byte_addr:#x}")
+        _store(image, path, number, byte_addr // 2, word)
+    return image
+
+
+def _parse_mif(lines, path):
+    image = [0] * MEMORY_SIZE
+    in_content = False
+    for number, line in enumerate(lines, 1):
+        line = line.split("--")[0].strip()
+        if not in_content:
+            in_content = line.upper() == "BEGIN"
+            continue
+        if line.upper().startswith("END"):
+            break
+        if not line:
+            continue
+        addr, sep, word = line.rstrip(";").partition(":")
+        try:
+            if not sep:
+                raise ValueError
+            addr, word = int(addr, 16), int(word, 2)
+        except ValueError:
+            raise ProgramFormatError(path, number, "expected '<hex address> : <binary word>;'") from None
+        _store(image, path, number, addr, word)
+    return image
+
+
+def _parse_asm(lines, path):
+    from simpleCPUv1a_as import AssemblerError
+    from SimpleCPUv1a_common.AssemblyCache import assemble_cached
+
+    try:
+        image, labels = assemble_cached("\n".join(lines) + "\n")
+    except AssemblerError as e:
+        raise ProgramFormatError(path, None, str(e)) from None
+    return image
+
+
+FORMATS = {
+    ".dat": _parse_dat,
+    ".asc": _parse_asc,
+    ".mem": _parse_mem,
+    ".mif": _parse_mif,
+    ".asm": _parse_asm,
+}
+
+
+def parse_image(text, fmt=".dat", path="<string>"):
+    """
+    Parse the text of a program file
+
+    Inputs:
+    - text: File contents
+    - fmt: One of the FORMATS extensions
+    - path: Name used in error messages
+
+    Returns:
+    - A list of 256 16-bit words
+
+    Raises:
+    - ProgramFormatError for malformed lines, addresses outside memory or
+      words wider than 16 bits
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown program format '{fmt}', expected one of {', '.join(FORMATS)}")
+    return FORMATS[fmt](text.splitlines(), path)
+
+
+def _cache_key(path, stat):
+    return hashlib.sha256(f"{path}\0{stat.st_mtime_ns}\0{stat.st_size}".encode()).hexdigest()[:32]
+
+
+def read_image_file(cache_file):
+    """Read a 512-byte binary image, or return None if it is missing or short."""
+    words = array("H")
+    try:
+        with open(cache_file, "rb") as f:
+            words.fromfile(f, MEMORY_SIZE)
+    except (OSError, EOFError):
+        return None
+    if sys.byteorder != "little":
+        words.byteswap()
+    return words.tolist()
+
+
+def write_image_file(cache_file, image):
+    """Write an image as 256 little-endian uint16 words, replacing the file atomically."""
+    words = array("H", image)
+    if sys.byteorder != "little":
+        words.byteswap()
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(tmp_file, "wb") as f:
+            words.tofile(f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        # A read-only checkout still loads programs, just without the cache
+        pass
+
+
+def load_image(path, cache=True, cache_dir=CACHE_DIR):
+    """
+    Load a program file into a 256-word memory image
+
+    Inputs:
+    - path: .dat, .asc, .mem, .mif or .asm file
+    - cache: Reuse and update the binary image cache. Ignored for .asm
+      files, which always go through the assembly cache
+    - cache_dir: Directory holding the cached images
+
+    Returns:
+    - A new list of 256 16-bit words
+
+    Raises:
+    - FileNotFoundError if the file does not exist
+    - ProgramFormatError if it cannot be parsed
+    """
+    path = os.path.abspath(path)
+    fmt = os.path.splitext(path)[1].lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown program format '{fmt}', expected one of {', '.join(FORMATS)}")
+
+    stat = os.stat(path)
+    key = _cache_key(path, stat)
+    if fmt == ".asm":
+        # Assembly is cached on its content (and the assembler's) instead
+        cache = False
+
+    if cache:
+        if key in _images:
+            return list(_images[key])
+        cache_file = os.path.join(cache_dir, key + ".bin")
+        image = read_image_file(cache_file)
+        if image is not None:
+            _images[key] = tuple(image)
+            return image
+
+    with open(path) as f:
+        image = FORMATS[fmt](f.read().splitlines(), path)
+
+    if cache:
+        write_image_file(cache_file, image)
+        _images[key] = tuple(image)
+    return image
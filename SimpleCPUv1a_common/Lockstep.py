@@ -0,0 +1,347 @@
+"""
+Differential lockstep co-simulation of the backends
+
+Runs the same program on several backends at once, each in its own process,
+and compares PC/ACC/IR/ADDR cycle by cycle against each other and against
+the reference ISS. The run stops at the first cycle where they disagree, so
+a divergence is found without writing or diffing full VCD files.
+
+Each worker drives its backend's Computer testbench with a recorder in place
+of the streaming VCDWriter (the same per-cycle sample(cycle, values) hook),
+and hands the samples to the driver in chunks. A worker waits for the
+driver's go-ahead after every chunk, so no backend runs more than one chunk
+ahead of the comparison.
+
+Cycles are counted from the first clock after reset; the testbenches record
+a different number of samples while reset is held, which are dropped. In
+that numbering, instruction i is fetched at cycle 3i+1, its IR and ACC are
+visible at cycle 3i+3 and the next PC at cycle 3i+4; those are the cycles
+the ISS is compared at. Every other value is compared to the majority of
+the backends.
+
+Usage (from the repository root):
+
+    python -m SimpleCPUv1a_common.Lockstep SimpleCPUv1a_myhdl/programs/multiply.dat
+    python -m SimpleCPUv1a_common.Lockstep prog.dat --backends amaranth pyrtl:compiled --no-iss
+"""
+
+import argparse
+import importlib
+import multiprocessing
+import os
+import sys
+from collections import Counter, deque, namedtuple
+
+from SimpleCPUv1a_common.Backends import BACKENDS, REPO_ROOT, check_backend
+from SimpleCPUv1a_common.ISS import ISS, CYCLES_PER_INSTRUCTION, disassemble
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.Sessions import STANDALONE, quiet
+
+DEFAULT_BACKENDS = ["amaranth", "myhdl", "pymtl", "pyrtl"]
+SIGNALS = ["PC", "ACC", "IR", "ADDR"]
+
+# Samples each testbench records while reset is held
+RESET_SAMPLES = {
+    "amaranth": 2,
+    "myhdl": 1,
+    "pymtl": 0,
+    "pyrtl": 0,
+}
+
+# Format of a divergence:
+# - cycle: Clock cycle after reset
+# - instruction: ISS InstructionRecord in flight at that cycle, or None
+# - expected: {signal: value} from the ISS where it applies, otherwise the majority
+# - values: {source: {signal: value}}, for every backend and "iss" when it applies
+# - mismatched: Sources that differ from expected
+# - history: {source: [(cycle, {signal: value}), ...]} for the cycles before
+Divergence = namedtuple("Divergence", "cycle instruction expected values mismatched history")
+
+# Format of a result:
+# - cycles: Cycles compared without a difference
+# - divergence: Divergence, or None when every source agreed
+LockstepResult = namedtuple("LockstepResult", "cycles divergence")
+
+
+class _Stopped(Exception):
+    """Raised inside a worker when the driver has seen enough."""
+
+
+# -------------------------------------------------------------------------
+# Worker side: runs one backend, streaming samples to the driver
+# -------------------------------------------------------------------------
+
+class _Recorder:
+    """Stands in for a VCDWriter and sends every chunk of samples to the driver."""
+
+    def __init__(self, conn, names, chunk):
+        self.names = names
+        self._conn = conn
+        self._chunk = chunk
+        self._rows = []
+
+    def sample(self, cycle, values):
+        self._rows.append(tuple(int(value) for value in values))
+        if len(self._rows) >= self._chunk:
+            self.flush()
+
+    def flush(self):
+        self._conn.send(("rows", self._rows))
+        self._rows = []
+        if not self._conn.recv():
+            raise _Stopped()
+
+    def close(self):
+        pass
+
+
+def _run_amaranth(tb, option, program, max_cycles, recorder):
+    mem = tb.load_dat_file(program)
+    dut = tb.TopModule(mem)
+    sim = tb.Simulator(dut)
+    sim.add_clock(1e-6)
+
+    async def bench(ctx):
+        await tb.execute(ctx, dut, max_cycles)
+
+    sim.add_testbench(bench)
+    sim.add_testbench(tb.vcd_sampler(dut, recorder), background=True)
+    sim.run()
+
+
+def _run_myhdl(tb, option, program, max_cycles, recorder):
+    top = tb.Computer(program, max_cycles, vcd=recorder, model=option or "gate")
+    try:
+        top.run_sim(quiet=1)
+    finally:
+        top.quit_sim()
+
+
+def _run_pymtl(tb, option, program, max_cycles, recorder):
+    dut = tb.setup_test(False, program, option or "python")
+    tb.reset_computer(dut)
+    tb.run_computer(dut, max_cycles, recorder)
+
+
+def _run_pyrtl(tb, option, program, max_cycles, recorder):
+    sim, _ = tb.setup_sim(program, option or "interpreted", False)
+    tb.reset_computer(sim)
+    tb.run_computer(sim, max_cycles, recorder)
+
+
+RUNNERS = {
+    "amaranth": _run_amaranth,
+    "myhdl": _run_myhdl,
+    "pymtl": _run_pymtl,
+    "pyrtl": _run_pyrtl,
+}
+
+
+def _worker(backend, program, max_cycles, signals, chunk, conn):
+    name, _, option = backend.partition(":")
+    sys.path.insert(0, os.path.join(REPO_ROOT, BACKENDS[name]))
+
+    try:
+        # The testbenches report progress on stdout; keep the driver's output readable
+        with quiet():
+            tb = importlib.import_module("tests.TestComputer")
+            recorder = _Recorder(conn, signals, chunk)
+            RUNNERS[name](tb, option, program, max_cycles, recorder)
+            recorder.flush()
+        conn.send(("done", None))
+    except _Stopped:
+        pass
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+# -------------------------------------------------------------------------
+# Driver side
+# -------------------------------------------------------------------------
+
+def iss_expectations(image, signals, max_cycles):
+    """
+    Per-cycle values the ISS defines
+
+    Returns:
+    - ({cycle: {signal: value}}, {cycle: InstructionRecord in flight})
+    """
+    expected, in_flight = {}, {}
+    for i, record in enumerate(ISS(image).iter_trace(max_cycles)):
+        execute = CYCLES_PER_INSTRUCTION * (i + 1)
+        for cycle in range(execute - 2, execute + 1):
+            in_flight[cycle] = record
+        for cycle, signal, value in ((execute, "IR", record.ir), (execute, "ACC", record.acc),
+                                     (execute + 1, "PC", record.next_pc)):
+            if signal in signals:
+                expected.setdefault(cycle, {})[signal] = value
+    return expected, in_flight
+
+
+def _compare(rows, signals, iss):
+    """Reference values for one cycle and the sources that differ from them."""
+    expected, values = {}, {backend: dict(zip(signals, row)) for backend, row in rows.items()}
+    for i, signal in enumerate(signals):
+        if signal in iss:
+            expected[signal] = iss[signal]
+        else:
+            expected[signal] = Counter(row[i] for row in rows.values()).most_common(1)[0][0]
+    if iss:
+        values["iss"] = dict(iss)
+
+    mismatched = [source for source, row in values.items()
+                  if any(row[signal] != expected[signal] for signal in row)]
+    return expected, values, mismatched
+
+
+def cosimulate(program, backends=DEFAULT_BACKENDS, max_cycles=500, signals=SIGNALS, iss=True,
+               chunk=256, history=6):
+    """
+    Run a program on several backends in lockstep
+
+    Inputs:
+    - program: Program file in any Loader format
+    - backends: Backend names, optionally with a variant (e.g. "myhdl:rtl")
+    - max_cycles: Instruction-period budget for each backend
+    - signals: Architectural signals to compare (see VCDWriter.SIGNAL_WIDTHS)
+    - iss: Also compare against the reference ISS
+    - chunk: Cycles each backend may run ahead of the comparison
+    - history: Cycles kept before a divergence, for context
+
+    Returns:
+    - LockstepResult
+    """
+    for backend in backends:
+        check_backend(backend)
+        if backend in STANDALONE:
+            raise ValueError(f"{backend} does not run on the {backend.partition(':')[0]} testbench "
+                             f"and cannot be sampled cycle by cycle")
+
+    program = os.path.abspath(program)
+    expected, in_flight = iss_expectations(load_image(program), signals, max_cycles) if iss else ({}, {})
+
+    context = multiprocessing.get_context("spawn")
+    workers = {}
+    for backend in backends:
+        conn, child = context.Pipe()
+        process = context.Process(target=_worker, args=(backend, program, max_cycles, signals, chunk, child),
+                                  daemon=True)
+        process.start()
+        child.close()
+        workers[backend] = (process, conn)
+
+    pending = {backend: deque() for backend in backends}
+    skip = {backend: RESET_SAMPLES[backend.partition(":")[0]] for backend in backends}
+    running = set(backends)
+    recent = deque(maxlen=history)
+    cycle = 0
+    divergence = None
+
+    try:
+        while divergence is None:
+            # Top up every running backend that has nothing left to compare
+            for backend in backends:
+                if backend in running and not pending[backend]:
+                    conn = workers[backend][1]
+                    kind, payload = conn.recv()
+                    if kind == "error":
+                        raise RuntimeError(f"{backend}: {payload}")
+                    if kind == "done":
+                        running.discard(backend)
+                        continue
+                    pending[backend].extend(payload[skip[backend]:])
+                    skip[backend] = max(0, skip[backend] - len(payload))
+                    conn.send(True)
+
+            # Compare every cycle all backends have reached; the comparison
+            # ends with the shortest run
+            if not all(pending[backend] for backend in backends):
+                if any(backend not in running and not pending[backend] for backend in backends):
+                    break
+                continue
+
+            while divergence is None and all(pending[backend] for backend in backends):
+                rows = {backend: pending[backend].popleft() for backend in backends}
+                reference, values, mismatched = _compare(rows, signals, expected.get(cycle, {}))
+                if mismatched:
+                    divergence = Divergence(cycle, in_flight.get(cycle), reference, values, mismatched,
+                                            {source: [(c, row[source]) for c, row in recent if source in row]
+                                             for source in values})
+                else:
+                    recent.append((cycle, values))
+                    cycle += 1
+    finally:
+        # Workers stop at their next chunk; keep the pipes open until they have
+        for process, conn in workers.values():
+            if process.is_alive():
+                try:
+                    conn.send(False)
+                except OSError:
+                    pass
+        for process, conn in workers.values():
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+            conn.close()
+
+    return LockstepResult(cycle, divergence)
+
+
+def format_divergence(divergence, signals=SIGNALS):
+    """Table of the cycles leading up to a divergence, one row per source and cycle."""
+    lines = []
+    record = divergence.instruction
+    if record is not None:
+        lines.append(f"First divergence at cycle {divergence.cycle}, executing {disassemble(record.ir)} "
+                     f"at PC {record.pc} (instruction fetched at cycle {record.cycle + 1})")
+    else:
+        lines.append(f"First divergence at cycle {divergence.cycle}")
+    lines.append(f"Differs: {', '.join(divergence.mismatched)}")
+    lines.append("")
+
+    width = max(len(source) for source in divergence.values)
+    lines.append(f"{'Cycle':>6}  {'Source':<{width}}  " + "  ".join(f"{signal:>6}" for signal in signals))
+    for source, rows in divergence.history.items():
+        for cycle, row in rows:
+            lines.append(f"{cycle:>6}  {source:<{width}}  " + "  ".join(_cell(row, signal) for signal in signals))
+    for source, row in divergence.values.items():
+        mark = " <" if source in divergence.mismatched else ""
+        lines.append(f"{divergence.cycle:>6}  {source:<{width}}  "
+                     + "  ".join(_cell(row, signal) for signal in signals) + mark)
+    return "\n".join(lines)
+
+
+def _cell(row, signal):
+    return f"{row[signal]:>#6x}" if signal in row else f"{'':>6}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a program on several backends in lockstep and report "
+                                                 "the first cycle where they diverge.")
+    parser.add_argument("program", help="program file (.dat, .asc, .mem, .mif or .asm)")
+    parser.add_argument("--backends", nargs="+", default=DEFAULT_BACKENDS,
+                        help="backends to run, optionally with a variant (e.g. myhdl:rtl)")
+    parser.add_argument("--signals", nargs="+", default=SIGNALS, help="signals to compare")
+    parser.add_argument("--max-cycles", type=int, default=500, help="instruction-period limit per backend")
+    parser.add_argument("--no-iss", action="store_true", help="only compare the backends with each other")
+    parser.add_argument("--history", type=int, default=6, help="cycles to show before a divergence")
+    args = parser.parse_args(argv)
+
+    try:
+        result = cosimulate(args.program, args.backends, args.max_cycles, args.signals, not args.no_iss,
+                            history=args.history)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if result.divergence is None:
+        print(f"No divergence in {result.cycles} cycles ({', '.join(args.backends)}"
+              f"{'' if args.no_iss else ' and the ISS'})")
+    else:
+        print(format_divergence(result.divergence, args.signals))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
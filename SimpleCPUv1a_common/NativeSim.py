@@ -0,0 +1,1197 @@
+"""
+Native C simulator generated from the Yosys netlist (HDLs/cpu.v)
+
+HDLs/cpu.v is the Amaranth Cpu written out by Yosys: 96 modules of
+assigns, submodule instances and one flip-flop per state bit. This module
+compiles it into a shared library with a small netlist-to-C emitter, and
+drives the library through ctypes:
+
+- parse_netlist() reads the structural Verilog subset Yosys writes (wire/
+  reg declarations, assign with bitwise operators, selects, concatenations
+  and ?:, named port connections, always @(posedge clk) flip-flops and
+  their always @* next-state blocks).
+- Netlist flattens the hierarchy from the top module and bit-blasts it:
+  every net bit becomes a node of a gate graph (NOT, AND, OR, XOR, MUX),
+  with constants folded and wires that only rename another net removed.
+- emit_c() writes the graph as straight-line C in dependency order, with a
+  RAM wired to the Cpu ports the way computer/Computer.py wires RAM256x16
+  (combinational read, write at the clock edge while RAM_WR is high).
+- build_library() compiles that C with the system C compiler (CC, default
+  gcc) into native_cache/<hash of the C source>, so the compiler only runs
+  again when the netlist or the emitter changes.
+
+The library exports sim_new/sim_free, sim_reset, sim_step, sim_peek and
+sim_poke, plus RAM and signal-table access; see the C header emitted at the
+top of the source. NativeCpu wraps one instance, and NativeSession is a
+ComputerSession with the same run_program/state/snapshot/restore/resume
+methods as the backends' testbenches, selected as the "amaranth:native"
+backend by the shared tools.
+
+Usage (from the repository root):
+
+    python -m SimpleCPUv1a_common.NativeSim SimpleCPUv1a_amaranth/programs/multiply.dat
+    python -m SimpleCPUv1a_common.NativeSim --emit cpu.c
+
+API:
+
+    cpu = NativeCpu()
+    cpu.load(load_image("prog.asm"))
+    cpu.reset()
+    cpu.step(300)
+    cpu.peek("PC"), cpu.peek("controlLogic.RAM_WR")
+"""
+
+import argparse
+import ctypes
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+
+from SimpleCPUv1a_common import Snapshot
+from SimpleCPUv1a_common.Backends import REPO_ROOT
+from SimpleCPUv1a_common.ISS import CYCLES_PER_INSTRUCTION, HALT
+from SimpleCPUv1a_common.Loader import load_image
+
+NETLIST = os.path.join(REPO_ROOT, "HDLs", "cpu.v")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "native_cache")
+
+# Top-level ports of the Cpu, and the Computer around it
+CLOCK = "clk"
+RESET = "rst"
+MEMORY = {"addr": "ADDR", "data_out": "DATA_OUT", "data_in": "DATA_IN", "write": "RAM_WR"}
+HALT_SIGNAL = "register16_IR.Q"
+
+# Architectural registers of the Cpu, by the instances that hold them (the
+# top module only has Yosys-numbered wires such as Q$30 for their outputs)
+ALIASES = {"PC": "counter_PC.Q", "ACC": "register8_ACC.Q", "IR": "register16_IR.Q", "RING": "controlLogic.rc.Q"}
+
+
+class NetlistError(ValueError):
+    """A netlist outside the Verilog subset this emitter understands."""
+
+
+# -------------------------------------------------------------------------
+# Parser
+# -------------------------------------------------------------------------
+
+_TOKEN = re.compile(r"""
+    \s+
+  | (?P<escaped>\\\S+)
+  | (?P<number>\d+'[bdhBDH][0-9a-fA-F_]+|\d+)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<op><=|\S)
+""", re.VERBOSE)
+
+_BASES = {"b": 2, "d": 10, "h": 16}
+
+
+class Module:
+    """
+    One parsed module
+
+    - ports: Port names in header order
+    - directions: Port name -> "input" / "output"
+    - ranges: Net name -> (msb, lsb)
+    - inits: Reg name -> initial value
+    - assigns: (lvalue, expression) pairs
+    - flops: Statements of the always @(posedge clk) blocks
+    - blocks: Statements of the always @* blocks
+    - instances: (module name, instance name, {port: expression})
+    """
+
+    def __init__(self, name, ports):
+        self.name = name
+        self.ports = ports
+        self.directions = {}
+        self.ranges = {}
+        self.inits = {}
+        self.assigns = []
+        self.flops = []
+        self.blocks = []
+        self.instances = []
+
+
+def _tokenize(text):
+    # Attributes and comments carry no logic
+    text = re.sub(r"\(\*.*?\*\)", " ", text, flags=re.DOTALL)
+    text = re.sub(r"/\*.*?\*/", " ", text, flags=re.DOTALL)
+    text = re.sub(r"//[^\n]*", " ", text)
+
+    tokens = []
+    for match in _TOKEN.finditer(text):
+        kind = match.lastgroup
+        if kind == "escaped":
+            tokens.append(("name", match.group()[1:]))
+        elif kind is not None:
+            tokens.append((kind, match.group()))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text):
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][1] if self.pos < len(self.tokens) else None
+
+    def next(self):
+        if self.pos >= len(self.tokens):
+            raise NetlistError("Unexpected end of netlist")
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def expect(self, value):
+        kind, token = self.next()
+        if token != value:
+            raise NetlistError(f"Expected '{value}', found '{token}'")
+
+    def name(self):
+        kind, token = self.next()
+        if kind != "name":
+            raise NetlistError(f"Expected a name, found '{token}'")
+        return token
+
+    def accept(self, value):
+        if self.peek() == value:
+            self.pos += 1
+            return True
+        return False
+
+    def number(self):
+        kind, token = self.next()
+        if kind != "number":
+            raise NetlistError(f"Expected a number, found '{token}'")
+        return int(token)
+
+    # Modules and items
+
+    def modules(self):
+        modules = {}
+        while self.peek() is not None:
+            self.expect("module")
+            module = self.module()
+            modules[module.name] = module
+        return modules
+
+    def module(self):
+        name = self.name()
+        ports = []
+        self.expect("(")
+        while not self.accept(")"):
+            ports.append(self.name())
+            self.accept(",")
+        self.expect(";")
+        module = Module(name, ports)
+
+        while not self.accept("endmodule"):
+            keyword = self.peek()
+            if keyword in ("input", "output", "inout"):
+                self.next()
+                self.declaration(module, direction=keyword)
+            elif keyword == "wire":
+                self.next()
+                self.declaration(module)
+            elif keyword == "reg":
+                self.next()
+                self.declaration(module, reg=True)
+            elif keyword == "assign":
+                self.next()
+                lhs = self.expression()
+                self.expect("=")
+                module.assigns.append((lhs, self.expression()))
+                self.expect(";")
+            elif keyword == "always":
+                self.next()
+                self.always(module)
+            else:
+                self.instance(module)
+        return module
+
+    def range(self):
+        if not self.accept("["):
+            return (0, 0)
+        msb = self.number()
+        self.expect(":")
+        lsb = self.number()
+        self.expect("]")
+        return (msb, lsb)
+
+    def declaration(self, module, direction=None, reg=False):
+        bits = self.range()
+        while True:
+            name = self.name()
+            module.ranges[name] = bits
+            if direction is not None:
+                module.directions[name] = "input" if direction == "input" else "output"
+            if self.accept("="):
+                value = self.expression()
+                if reg:
+                    if value[0] != "const":
+                        raise NetlistError(f"Initial value of {name} is not a constant")
+                    module.inits[name] = value[1]
+                else:
+                    module.assigns.append((("ref", name), value))
+            if not self.accept(","):
+                break
+        self.expect(";")
+
+    def always(self, module):
+        self.expect("@")
+        if self.accept("*"):
+            module.blocks.append(self.statement())
+            return
+        self.expect("(")
+        if self.next()[1] != "posedge":
+            raise NetlistError("Only always @(posedge ...) and always @* blocks are supported")
+        self.name()
+        self.expect(")")
+        module.flops.append(self.statement())
+
+    def instance(self, module):
+        kind = self.name()
+        name = self.name()
+        connections = {}
+        self.expect("(")
+        while not self.accept(")"):
+            self.expect(".")
+            port = self.name()
+            self.expect("(")
+            if not self.accept(")"):
+                connections[port] = self.expression()
+                self.expect(")")
+            self.accept(",")
+        self.expect(";")
+        module.instances.append((kind, name, connections))
+
+    # Procedural statements: ("block", [...]), ("if", cond, then, else), ("set", lhs, rhs)
+
+    def statement(self):
+        if self.accept("begin"):
+            statements = []
+            while not self.accept("end"):
+                statements.append(self.statement())
+            return ("block", statements)
+        if self.accept("if"):
+            self.expect("(")
+            condition = self.expression()
+            self.expect(")")
+            then = self.statement()
+            otherwise = self.statement() if self.accept("else") else ("block", [])
+            return ("if", condition, then, otherwise)
+        lhs = self.primary()
+        if not (self.accept("=") or self.accept("<=")):
+            raise NetlistError(f"Unsupported statement at '{self.peek()}'")
+        rhs = self.expression()
+        self.expect(";")
+        return ("set", lhs, rhs)
+
+    # Expressions, by increasing precedence: ?:, |, ^, &, unary
+
+    def expression(self):
+        condition = self.binary(0)
+        if self.accept("?"):
+            then = self.expression()
+            self.expect(":")
+            return ("?", condition, then, self.expression())
+        return condition
+
+    _LEVELS = ["|", "^", "&"]
+
+    def binary(self, level):
+        if level == len(self._LEVELS):
+            return self.unary()
+        op = self._LEVELS[level]
+        left = self.binary(level + 1)
+        while self.accept(op):
+            left = (op, left, self.binary(level + 1))
+        return left
+
+    def unary(self):
+        for op in ("~", "!"):
+            if self.accept(op):
+                return (op, self.unary())
+        return self.primary()
+
+    def primary(self):
+        if self.accept("("):
+            value = self.expression()
+            self.expect(")")
+            return value
+        if self.accept("{"):
+            parts = [self.expression()]
+            while self.accept(","):
+                parts.append(self.expression())
+            self.expect("}")
+            return ("concat", parts)
+        kind, token = self.next()
+        if kind == "number":
+            if "'" not in token:
+                return ("const", int(token), 32)
+            width, value = token.split("'")
+            return ("const", int(value[1:].replace("_", ""), _BASES[value[0].lower()]), int(width))
+        if kind != "name":
+            raise NetlistError(f"Unexpected '{token}' in expression")
+        if self.accept("["):
+            msb = self.number()
+            lsb = self.number() if self.accept(":") else msb
+            self.expect("]")
+            return ("select", token, msb, lsb)
+        return ("ref", token)
+
+
+def parse_netlist(text):
+    """Verilog text -> {module name: Module}."""
+    return _Parser(text).modules()
+
+
+# -------------------------------------------------------------------------
+# Flattening and bit-blasting
+# -------------------------------------------------------------------------
+
+class Netlist:
+    """
+    Flattened, bit-level gate graph of one top module
+
+    Every node is a tuple, shared by everything that computes the same
+    function of the same inputs:
+
+    - ("const", bit), ("state", flip-flop index), ("input", port, bit)
+    - ("not", a), ("and", a, b), ("or", a, b), ("xor", a, b), ("mux", sel, a, b)
+      (sel ? a : b), where a, b and sel are node numbers
+
+    Attributes:
+    - nodes: Node tuples; a node's operands always come before it
+    - flops: (hierarchical name, bit, next-state node, initial value) per
+      flip-flop, in state index order
+    - signals: Hierarchical net name -> node per bit, LSB first
+    """
+
+    def __init__(self, modules, top):
+        if top not in modules:
+            raise NetlistError(f"No module named {top}")
+        self.modules = modules
+        self.top = modules[top]
+        self.nodes = []
+        self._numbers = {}
+
+        # Format: (instance path, net, bit) -> unresolved driver expression
+        self._drivers = {}
+        # Format: (instance path, net, bit) -> flip-flop index
+        self._state = {}
+        self._next = []
+        self._nets = {}
+        self._instantiate(self.top, ())
+
+        self._resolved = {}
+        self._pending = set()
+        self.flops = [(name, bit, self._resolve(expr), init) for name, bit, expr, init in self._next]
+        self.signals = {}
+        for path, module in self._nets.items():
+            for net, (msb, lsb) in module.ranges.items():
+                if net.startswith("$"):
+                    continue
+                name = ".".join(path + (net,))
+                self.signals[name] = [self._net(path, module, net, bit) for bit in range(msb - lsb + 1)]
+
+    # Node construction, with constant folding
+
+    def node(self, *op):
+        number = self._numbers.get(op)
+        if number is None:
+            number = self._numbers[op] = len(self.nodes)
+            self.nodes.append(op)
+        return number
+
+    def const(self, bit):
+        return self.node("const", bit)
+
+    def _value(self, a):
+        op = self.nodes[a]
+        return op[1] if op[0] == "const" else None
+
+    def op_not(self, a):
+        value = self._value(a)
+        if value is not None:
+            return self.const(1 - value)
+        if self.nodes[a][0] == "not":
+            return self.nodes[a][1]
+        return self.node("not", a)
+
+    def op_and(self, a, b):
+        va, vb = self._value(a), self._value(b)
+        if va == 0 or vb == 0:
+            return self.const(0)
+        if va == 1 or a == b:
+            return b
+        if vb == 1:
+            return a
+        return self.node("and", min(a, b), max(a, b))
+
+    def op_or(self, a, b):
+        va, vb = self._value(a), self._value(b)
+        if va == 1 or vb == 1:
+            return self.const(1)
+        if va == 0 or a == b:
+            return b
+        if vb == 0:
+            return a
+        return self.node("or", min(a, b), max(a, b))
+
+    def op_xor(self, a, b):
+        va, vb = self._value(a), self._value(b)
+        if va is not None:
+            return b if va == 0 else self.op_not(b)
+        if vb is not None:
+            return a if vb == 0 else self.op_not(a)
+        if a == b:
+            return self.const(0)
+        return self.node("xor", min(a, b), max(a, b))
+
+    def op_mux(self, sel, a, b):
+        value = self._value(sel)
+        if value is not None:
+            return a if value else b
+        if a == b:
+            return a
+        va, vb = self._value(a), self._value(b)
+        if (va, vb) == (1, 0):
+            return sel
+        if (va, vb) == (0, 1):
+            return self.op_not(sel)
+        return self.node("mux", sel, a, b)
+
+    # Elaboration: unresolved drivers are small trees over ("net", key) leaves
+
+    def _instantiate(self, module, path):
+        self._nets[path] = module
+        for lhs, rhs in module.assigns:
+            self._drive(path, module, lhs, self._bits(path, module, rhs))
+
+        for statement in module.blocks:
+            env = {}
+            self._execute(path, module, statement, env, blocking=True)
+            for key, expr in env.items():
+                self._set_driver(key, expr)
+
+        for statement in module.flops:
+            env = {}
+            self._execute(path, module, statement, env, blocking=False)
+            for key, expr in env.items():
+                _, net, bit = key
+                if key in self._state:
+                    raise NetlistError(f"{'.'.join(path + (net,))} is clocked by two always blocks")
+                self._state[key] = len(self._next)
+                init = module.inits.get(net, 0) >> bit & 1
+                self._next.append((".".join(path + (net,)), bit, expr, init))
+                self._set_driver(key, ("state", self._state[key]))
+
+        for kind, name, connections in module.instances:
+            if kind not in self.modules:
+                raise NetlistError(f"Instance {name} of unknown module {kind}")
+            child = self.modules[kind]
+            inner = path + (name,)
+            for port, expr in connections.items():
+                direction = child.directions.get(port)
+                if direction == "input":
+                    width = self._width(child, port)
+                    bits = self._fit(self._bits(path, module, expr), width)
+                    for bit, value in enumerate(bits):
+                        self._set_driver((inner, port, bit), value)
+                elif direction == "output":
+                    width = self._width(child, port)
+                    self._drive(path, module, expr, [("net", (inner, port, bit)) for bit in range(width)])
+                else:
+                    raise NetlistError(f"{kind} has no port {port}")
+            self._instantiate(child, inner)
+
+        if not path:
+            # Top-level inputs are the leaves of the graph
+            for port in module.ports:
+                if module.directions.get(port) == "input":
+                    for bit in range(self._width(module, port)):
+                        self._set_driver(((), port, bit), ("input", port, bit))
+
+    def _set_driver(self, key, expr):
+        if key in self._drivers:
+            path, net, bit = key
+            raise NetlistError(f"{'.'.join(path + (net,))}[{bit}] has two drivers")
+        self._drivers[key] = expr
+
+    @staticmethod
+    def _width(module, net):
+        if net not in module.ranges:
+            raise NetlistError(f"{net} is not declared in {module.name}")
+        msb, lsb = module.ranges[net]
+        return msb - lsb + 1
+
+    @staticmethod
+    def _fit(bits, width):
+        return (bits + [("const", 0)] * width)[:width]
+
+    def _targets(self, path, module, lvalue):
+        # Net bits an lvalue names, LSB first
+        kind = lvalue[0]
+        if kind == "ref":
+            return [(path, lvalue[1], bit) for bit in range(self._width(module, lvalue[1]))]
+        if kind == "select":
+            _, net, msb, lsb = lvalue
+            low = module.ranges[net][1] if net in module.ranges else 0
+            return [(path, net, bit - low) for bit in range(lsb, msb + 1)]
+        if kind == "concat":
+            bits = []
+            for part in reversed(lvalue[1]):
+                bits += self._targets(path, module, part)
+            return bits
+        raise NetlistError(f"Cannot assign to {lvalue}")
+
+    def _drive(self, path, module, lvalue, bits):
+        targets = self._targets(path, module, lvalue)
+        for key, value in zip(targets, self._fit(bits, len(targets))):
+            self._set_driver(key, value)
+
+    def _bits(self, path, module, expr, env=None):
+        # Expression -> driver trees per bit, LSB first
+        kind = expr[0]
+        if kind == "const":
+            _, value, width = expr
+            return [("const", value >> bit & 1) for bit in range(width)]
+        if kind in ("ref", "select"):
+            keys = self._targets(path, module, expr)
+            if env is None:
+                return [("net", key) for key in keys]
+            return [env.get(key, ("net", key)) for key in keys]
+        if kind == "concat":
+            bits = []
+            for part in reversed(expr[1]):
+                bits += self._bits(path, module, part, env)
+            return bits
+        if kind == "~":
+            return [("not", a) for a in self._bits(path, module, expr[1], env)]
+        if kind == "!":
+            return [("not", self._any(self._bits(path, module, expr[1], env)))]
+        if kind in ("&", "|", "^"):
+            a = self._bits(path, module, expr[1], env)
+            b = self._bits(path, module, expr[2], env)
+            width = max(len(a), len(b))
+            return [(kind, x, y) for x, y in zip(self._fit(a, width), self._fit(b, width))]
+        if kind == "?":
+            sel = self._any(self._bits(path, module, expr[1], env))
+            a = self._bits(path, module, expr[2], env)
+            b = self._bits(path, module, expr[3], env)
+            width = max(len(a), len(b))
+            return [("?", sel, x, y) for x, y in zip(self._fit(a, width), self._fit(b, width))]
+        raise NetlistError(f"Unsupported expression {expr}")
+
+    @staticmethod
+    def _any(bits):
+        # Reduction OR, for conditions and logical NOT
+        result = bits[0]
+        for bit in bits[1:]:
+            result = ("|", result, bit)
+        return result
+
+    def _execute(self, path, module, statement, env, blocking):
+        kind = statement[0]
+        if kind == "block":
+            for inner in statement[1]:
+                self._execute(path, module, inner, env, blocking)
+        elif kind == "set":
+            _, lhs, rhs = statement
+            targets = self._targets(path, module, lhs)
+            bits = self._fit(self._bits(path, module, rhs, env if blocking else None), len(targets))
+            env.update(zip(targets, bits))
+        elif kind == "if":
+            _, condition, then, otherwise = statement
+            sel = self._any(self._bits(path, module, condition, env if blocking else None))
+            taken, skipped = dict(env), dict(env)
+            self._execute(path, module, then, taken, blocking)
+            self._execute(path, module, otherwise, skipped, blocking)
+            for key in set(taken) | set(skipped):
+                # A bit one branch leaves alone keeps its previous value
+                held = env.get(key, ("net", key))
+                env[key] = ("?", sel, taken.get(key, held), skipped.get(key, held))
+
+    # Resolution of driver trees into nodes
+
+    def _net(self, path, module, net, bit):
+        return self._resolve(("net", (path, net, bit)))
+
+    def _resolve(self, expr):
+        kind = expr[0]
+        if kind == "net":
+            key = expr[1]
+            number = self._resolved.get(key)
+            if number is not None:
+                return number
+            path, net, bit = key
+            if key in self._pending:
+                raise NetlistError(f"Combinational loop through {'.'.join(path + (net,))}[{bit}]")
+            driver = self._drivers.get(key)
+            if driver is None:
+                module = self._nets[path]
+                if net not in module.inits:
+                    raise NetlistError(f"{'.'.join(path + (net,))}[{bit}] has no driver")
+                # A reg that is never assigned keeps its initial value
+                driver = ("const", module.inits[net] >> bit & 1)
+            self._pending.add(key)
+            number = self._resolved[key] = self._resolve(driver)
+            self._pending.discard(key)
+            return number
+        if kind == "const":
+            return self.const(expr[1])
+        if kind == "state":
+            return self.node("state", expr[1])
+        if kind == "input":
+            return self.node("input", expr[1], expr[2])
+        if kind == "not":
+            return self.op_not(self._resolve(expr[1]))
+        if kind == "&":
+            return self.op_and(self._resolve(expr[1]), self._resolve(expr[2]))
+        if kind == "|":
+            return self.op_or(self._resolve(expr[1]), self._resolve(expr[2]))
+        if kind == "^":
+            return self.op_xor(self._resolve(expr[1]), self._resolve(expr[2]))
+        if kind == "?":
+            return self.op_mux(self._resolve(expr[1]), self._resolve(expr[2]), self._resolve(expr[3]))
+        raise NetlistError(f"Unsupported driver {expr}")
+
+    def gates(self):
+        """Number of NOT/AND/OR/XOR/MUX nodes."""
+        return sum(op[0] in ("not", "and", "or", "xor", "mux") for op in self.nodes)
+
+
+def load_netlist(path=NETLIST, top=None):
+    """Parse and flatten a netlist file; the top module defaults to the first one."""
+    with open(path) as f:
+        modules = parse_netlist(f.read())
+    return Netlist(modules, top or next(iter(modules)))
+
+
+# -------------------------------------------------------------------------
+# C emitter
+# -------------------------------------------------------------------------
+
+_C_PRELUDE = """\
+/* Generated by SimpleCPUv1a_common/NativeSim.py from {source}; do not edit.
+ *
+ * Sim *sim_new(void) / void sim_free(Sim *)
+ * void sim_reset(Sim *)                 flip-flops to their initial values, rst held for one clock
+ * uint64_t sim_step(Sim *, uint64_t n)  clock n times, stopping early on the halt word
+ * int sim_halted(Sim *)
+ * uint64_t sim_peek(Sim *, int signal) / int sim_poke(Sim *, int signal, uint64_t value)
+ * void sim_load(Sim *, const uint16_t *, int) / void sim_dump(Sim *, uint16_t *, int)
+ * int sim_signals(void), const char *sim_signal_name(int), int sim_signal_width(int),
+ * int sim_signal_writable(int)
+ */
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+
+#ifdef _WIN32
+#define EXPORT __declspec(dllexport)
+#else
+#define EXPORT
+#endif
+
+#define STATE {state}
+#define SLOTS {slots}
+#define WORDS {words}
+#define CONST0 {const0}
+#define CONST1 {const1}
+#define RST {rst}
+
+typedef struct {{
+    uint8_t v[SLOTS];
+    uint16_t ram[WORDS];
+}} Sim;
+"""
+
+
+def _word(bits):
+    # C expression assembling a word from slots, LSB first
+    return " | ".join(f"(uint32_t)v[{slot}] << {bit}" if bit else f"(uint32_t)v[{slot}]"
+                      for bit, slot in enumerate(bits))
+
+
+def emit_c(netlist, source="cpu.v"):
+    """
+    C source of a netlist with its RAM
+
+    Slots of the value array v[]: the flip-flops first, in netlist.flops
+    order, then the two constants and the reset input, then one per gate
+    and RAM data bit, in the order eval() computes them.
+    """
+    top = netlist.top
+    for port in top.ports:
+        if top.directions.get(port) == "input" and port not in (CLOCK, RESET, MEMORY["data_in"]):
+            raise NetlistError(f"Top-level input {port} is not connected")
+
+    nodes = netlist.nodes
+    state = len(netlist.flops)
+    slots = {}
+    for number, op in enumerate(nodes):
+        if op[0] == "state":
+            slots[number] = op[1]
+    const0, const1, rst = state, state + 1, state + 2
+    size = state + 3
+
+    signals = netlist.signals
+    addr = [signals[MEMORY["addr"]][bit] for bit in range(len(signals[MEMORY["addr"]]))]
+    data_out = signals[MEMORY["data_out"]]
+    write = signals[MEMORY["write"]][0]
+    words = 1 << len(addr)
+
+    lines = []
+    emitted = set(slots)
+
+    def emit(number):
+        nonlocal size
+        if number in emitted:
+            return
+        op = nodes[number]
+        kind = op[0]
+        if kind == "const":
+            slots[number] = const1 if op[1] else const0
+        elif kind == "input" and op[1] == RESET:
+            slots[number] = rst
+        elif kind == "input" and op[1] == CLOCK:
+            slots[number] = const0
+        elif kind == "input":
+            # RAM read data: combinational, as the RAM256x16 read port
+            for dep in addr + [write]:
+                emit(dep)
+            if "din" not in emitted:
+                emitted.add("din")
+                lines.append(f"    din = v[{slots[write]}] ? 0 : s->ram[{_word([slots[a] for a in addr])}];")
+            slots[number] = size
+            lines.append(f"    v[{size}] = din >> {op[2]} & 1;")
+            size += 1
+        else:
+            for dep in op[1:]:
+                emit(dep)
+            a = [f"v[{slots[dep]}]" for dep in op[1:]]
+            if kind == "not":
+                expr = f"{a[0]} ^ 1"
+            elif kind == "and":
+                expr = f"{a[0]} & {a[1]}"
+            elif kind == "or":
+                expr = f"{a[0]} | {a[1]}"
+            elif kind == "xor":
+                expr = f"{a[0]} ^ {a[1]}"
+            else:
+                expr = f"{a[0]} ? {a[1]} : {a[2]}"
+            slots[number] = size
+            lines.append(f"    v[{size}] = {expr};")
+            size += 1
+        emitted.add(number)
+
+    roots = [d for _, _, d, _ in netlist.flops] + addr + data_out + [write]
+    roots += [bit for bits in signals.values() for bit in bits]
+    for root in roots:
+        emit(root)
+
+    names = list(signals)
+    bits = [slots[bit] for name in names for bit in signals[name]]
+    offsets = [0]
+    for name in names:
+        offsets.append(offsets[-1] + len(signals[name]))
+    writable = [int(all(nodes[bit][0] == "state" for bit in signals[name])) for name in names]
+    halt = [slots[bit] for bit in signals[HALT_SIGNAL]]
+
+    out = [_C_PRELUDE.format(source=source, state=state, slots=max(size, 1), words=words,
+                             const0=const0, const1=const1, rst=rst)]
+    out.append(f"static const uint8_t INIT[STATE + 1] = {{{', '.join(str(i) for *_, i in netlist.flops)}, 0}};")
+    out.append(f"static const char *const NAMES[] = {{{', '.join(_c_string(name) for name in names)}}};")
+    out.append(f"static const int OFFSETS[] = {{{', '.join(map(str, offsets))}}};")
+    out.append(f"static const int BITS[] = {{{', '.join(map(str, bits))}}};")
+    out.append(f"static const uint8_t WRITABLE[] = {{{', '.join(map(str, writable))}}};")
+    out.append(f"#define SIGNALS {len(names)}")
+    out.append("")
+    out.append("static void eval(Sim *s)\n{\n    uint8_t *v = s->v;\n    uint16_t din;")
+    out += lines
+    out.append("    (void)din;\n}\n")
+
+    out.append("static void clock(Sim *s)\n{\n    uint8_t *v = s->v;\n    uint8_t next[STATE + 1];")
+    out.append(f"    if (v[{slots[write]}])")
+    out.append(f"        s->ram[{_word([slots[a] for a in addr])}] = {_word([slots[b] for b in data_out])};")
+    for index, (_, _, d, _) in enumerate(netlist.flops):
+        out.append(f"    next[{index}] = v[{slots[d]}];")
+    out.append("    memcpy(v, next, STATE);\n    eval(s);\n}\n")
+
+    out.append(_C_API.format(halt=_word(halt), halt_word=HALT))
+    return "\n".join(out)
+
+
+def _c_string(text):
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+_C_API = """\
+static int halted(const Sim *s)
+{{
+    const uint8_t *v = s->v;
+    return ({halt}) == {halt_word};
+}}
+
+EXPORT void sim_reset(Sim *s)
+{{
+    memcpy(s->v, INIT, STATE);
+    s->v[CONST0] = 0;
+    s->v[CONST1] = 1;
+    s->v[RST] = 1;
+    eval(s);
+    clock(s);
+    s->v[RST] = 0;
+    eval(s);
+}}
+
+EXPORT Sim *sim_new(void)
+{{
+    Sim *s = calloc(1, sizeof(Sim));
+    if (s)
+        sim_reset(s);
+    return s;
+}}
+
+EXPORT void sim_free(Sim *s)
+{{
+    free(s);
+}}
+
+EXPORT uint64_t sim_step(Sim *s, uint64_t cycles)
+{{
+    uint64_t n;
+    for (n = 0; n < cycles && !halted(s); n++)
+        clock(s);
+    return n;
+}}
+
+EXPORT int sim_halted(Sim *s)
+{{
+    return halted(s);
+}}
+
+EXPORT int sim_signals(void)
+{{
+    return SIGNALS;
+}}
+
+EXPORT const char *sim_signal_name(int signal)
+{{
+    return signal >= 0 && signal < SIGNALS ? NAMES[signal] : 0;
+}}
+
+EXPORT int sim_signal_width(int signal)
+{{
+    return signal >= 0 && signal < SIGNALS ? OFFSETS[signal + 1] - OFFSETS[signal] : -1;
+}}
+
+EXPORT int sim_signal_writable(int signal)
+{{
+    return signal >= 0 && signal < SIGNALS && WRITABLE[signal];
+}}
+
+EXPORT uint64_t sim_peek(Sim *s, int signal)
+{{
+    uint64_t value = 0;
+    int i;
+    if (signal < 0 || signal >= SIGNALS)
+        return 0;
+    for (i = OFFSETS[signal + 1] - 1; i >= OFFSETS[signal]; i--)
+        value = value << 1 | s->v[BITS[i]];
+    return value;
+}}
+
+EXPORT int sim_poke(Sim *s, int signal, uint64_t value)
+{{
+    int i;
+    if (!sim_signal_writable(signal))
+        return -1;
+    for (i = OFFSETS[signal]; i < OFFSETS[signal + 1]; i++, value >>= 1)
+        s->v[BITS[i]] = value & 1;
+    eval(s);
+    return 0;
+}}
+
+EXPORT void sim_load(Sim *s, const uint16_t *words, int count)
+{{
+    memset(s->ram, 0, sizeof(s->ram));
+    memcpy(s->ram, words, (count < WORDS ? count : WORDS) * sizeof(uint16_t));
+    eval(s);
+}}
+
+EXPORT void sim_dump(Sim *s, uint16_t *words, int count)
+{{
+    memcpy(words, s->ram, (count < WORDS ? count : WORDS) * sizeof(uint16_t));
+}}
+"""
+
+
+# -------------------------------------------------------------------------
+# Build and ctypes wrapper
+# -------------------------------------------------------------------------
+
+_libraries = {}
+
+
+def library_suffix():
+    return ".dll" if os.name == "nt" else ".so"
+
+
+def build_library(netlist_path=NETLIST, cache_dir=CACHE_DIR, cc=None):
+    """
+    Emit and compile the C simulator of a netlist, or reuse an earlier build
+
+    Returns:
+    - Path of the shared library, native_cache/<hash of the C source>.so
+
+    Raises:
+    - RuntimeError if there is no C compiler, or it fails
+    """
+    source = emit_c(load_netlist(netlist_path), os.path.basename(netlist_path))
+    key = hashlib.sha256(source.encode()).hexdigest()[:16]
+    library = os.path.join(cache_dir, key + library_suffix())
+    if os.path.exists(library):
+        return library
+
+    cc = cc or os.environ.get("CC", "gcc")
+    if shutil.which(cc) is None:
+        raise RuntimeError(f"No C compiler: '{cc}' not found (set CC to choose another)")
+    os.makedirs(cache_dir, exist_ok=True)
+    c_file = os.path.join(cache_dir, key + ".c")
+    with open(c_file, "w") as f:
+        f.write(source)
+
+    # Compile to a temporary name so a concurrent reader never loads half a library
+    fd, tmp_file = tempfile.mkstemp(suffix=library_suffix(), dir=cache_dir)
+    os.close(fd)
+    proc = subprocess.run([cc, "-O1", "-shared", "-fPIC", "-o", tmp_file, c_file], capture_output=True, text=True)
+    if proc.returncode != 0:
+        os.remove(tmp_file)
+        raise RuntimeError(f"{cc} failed on {c_file}:\n{proc.stderr}")
+    os.replace(tmp_file, library)
+    return library
+
+
+def load_library(netlist_path=NETLIST):
+    """Build (if needed) and load the library of a netlist; loaded once per process."""
+    lib = _libraries.get(netlist_path)
+    if lib is not None:
+        return lib
+
+    lib = ctypes.CDLL(build_library(netlist_path))
+    sim = ctypes.c_void_p
+    words = ctypes.POINTER(ctypes.c_uint16)
+    for name, restype, argtypes in [
+        ("sim_new", sim, []),
+        ("sim_free", None, [sim]),
+        ("sim_reset", None, [sim]),
+        ("sim_step", ctypes.c_uint64, [sim, ctypes.c_uint64]),
+        ("sim_halted", ctypes.c_int, [sim]),
+        ("sim_peek", ctypes.c_uint64, [sim, ctypes.c_int]),
+        ("sim_poke", ctypes.c_int, [sim, ctypes.c_int, ctypes.c_uint64]),
+        ("sim_load", None, [sim, words, ctypes.c_int]),
+        ("sim_dump", None, [sim, words, ctypes.c_int]),
+        ("sim_signals", ctypes.c_int, []),
+        ("sim_signal_name", ctypes.c_char_p, [ctypes.c_int]),
+        ("sim_signal_width", ctypes.c_int, [ctypes.c_int]),
+        ("sim_signal_writable", ctypes.c_int, [ctypes.c_int]),
+    ]:
+        function = getattr(lib, name)
+        function.restype = restype
+        function.argtypes = argtypes
+    _libraries[netlist_path] = lib
+    return lib
+
+
+class NativeCpu:
+    """
+    One instance of the compiled netlist with its RAM
+
+    Signals are addressed by hierarchical name below the top module, with
+    "." between instances (e.g. "controlLogic.RAM_WR", "counter_PC.Q"), or by the
+    names in ALIASES. Every net is readable; only nets made entirely of
+    flip-flop outputs can be poked.
+    """
+
+    def __init__(self, netlist=NETLIST):
+        self.lib = load_library(netlist)
+        self.sim = self.lib.sim_new()
+        if not self.sim:
+            raise MemoryError("sim_new() failed")
+        self.signals = {self.lib.sim_signal_name(i).decode(): i for i in range(self.lib.sim_signals())}
+        for alias, name in ALIASES.items():
+            if name in self.signals:
+                self.signals[alias] = self.signals[name]
+
+    def __del__(self):
+        sim = getattr(self, "sim", None)
+        if sim:
+            self.lib.sim_free(sim)
+            self.sim = None
+
+    def _signal(self, name):
+        try:
+            return self.signals[name]
+        except KeyError:
+            raise KeyError(f"No signal named {name}") from None
+
+    def reset(self):
+        """Flip-flops to their initial values, with rst held for one clock; the RAM is kept."""
+        self.lib.sim_reset(self.sim)
+
+    def step(self, cycles=1):
+        """Clock the design; stops early once the IR holds 0xFFFF. Returns the cycles run."""
+        return self.lib.sim_step(self.sim, cycles)
+
+    @property
+    def halted(self):
+        return bool(self.lib.sim_halted(self.sim))
+
+    def peek(self, name):
+        return self.lib.sim_peek(self.sim, self._signal(name))
+
+    def poke(self, name, value):
+        if self.lib.sim_poke(self.sim, self._signal(name), value) != 0:
+            raise ValueError(f"{name} is not a flip-flop output")
+
+    def width(self, name):
+        return self.lib.sim_signal_width(self._signal(name))
+
+    def load(self, mem):
+        """Replace the RAM contents (missing words are zero)."""
+        words = (ctypes.c_uint16 * len(mem))(*mem)
+        self.lib.sim_load(self.sim, words, len(mem))
+
+    def dump(self):
+        """RAM contents as a list of words."""
+        words = (ctypes.c_uint16 * Snapshot.MEMORY_SIZE)()
+        self.lib.sim_dump(self.sim, words, Snapshot.MEMORY_SIZE)
+        return list(words)
+
+
+class NativeSession:
+    """
+    ComputerSession on the compiled netlist
+
+    The same interface as the backends' ComputerSession: run_program()
+    loads the RAM, resets and runs, and returns the instruction periods
+    simulated; state(), snapshot(), restore() and resume() work as in the
+    MyHDL session. The cycle budget and count behave as the Amaranth
+    HaltDetector: cycles stop counting when the IR holds 0xFFFF.
+    """
+
+    def __init__(self, netlist=NETLIST):
+        self.cpu = NativeCpu(netlist)
+        self.cycles = 0
+
+    def load(self, mem):
+        self.cpu.load(mem)
+
+    def reset(self):
+        self.cpu.reset()
+        self.cycles = 0
+
+    def run(self, max_cycles=500):
+        """
+        Run until the IR latches the termination instruction (0xFFFF)
+
+        Inputs:
+        - max_cycles: Budget in 3-tick instruction periods, counted from reset
+
+        Returns:
+        - Number of instruction periods simulated, including the one that
+          fetched 0xFFFF
+        """
+        budget = max_cycles * CYCLES_PER_INSTRUCTION
+        if self.cycles < budget:
+            self.cycles += self.cpu.step(budget - self.cycles)
+        if self.cycles >= budget:
+            return max_cycles
+        return self.cycles // CYCLES_PER_INSTRUCTION + 1
+
+    def resume(self, max_cycles=500):
+        """Run on from a restored state; the same as run()."""
+        return self.run(max_cycles)
+
+    def run_program(self, mem, max_cycles=500):
+        self.load(mem)
+        self.reset()
+        return self.run(max_cycles)
+
+    @property
+    def halted(self):
+        """Whether the last run ended on the termination instruction."""
+        return self.cpu.halted
+
+    def state(self):
+        """Architectural state after the last run (PC, ACC, IR, RAM)."""
+        return {
+            "PC": self.cpu.peek("PC"),
+            "ACC": self.cpu.peek("ACC"),
+            "IR": self.cpu.peek("IR"),
+            "RAM": self.cpu.dump(),
+        }
+
+    def snapshot(self):
+        """Machine state after the last run (or restore()), as a Snapshot blob."""
+        return Snapshot.pack(Snapshot.MachineState(
+            pc=self.cpu.peek("PC"),
+            acc=self.cpu.peek("ACC"),
+            ir=self.cpu.peek("IR"),
+            ring=self.cpu.peek("RING"),
+            cycles=self.cycles,
+            ram=self.cpu.dump(),
+        ))
+
+    def restore(self, blob):
+        """Load a Snapshot blob into the flip-flops and RAM; call resume() to run on from it."""
+        state = Snapshot.unpack(blob)
+        self.reset()
+        self.load(state.ram)
+        for field in ("pc", "acc", "ir", "ring"):
+            self.cpu.poke(field.upper(), getattr(state, field))
+        self.cycles = state.cycles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile HDLs/cpu.v to a native simulator and run a program "
+                                                 "on it.")
+    parser.add_argument("program", nargs="?", help="program file (.dat, .asc, .mem, .mif or .asm)")
+    parser.add_argument("--netlist", default=NETLIST, help="Yosys Verilog netlist (default HDLs/cpu.v)")
+    parser.add_argument("--max-cycles", type=int, default=500, help="instruction-period limit")
+    parser.add_argument("--emit", metavar="FILE", help="write the generated C source to FILE")
+    args = parser.parse_args(argv)
+
+    if args.emit:
+        netlist = load_netlist(args.netlist)
+        with open(args.emit, "w") as f:
+            f.write(emit_c(netlist, os.path.basename(args.netlist)))
+        print(f"{args.emit}: {len(netlist.flops)} flip-flops, {netlist.gates()} gates, "
+              f"{len(netlist.signals)} signals")
+    if args.program is None:
+        if not args.emit:
+            parser.error("give a program to run, or --emit")
+        return
+
+    start = time.perf_counter()
+    session = NativeSession(args.netlist)
+    elaborate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    periods = session.run_program(load_image(args.program), args.max_cycles)
+    elapsed = time.perf_counter() - start
+    state = session.state()
+    print(f"PC={state['PC']} ACC={state['ACC']} IR={state['IR']:#06x} after {periods} instruction periods "
+          f"({session.cycles} cycles)")
+    print(f"Build/load time: {elaborate:.6f} seconds, simulation time: {elapsed:.6f} seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+SMARTS-style sampled simulation: ISS stretches, short RTL windows
+
+The reference ISS runs the whole program functionally. Every `period`
+instructions it hands its state to one HDL backend as a Snapshot (see
+FastForward.iss_snapshot), and the backend simulates a short window in
+detail: `warmup` instruction periods that are not measured, then `window`
+periods that are. The per-window measurements are treated as a systematic
+sample of the run, and their mean, scaled to the instruction count the ISS
+found, estimates the totals of a full RTL run with a confidence interval.
+
+Measured per window:
+
+- CPI: clock cycles per instruction, from the halt detector's cycle counter
+- On Amaranth, toggles per clock cycle of every control signal
+  (CONTROL_SIGNALS) and of every submodule, counted by ActivityMonitor
+
+The measured part of a window is the difference of two runs from the same
+snapshot, one over the warm-up only and one over warm-up and window. Both
+start with the same restore (whose writes into the design the monitor also
+sees), so the difference holds the window's activity alone.
+
+Usage (from the repository root):
+
+    python -m SimpleCPUv1a_common.Sampling prog.asm --max-instructions 100000
+    python -m SimpleCPUv1a_common.Sampling prog.dat --backend pyrtl:fast --period 500 --window 20
+
+API:
+
+    result = sample_run("prog.asm", "amaranth", period=200, window=10, max_instructions=10000)
+    result.estimates["CPI"].total        # estimated clock cycles of the full run
+"""
+
+import argparse
+import importlib
+import math
+import multiprocessing
+import statistics
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from SimpleCPUv1a_common import Snapshot
+from SimpleCPUv1a_common.Backends import check_backend
+from SimpleCPUv1a_common.FastForward import iss_snapshot
+from SimpleCPUv1a_common.ISS import ISS, DEFAULT_INSTRUCTION_LIMIT
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.Sessions import STANDALONE, open_session, quiet, session_result
+
+# Outputs of the Amaranth ControlLogic
+CONTROL_SIGNALS = [
+    "ACC_CTL", "ACC_EN", "ADDR_SEL", "DATA_SEL", "IR_EN", "PC_EN", "PC_LD", "RAM_EN", "RAM_WR", "ROM_EN", "SUB",
+]
+CONTROL_LOGIC = "top/computer/cpu/controlLogic"
+MODULE_DEPTH = 4
+
+# Format of an estimate:
+# - mean: Mean of the per-window values
+# - half_width: Half-width of the confidence interval of the mean
+# - total: Estimated total over the full run (mean x instructions for CPI,
+#   mean x estimated cycles for toggle rates)
+# - total_half_width: Half-width of the interval of the total
+Estimate = namedtuple("Estimate", "mean half_width total total_half_width")
+
+# Format of a result:
+# - instructions: Instructions the ISS executed
+# - halted: Whether the program halted within max_instructions
+# - windows: Detailed windows measured
+# - detailed: Instruction periods simulated on the RTL, warm-up included
+# - estimates: {metric: Estimate}; "CPI", "signal/<name>" and "module/<path>"
+# - samples: {metric: [value per window]}
+# - iss_s / rtl_s: Seconds spent in the ISS and in the backend
+SamplingResult = namedtuple("SamplingResult", "instructions halted windows detailed estimates samples iss_s rtl_s")
+
+
+# -------------------------------------------------------------------------
+# Functional side
+# -------------------------------------------------------------------------
+
+def window_snapshots(image, period, offset=0, max_instructions=DEFAULT_INSTRUCTION_LIMIT):
+    """
+    Run the ISS over the whole program, taking a snapshot at each window start
+
+    Window starts are at offset, offset + period, offset + 2 * period, ...
+
+    Returns:
+    - (snapshot blobs, ISS at the end of the run)
+    """
+    if period < 1 or not 0 <= offset < period:
+        raise ValueError(f"Need period >= 1 and 0 <= offset < period, got {period} and {offset}")
+
+    iss = ISS(image)
+    blobs = []
+    start = offset
+    while start < max_instructions:
+        iss.run(start - iss.instructions)
+        if iss.halted:
+            break
+        blobs.append(iss_snapshot(iss))
+        start += period
+    iss.run(max_instructions - iss.instructions)
+    return blobs, iss
+
+
+# -------------------------------------------------------------------------
+# Detailed side: one worker process
+# -------------------------------------------------------------------------
+
+def _measure(session, monitor, blob, budget):
+    session.restore(blob)
+    if monitor is not None:
+        monitor.clear()
+    periods, _ = session_result(session, session.resume(budget))
+    cycles = Snapshot.unpack(session.snapshot()).cycles
+    return periods, cycles, monitor.signal_counts() if monitor is not None else {}
+
+
+def _window_metrics(before, after):
+    periods, cycles = after[0] - before[0], after[1] - before[1]
+    if periods <= 0 or cycles <= 0:
+        return None
+
+    metrics = {"CPI": cycles / periods}
+    if after[2]:
+        toggles = {key: value[0] - before[2].get(key, (0, 0))[0] for key, value in after[2].items()}
+        for name in CONTROL_SIGNALS:
+            metrics[f"signal/{name}"] = toggles.get(f"{CONTROL_LOGIC}/{name}", 0) / cycles
+        modules = {}
+        for key, value in toggles.items():
+            path = "/".join(key.split("/")[:-1][:MODULE_DEPTH])
+            modules[path] = modules.get(path, 0) + value
+        for path, value in modules.items():
+            metrics[f"module/{path}"] = value / cycles
+    return metrics
+
+
+def _sample_job(backend, blobs, warmup, window):
+    # The testbenches report progress on stdout; keep the driver's output readable
+    with quiet():
+        session = open_session(backend)
+        monitor = None
+        if backend.partition(":")[0] == "amaranth" and backend not in STANDALONE:
+            monitor = importlib.import_module("ActivityMonitor").ActivityMonitor(session.sim)
+            monitor.attach()
+
+        start = time.perf_counter()
+        windows = []
+        for blob in blobs:
+            periods = Snapshot.unpack(blob).cycles // 3
+            before = _measure(session, monitor, blob, periods + warmup)
+            after = _measure(session, monitor, blob, periods + warmup + window)
+            windows.append(_window_metrics(before, after))
+        return windows, time.perf_counter() - start
+
+
+# -------------------------------------------------------------------------
+# Driver side
+# -------------------------------------------------------------------------
+
+def estimate(values, scale, confidence=0.95):
+    """
+    Mean of a sample with a normal-approximation confidence interval
+
+    Inputs:
+    - values: Per-window measurements (at least two)
+    - scale: Factor from the mean to the full-run total
+    - confidence: Confidence level of the interval
+
+    Returns:
+    - Estimate
+    """
+    if len(values) < 2:
+        raise ValueError(f"Need at least 2 windows for a confidence interval, got {len(values)}")
+    z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    mean = statistics.fmean(values)
+    half_width = z * statistics.stdev(values) / math.sqrt(len(values))
+    return Estimate(mean, half_width, mean * scale, half_width * scale)
+
+
+def sample_run(program, backend="amaranth", period=100, window=10, warmup=1, offset=0,
+               max_instructions=DEFAULT_INSTRUCTION_LIMIT, confidence=0.95):
+    """
+    Estimate full-run RTL statistics from sampled windows
+
+    Inputs:
+    - program: Program file in any Loader format, or a 256-word image
+    - backend: Backend name, optionally with a variant (e.g. "pyrtl:fast")
+    - period: Instructions from the start of one window to the next
+    - window: Instruction periods measured per window
+    - warmup: Instruction periods simulated in detail before each window
+      and not measured (at least 1; the ISS state is the complete machine
+      state, so this only needs to cover the restore itself)
+    - offset: Instructions before the first window
+    - max_instructions: Length of the run for programs that do not halt
+    - confidence: Confidence level of the intervals
+
+    Returns:
+    - SamplingResult
+    """
+    check_backend(backend)
+    if warmup < 1 or window < 1:
+        raise ValueError(f"Need warmup >= 1 and window >= 1, got {warmup} and {window}")
+
+    image = load_image(program) if isinstance(program, str) else list(program)
+    start = time.perf_counter()
+    blobs, iss = window_snapshots(image, period, offset, max_instructions)
+    iss_s = time.perf_counter() - start
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(1, context) as pool:
+        windows, rtl_s = pool.submit(_sample_job, backend, blobs, warmup, window).result()
+    windows = [metrics for metrics in windows if metrics is not None]
+
+    samples = {}
+    for metrics in windows:
+        for metric, value in metrics.items():
+            samples.setdefault(metric, []).append(value)
+    # Submodules that were quiet in some windows
+    for metric in samples:
+        samples[metric] += [0.0] * (len(windows) - len(samples[metric]))
+
+    estimates = {"CPI": estimate(samples.get("CPI", []), iss.instructions, confidence)}
+    cycles = estimates["CPI"].total
+    for metric, values in samples.items():
+        if metric != "CPI":
+            estimates[metric] = estimate(values, cycles, confidence)
+
+    return SamplingResult(iss.instructions, iss.halted, len(windows), len(blobs) * (2 * warmup + window),
+                          estimates, samples, iss_s, rtl_s)
+
+
+def print_summary(result, confidence=0.95):
+    print(f"{result.instructions} instructions{' (halted)' if result.halted else ''}, {result.windows} windows, "
+          f"{result.detailed} instruction periods in detail "
+          f"({result.detailed / max(result.instructions, 1):.1%}); ISS {result.iss_s:.3f} s, RTL {result.rtl_s:.3f} s")
+    print()
+    width = max(len(metric) for metric in result.estimates)
+    print(f"{'Metric':<{width}}  {'Per unit':>10}  {'+/-':>9}  {'Estimated total':>16}  {'+/-':>12}")
+    print("-" * (width + 56))
+    for metric, e in result.estimates.items():
+        print(f"{metric:<{width}}  {e.mean:>10.4f}  {e.half_width:>9.4f}  {e.total:>16,.1f}  {e.total_half_width:>12,.1f}")
+    print(f"\nIntervals at {confidence:.0%} confidence; CPI per instruction, toggles per clock cycle")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estimate full-run RTL cycle and activity statistics from "
+                                                 "short detailed windows between ISS stretches.")
+    parser.add_argument("program", help="program file (.dat, .asc, .mem, .mif or .asm)")
+    parser.add_argument("--backend", default="amaranth",
+                        help="backend for the detailed windows, optionally with a variant (e.g. pyrtl:fast)")
+    parser.add_argument("--period", type=int, default=100, help="instructions from one window to the next")
+    parser.add_argument("--window", type=int, default=10, help="instruction periods measured per window")
+    parser.add_argument("--warmup", type=int, default=1, help="detailed periods before each window, not measured")
+    parser.add_argument("--offset", type=int, default=0, help="instructions before the first window")
+    parser.add_argument("--max-instructions", type=int, default=DEFAULT_INSTRUCTION_LIMIT,
+                        help="length of the run for programs that do not halt")
+    parser.add_argument("--confidence", type=float, default=0.95, help="confidence level of the intervals")
+    args = parser.parse_args(argv)
+
+    try:
+        result = sample_run(args.program, args.backend, args.period, args.window, args.warmup, args.offset,
+                            args.max_instructions, args.confidence)
+    except ValueError as e:
+        parser.error(str(e))
+    print_summary(result, args.confidence)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+ComputerSession factory shared by the multi-backend tools
+
+Every backend's tests/TestComputer.py has a ComputerSession that keeps one
+elaborated Computer and runs programs on it (run_program, snapshot, restore,
+resume). The backends share module names such as tests and computer, so
+open_session() imports a backend into the calling process by putting its
+folder on sys.path; a process can therefore host one backend only, and the
+tools (BatchRunner, FastForward, Sampling, Streaming) give each backend its
+own worker process.
+
+The testbenches print progress as they build and run; the tools' worker
+processes run them inside quiet() to keep the driver's output readable.
+
+Usage:
+
+    with quiet():
+        session = open_session("pyrtl:compiled")
+        periods, state = session_result(session, session.run_program(mem, 500))
+"""
+
+import contextlib
+import importlib
+import os
+import sys
+
+from SimpleCPUv1a_common.Backends import BACKENDS, REPO_ROOT, check_backend
+from SimpleCPUv1a_common.NativeSim import NativeSession
+
+# Backend name -> ComputerSession factory, given the imported testbench
+# module and the variant after the colon ("" if there is none)
+SESSIONS = {
+    "amaranth": lambda tb, option: tb.ComputerSession(),
+    "myhdl": lambda tb, option: tb.ComputerSession(model=option or "gate"),
+    "pymtl": lambda tb, option: tb.ComputerSession(option or "python"),
+    "pyrtl": lambda tb, option: tb.ComputerSession(option or "interpreted"),
+}
+
+# Variants that do not run on their backend's testbench -> session class
+STANDALONE = {
+    "amaranth:native": NativeSession,
+}
+
+
+def open_session(backend):
+    """Import a backend (in this process) and create its ComputerSession."""
+    check_backend(backend)
+    if backend in STANDALONE:
+        return STANDALONE[backend]()
+    name, _, option = backend.partition(":")
+    sys.path.insert(0, os.path.join(REPO_ROOT, BACKENDS[name]))
+    tb = importlib.import_module("tests.TestComputer")
+    return SESSIONS[name](tb, option)
+
+
+def session_result(session, result):
+    """
+    Normalise what run_program() or resume() returned
+
+    Amaranth's session returns its final state, the others the period count.
+
+    Returns:
+    - (instruction periods simulated, {"PC", "ACC", "IR", "RAM"})
+    """
+    if isinstance(result, dict):
+        state = dict(result)
+        return state.pop("cycles"), state
+    return result, session.state()
+
+
+@contextlib.contextmanager
+def quiet():
+    """Discard what the testbenches print to stdout inside the block."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
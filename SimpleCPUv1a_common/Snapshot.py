@@ -0,0 +1,114 @@
+"""
+Machine-state snapshots
+
+A snapshot holds everything that decides what the computer does next: the
+three cpu registers, the ring-counter stage, the cycle count of the halt
+detector and the RAM. Each backend's ComputerSession can write one with
+snapshot() and load one with restore(), then carry on with resume(), so a
+long program can be checkpointed, restarted from the middle, or have a
+common prefix (e.g. an initialisation loop) simulated once and reused by
+many runs.
+
+The state is described the same way by every backend, so a snapshot taken
+on one can be restored on another.
+
+The cycle budget of resume(max_cycles) counts from reset, as in
+run_program(), so resuming a snapshot taken mid-run finishes exactly like
+an uninterrupted run.
+
+Blob layout (little-endian, 526 bytes):
+
+    magic "SCPU", version (B), PC (B), ACC (B), IR (H), ring counter (B),
+    cycles (I), 256 RAM words (H)
+
+Usage:
+
+    blob = session.snapshot()
+    Snapshot.save("checkpoint.snap", blob)
+    ...
+    session.restore(Snapshot.load("checkpoint.snap"))
+    session.resume(max_cycles=500)
+"""
+
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+MEMORY_SIZE = 256
+MAGIC = b"SCPU"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sBBBHBI")
+SIZE = _HEADER.size + 2 * MEMORY_SIZE
+
+# Ring-counter values (one-hot Q) at the start of each stage
+FETCH, DECODE, EXECUTE = 0b001, 0b010, 0b100
+
+MachineState = namedtuple("MachineState", "pc acc ir ring cycles ram")
+MachineState.__doc__ = """
+State of the computer between two clock edges
+
+- pc, acc, ir: Register contents
+- ring: 3-bit ring-counter output (FETCH, DECODE or EXECUTE)
+- cycles: Clock cycles since reset, as counted by the halt detector; the
+  cycle budget of resume() is counted from reset as well
+- ram: 256 16-bit words
+"""
+
+
+class SnapshotError(ValueError):
+    """A blob that is not a snapshot this version can read."""
+
+
+def pack(state):
+    """MachineState -> bytes."""
+    if len(state.ram) != MEMORY_SIZE:
+        raise SnapshotError(f"RAM has {len(state.ram)} words, expected {MEMORY_SIZE}")
+    ram = array("H", state.ram)
+    if sys.byteorder != "little":
+        ram.byteswap()
+    return _HEADER.pack(MAGIC, VERSION, state.pc, state.acc, state.ir, state.ring, state.cycles) + ram.tobytes()
+
+
+def unpack(blob):
+    """bytes -> MachineState."""
+    if len(blob) != SIZE:
+        raise SnapshotError(f"Snapshot is {len(blob)} bytes, expected {SIZE}")
+    magic, version, pc, acc, ir, ring, cycles = _HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        raise SnapshotError("Not a SimpleCPUv1a snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+
+    ram = array("H")
+    ram.frombytes(blob[_HEADER.size:])
+    if sys.byteorder != "little":
+        ram.byteswap()
+    return MachineState(pc, acc, ir, ring, cycles, list(ram))
+
+
+def save(path, blob):
+    """Write a snapshot blob (or a MachineState) to a file."""
+    if isinstance(blob, MachineState):
+        blob = pack(blob)
+    with open(path, "wb") as f:
+        f.write(blob)
+
+
+def load(path):
+    """Read a snapshot file, checking that it is one."""
+    with open(path, "rb") as f:
+        blob = f.read()
+    unpack(blob)
+    return blob
+
+
+def bits(value, width):
+    """Split a register value into its flip-flop bits, LSB first."""
+    return [(value >> i) & 1 for i in range(width)]
+
+
+def from_bits(values):
+    """Inverse of bits()."""
+    return sum(int(bit) << i for i, bit in enumerate(values))
@@ -0,0 +1,132 @@
+"""
+Streaming runs with an instruction budget and a wall-clock timeout
+
+run_test() and ComputerSession.run_program() simulate a whole budget in one
+call and only report at the end. stream_run() drives the same session in
+chunks of `every` instruction periods with run_program() and then resume(),
+whose budgets count from reset, so the chunked run is the same simulation as
+an uninterrupted one. After every chunk it yields a Progress record, so a
+caller can log, plot or stop a run of millions of cycles as it goes.
+
+The run ends when the program halts (as the session's halted flag reports),
+when the budget is used up or when the timeout has passed; the last record
+says which, and a halted machine is never resumed. The timeout is checked
+between chunks, so it can be exceeded by the time one chunk takes.
+
+Usage (from the repository root):
+
+    python -m SimpleCPUv1a_common.Streaming prog.dat --backend pyrtl:fast --max-cycles 1000000 --every 50000
+    python -m SimpleCPUv1a_common.Streaming prog.asm --backend myhdl --timeout 30 --json
+
+API:
+
+    session = open_session("myhdl")
+    for progress in stream_run(session, image, max_cycles=10**6, timeout=60):
+        print(progress.instructions, progress.PC)
+"""
+
+import argparse
+import json
+import time
+from collections import namedtuple
+
+from SimpleCPUv1a_common.Backends import check_backend
+from SimpleCPUv1a_common.ISS import CYCLES_PER_INSTRUCTION
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.Sessions import open_session, quiet, session_result
+
+# The halt detectors count clock cycles in 32 bits
+MAX_BUDGET = (2 ** 32 - 1) // CYCLES_PER_INSTRUCTION
+
+RUNNING, HALTED, BUDGET, TIMEOUT = "running", "halted", "budget", "timeout"
+
+# Format of a progress record:
+# - periods: Instruction periods simulated since reset
+# - cycles: Clock cycles since reset (CYCLES_PER_INSTRUCTION per period)
+# - instructions: Instructions executed (the period that fetched 0xFFFF
+#   does not count)
+# - PC / ACC: Architectural state at the end of the chunk
+# - elapsed: Wall-clock seconds since the start of the run
+# - status: RUNNING, or HALTED / BUDGET / TIMEOUT on the last record
+Progress = namedtuple("Progress", "periods cycles instructions PC ACC elapsed status")
+
+
+def stream_run(session, mem, max_cycles=None, timeout=None, every=1000):
+    """
+    Run a program on a ComputerSession, yielding progress as it goes
+
+    Inputs:
+    - session: ComputerSession of any backend (see Sessions.open_session)
+    - mem: 256-word program image
+    - max_cycles: Budget in instruction periods; None for MAX_BUDGET
+    - timeout: Wall-clock limit in seconds; None for no limit
+    - every: Instruction periods per chunk, i.e. between two records
+
+    Yields:
+    - A Progress record after every chunk; the last has the final status
+    """
+    if every < 1:
+        raise ValueError(f"Need every >= 1, got {every}")
+    max_cycles = MAX_BUDGET if max_cycles is None else max_cycles
+    if not 1 <= max_cycles <= MAX_BUDGET:
+        raise ValueError(f"Budget must be between 1 and {MAX_BUDGET} instruction periods, got {max_cycles}")
+
+    start = time.perf_counter()
+    target = 0
+    while True:
+        target = min(target + every, max_cycles)
+        result = session.run_program(mem, target) if target <= every else session.resume(target)
+        periods, state = session_result(session, result)
+        elapsed = time.perf_counter() - start
+
+        # A halt can land exactly on the end of a chunk, so ask the session
+        # rather than compare the periods with the chunk's budget
+        if session.halted:
+            status = HALTED
+        elif target == max_cycles:
+            status = BUDGET
+        elif timeout is not None and elapsed >= timeout:
+            status = TIMEOUT
+        else:
+            status = RUNNING
+
+        instructions = periods - 1 if status == HALTED else periods
+        yield Progress(periods, periods * CYCLES_PER_INSTRUCTION, instructions, state["PC"], state["ACC"],
+                       elapsed, status)
+        if status != RUNNING:
+            return
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a program on one backend and print progress records "
+                                                 "as it runs.")
+    parser.add_argument("program", help="program file (.dat, .asc, .mem, .mif or .asm)")
+    parser.add_argument("--backend", default="pyrtl:fast",
+                        help="backend to run on, optionally with a variant (e.g. myhdl:rtl)")
+    parser.add_argument("--max-cycles", type=int, help=f"instruction-period budget (default {MAX_BUDGET})")
+    parser.add_argument("--timeout", type=float, help="wall-clock limit in seconds")
+    parser.add_argument("--every", type=int, default=1000, help="instruction periods between records")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per record")
+    args = parser.parse_args(argv)
+
+    try:
+        check_backend(args.backend)
+    except ValueError as e:
+        parser.error(str(e))
+    mem = load_image(args.program)
+    with quiet():
+        session = open_session(args.backend)
+
+    try:
+        for progress in stream_run(session, mem, args.max_cycles, args.timeout, args.every):
+            if args.json:
+                print(json.dumps(progress._asdict()), flush=True)
+            else:
+                print(f"{progress.elapsed:>9.3f} s  {progress.cycles:>12,} cycles  {progress.instructions:>11,} "
+                      f"instructions  PC {progress.PC:>3}  ACC {progress.ACC:>3}  {progress.status}", flush=True)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
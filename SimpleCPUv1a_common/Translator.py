@@ -0,0 +1,495 @@
+"""
+Basic-block translating ISS
+
+ISS._execute() decodes every instruction it executes. TranslatingISS
+instead translates each basic block of the program, the first time it is
+reached, into a straight-line Python function built with compile(), and
+from then on runs the whole block in one call:
+
+- A block starts at the PC the dispatcher reaches and ends with a jump
+  (JUMPU/JUMPZ/JUMPNZ), before a 0xFFFF halt word, after a STORE into the
+  block's own later instructions, or after MAX_BLOCK instructions.
+- Operands are constants in the generated code, so MOVE/ADD/SUB/AND need
+  no decoding and a block's only memory accesses are its LOAD/STORE/ADDM/
+  SUBM operands.
+- A block that jumps back to its own start (a counting loop) iterates
+  inside its function, without returning to the dispatcher.
+- Blocks are chained: one more generated function holds every block
+  translated so far and finds the next one from the PC itself, so a loop
+  over several blocks does not return to the dispatcher either. The
+  dispatcher builds a chain once blocks keep being dispatched one at a
+  time (see CHAIN_AFTER), and a store into translated code drops it.
+- Translations are cached on the block's start address and words, so a
+  block that is invalidated and comes back with the same words, or the same
+  code in another program, is not compiled again. The cache is bounded and
+  drops the least recently used translations (see TranslationCache).
+- The same cache keeps a block table per program image: the blocks
+  translated from the image's own words, and their chain. A new
+  TranslatingISS of an image seen before starts from that table, and
+  reset() reuses it without hashing the image again, so rerunning a short
+  program neither finds its blocks again nor dispatches them one by one.
+
+Self-modifying code (the assembler's `store` with an opcode field, see
+self_mod_opcodes in simpleCPUv1a_as.py) is handled by invalidation: every
+STORE whose address holds translated code drops the blocks that contain it,
+and they are translated again from the new words when they are next reached.
+
+Results are identical to ISS, including step() and iter_trace(), which run
+single instructions through the interpreter.
+
+Usage:
+
+    iss = TranslatingISS(load_dat_file("programs/multiply.dat"))
+    iss.run()
+"""
+
+from collections import OrderedDict
+
+from SimpleCPUv1a_common.ISS import (
+    ISS, MOVE, ADD, SUB, AND, LOAD, STORE, ADDM, SUBM, JUMPU, JUMPZ, JUMPNZ, HALT,
+)
+
+MAX_BLOCK = 64
+CHAIN_AFTER = 4096
+
+# Default size of a TranslationCache
+MAX_CACHED_BLOCKS = 4096
+MAX_CACHED_IMAGES = 256
+
+_JUMPS = (JUMPU, JUMPZ, JUMPNZ)
+
+
+def block_words(ram, start, max_block=MAX_BLOCK):
+    """
+    Words of the basic block starting at an address
+
+    Returns:
+    - Tuple of instruction words; empty if start holds the halt word
+    """
+    words = []
+    addresses = set()
+    pc = start
+    while len(words) < max_block and pc not in addresses:
+        word = ram[pc]
+        if word == HALT:
+            break
+        words.append(word)
+        addresses.add(pc)
+        if word >> 12 in _JUMPS:
+            break
+        if word >> 12 == STORE:
+            # A STORE into a later instruction of the same block changes
+            # what follows it, so the block ends here
+            later = {(pc + i) & 0xFF for i in range(1, max_block - len(words) + 1)}
+            if word & 0xFF in later:
+                break
+        pc = (pc + 1) & 0xFF
+    return tuple(words)
+
+
+def _body(start, words, indent, chained=False):
+    """Statements of a block, except its closing jump."""
+    lines = []
+    for word in words:
+        opcode = word >> 12
+        operand = word & 0xFF
+        if opcode == MOVE:
+            lines.append(f"acc = {operand}")
+        elif opcode == ADD:
+            lines.append(f"acc = (acc + {operand}) & 0xFF")
+        elif opcode == SUB:
+            lines.append(f"acc = (acc - {operand}) & 0xFF")
+        elif opcode == AND:
+            lines.append(f"acc &= {operand}")
+        elif opcode == LOAD:
+            lines.append(f"acc = ram[{operand}] & 0xFF")
+        elif opcode == STORE:
+            lines.append(f"ram[{operand}] = {word & 0xF000} | acc")
+            lines.append(f"if {operand} in code:")
+            lines.append(f"    invalidate({operand})")
+            if chained:
+                lines.append("    stale = True")
+        elif opcode == ADDM:
+            lines.append(f"acc = (acc + ram[{operand}]) & 0xFF")
+        elif opcode == SUBM:
+            lines.append(f"acc = (acc - ram[{operand}]) & 0xFF")
+        # Unused opcodes (0xB-0xF) only advance the PC
+    return [" " * indent + line for line in lines]
+
+
+def _branch(start, words):
+    """
+    How a block ends
+
+    Returns:
+    - (words before the jump, condition for taking it or None if the block
+      falls through, jump target, fall-through address, whether the block
+      loops on itself)
+    """
+    length = len(words)
+    fallthrough = (start + length) & 0xFF
+    last = words[-1] if words else 0
+    opcode, target = last >> 12, last & 0xFF
+    if opcode not in _JUMPS:
+        return words, None, fallthrough, fallthrough, False
+
+    taken = {JUMPU: "True", JUMPZ: "acc == 0", JUMPNZ: "acc"}[opcode]
+    own = {(start + i) & 0xFF for i in range(length)}
+    stores_into_self = any(word >> 12 == STORE and word & 0xFF in own for word in words)
+    return words[:-1], taken, target, fallthrough, target == start and not stores_into_self
+
+
+def translate(start, words):
+    """
+    Python source of one block
+
+    The generated function takes (ram, acc, code, invalidate, budget) and
+    returns (next PC, ACC, instructions executed). code maps addresses to
+    the blocks translated from them; invalidate(address) is called after a
+    STORE to one of them.
+
+    A block that jumps back to its own start, and does not store into
+    itself, runs as a loop inside the function for as many iterations as
+    budget (at least one block's worth) allows.
+    """
+    length = len(words)
+    body, taken, target, fallthrough, loops = _branch(start, words)
+
+    lines = ["def block(ram, acc, code, invalidate, budget):"]
+    if loops:
+        lines.append("    retired = 0")
+        lines.append("    while True:")
+        lines += _body(start, body, 8)
+        lines.append(f"        retired += {length}")
+        lines.append(f"        if not ({taken}):")
+        lines.append(f"            return {fallthrough}, acc, retired")
+        lines.append(f"        if retired + {length} > budget:")
+        lines.append(f"            return {start}, acc, retired")
+        return "\n".join(lines) + "\n"
+
+    lines += _body(start, body, 4)
+    if taken is None:
+        lines.append(f"    return {fallthrough}, acc, {length}")
+    elif taken == "True":
+        lines.append(f"    return {target}, acc, {length}")
+    else:
+        lines.append(f"    return ({target} if {taken} else {fallthrough}), acc, {length}")
+    return "\n".join(lines) + "\n"
+
+
+def _chained_block(start, words, indent):
+    """Statements that run one block inside a chain and leave the next PC in pc."""
+    length = len(words)
+    body, taken, target, fallthrough, loops = _branch(start, words)
+
+    lines = [f"if left < {length}:", "    break"]
+    if loops:
+        lines.append("while True:")
+        lines += _body(start, body, 4, chained=True)
+        lines.append(f"    left -= {length}")
+        lines.append(f"    if not ({taken}):")
+        lines.append(f"        pc = {fallthrough}")
+        lines.append("        break")
+        lines.append(f"    if left < {length}:")
+        lines.append("        break")
+    else:
+        lines += _body(start, body, 0, chained=True)
+        lines.append(f"left -= {length}")
+        if taken is None:
+            lines.append(f"pc = {fallthrough}")
+        elif taken == "True":
+            lines.append(f"pc = {target}")
+        else:
+            lines.append(f"pc = {target} if {taken} else {fallthrough}")
+    lines.append(f"ir = {words[-1]}")
+    if any(word >> 12 == STORE for word in words):
+        lines += ["if stale:", "    break"]
+    return [" " * indent + line for line in lines]
+
+
+def _dispatch(blocks, starts, indent):
+    """Binary search on pc over the sorted block starts, running the block found."""
+    pad = " " * indent
+    if len(starts) > 4:
+        middle = len(starts) // 2
+        return ([f"{pad}if pc < {starts[middle]}:"] + _dispatch(blocks, starts[:middle], indent + 4)
+                + [f"{pad}else:"] + _dispatch(blocks, starts[middle:], indent + 4))
+    lines = []
+    for i, start in enumerate(starts):
+        lines.append(f"{pad}{'elif' if i else 'if'} pc == {start}:")
+        lines += _chained_block(start, blocks[start], indent + 4)
+    lines += [f"{pad}else:", f"{pad}    break"]
+    return lines
+
+
+def translate_chain(blocks):
+    """
+    Python source of a chain of blocks
+
+    The generated function takes (ram, acc, pc, ir, code, invalidate, budget)
+    and runs block after block without returning, finding the next block
+    from the PC in the function itself. It returns (PC, ACC, IR,
+    instructions executed) when the PC leaves the chain's blocks (or
+    reaches the halt word), when the next block does not fit in the budget,
+    or after a block whose STORE invalidated translated code.
+
+    Inputs:
+    - blocks: {start: words} of the blocks to chain
+    """
+    lines = [
+        "def chain(ram, acc, pc, ir, code, invalidate, budget):",
+        "    left = budget",
+        "    stale = False",
+        "    while True:",
+    ]
+    lines += _dispatch(blocks, sorted(blocks), 8)
+    lines.append("    return pc, acc, ir, budget - left")
+    return "\n".join(lines) + "\n"
+
+
+def _compile(source, filename, name):
+    namespace = {}
+    exec(compile(source, filename, "exec"), namespace)
+    return namespace[name]
+
+
+class _ImageTable:
+    """
+    Blocks translated from one program image's unmodified words
+
+    Format:
+    - blocks, code: As TranslatingISS._blocks and _code
+    - chain: Chained function of the blocks, or None
+    - chained: Number of blocks the chain was built from
+    """
+
+    def __init__(self):
+        self.blocks = {}
+        self.code = {}
+        self.chain = None
+        self.chained = 0
+
+
+class TranslationCache:
+    """
+    Translations shared by TranslatingISS instances, bounded in size
+
+    Inputs:
+    - max_blocks: Compiled blocks kept
+    - max_images: Image block tables kept
+
+    Format:
+    - blocks: (start, words) -> compiled block function
+    - images: 256-word image tuple -> _ImageTable of the blocks translated
+      from that image's unmodified words, and their chain
+
+    Both are least recently used first out: a hit moves the entry to the
+    end, and an entry added past the limit drops the one at the front. A
+    table keeps its own references to its block functions, so dropping a
+    block does not affect the images that use it.
+    """
+
+    def __init__(self, max_blocks=MAX_CACHED_BLOCKS, max_images=MAX_CACHED_IMAGES):
+        self.max_blocks = max_blocks
+        self.max_images = max_images
+        self.blocks = OrderedDict()
+        self.images = OrderedDict()
+
+    def block(self, start, words):
+        """Compiled function of a block, translated on a miss."""
+        key = (start, words)
+        block = self.blocks.get(key)
+        if block is None:
+            block = self.blocks[key] = _compile(translate(start, words), f"<block {start:#04x}>", "block")
+            if len(self.blocks) > self.max_blocks:
+                self.blocks.popitem(last=False)
+        else:
+            self.blocks.move_to_end(key)
+        return block
+
+    def table(self, image):
+        """Block table of an image tuple, empty on a miss."""
+        table = self.images.get(image)
+        if table is None:
+            table = self.images[image] = _ImageTable()
+            if len(self.images) > self.max_images:
+                self.images.popitem(last=False)
+        else:
+            self.images.move_to_end(image)
+        return table
+
+
+# Cache shared by every TranslatingISS created without one
+TRANSLATION_CACHE = TranslationCache()
+
+
+def compile_block(start, words, cache=TRANSLATION_CACHE):
+    """Compiled function of a block, from the cache when the same words were seen before."""
+    return cache.block(start, words)
+
+
+class TranslatingISS(ISS):
+    """
+    ISS that executes translated basic blocks
+
+    Inputs:
+    - image: 256-word program image, as for ISS
+    - cache: TranslationCache; defaults to the module-wide TRANSLATION_CACHE
+    - chain_after: Blocks dispatched one at a time, after the block set last
+      changed, before the blocks are chained
+
+    State (on top of ISS):
+    - translated: Blocks translated so far (cache hits included)
+    - invalidated: Blocks dropped by stores into their code
+    - chains: Chains built by this instance
+    """
+
+    def __init__(self, image=None, cache=None, chain_after=CHAIN_AFTER):
+        self.cache = TRANSLATION_CACHE if cache is None else cache
+        self.chain_after = chain_after
+        self._table = None
+        super().__init__(image)
+
+    def load(self, image):
+        """Replace the program image and reset, keeping the translation cache."""
+        self.__init__(image, self.cache, self.chain_after)
+
+    def reset(self):
+        super().reset()
+        if self._table is None:
+            # The image only changes through load(), so it is hashed once
+            self._table = self.cache.table(tuple(self.image))
+        table = self._table
+        # Format: start -> (function, length, last word, addresses, words)
+        self._blocks = dict(table.blocks)
+        # Format: address -> frozenset of the starts of every block containing
+        # it (frozen, so the image's table can be copied shallowly)
+        self._code = dict(table.code)
+        # The blocks still hold the image's words
+        self._pristine = True
+        # Incremented whenever _blocks changes
+        self._version = 0
+        self.translated = 0
+        self.invalidated = 0
+        self.chains = 0
+        # Chained function of the blocks, and the _version it was built at
+        self._chain = None
+        self._chained = None
+        if table.blocks:
+            if table.chained == len(table.blocks):
+                self._chain, self._chained = table.chain, 0
+            else:
+                self._chain_blocks()
+
+    def _chain_blocks(self):
+        # Chain every block this instance holds; the image's table keeps the
+        # chain when those are exactly its blocks
+        self._chained = self._version
+        if not self._blocks:
+            self._chain = None
+            return
+        blocks = {start: entry[4] for start, entry in self._blocks.items()}
+        self._chain = _compile(translate_chain(blocks), "<chain>", "chain")
+        self.chains += 1
+        table = self._table
+        if self._pristine and len(self._blocks) == len(table.blocks):
+            table.chain, table.chained = self._chain, len(table.blocks)
+
+    def _translate(self, start):
+        words = block_words(self.ram, start)
+        addresses = [(start + i) & 0xFF for i in range(len(words))]
+        entry = (compile_block(start, words, self.cache), len(words), words[-1], addresses, words)
+        tables = [(self._blocks, self._code)]
+        if all(self.image[address] == word for address, word in zip(addresses, words)):
+            tables.append((self._table.blocks, self._table.code))
+        else:
+            self._pristine = False
+        for blocks, code in tables:
+            blocks[start] = entry
+            for address in addresses:
+                code[address] = code.get(address, frozenset()) | {start}
+        self._version += 1
+        self.translated += 1
+        return entry
+
+    def _invalidate(self, address):
+        for start in self._code.pop(address, ()):
+            entry = self._blocks.pop(start, None)
+            if entry is None:
+                continue
+            self.invalidated += 1
+            self._version += 1
+            self._pristine = False
+            self._chain = None
+            for other in entry[3]:
+                starts = self._code.get(other)
+                if starts is not None:
+                    starts = starts - {start}
+                    if starts:
+                        self._code[other] = starts
+                    else:
+                        del self._code[other]
+
+    def _interpret(self, budget):
+        # One instruction at a time through ISS, invalidating after stores
+        retired = 0
+        while retired < budget:
+            word = self.ram[self.pc]
+            if super()._execute(1) == 0:
+                break
+            retired += 1
+            if word >> 12 == STORE and word & 0xFF in self._code:
+                self._invalidate(word & 0xFF)
+        return retired
+
+    def _execute(self, budget):
+        ram = self.ram
+        blocks = self._blocks
+        code = self._code
+        invalidate = self._invalidate
+        pc = self.pc
+        acc = self.acc
+        ir = self.ir
+        retired = 0
+        dispatched = 0
+
+        while retired < budget:
+            chain = self._chain
+            if chain is not None:
+                # Runs until the PC leaves its blocks, the budget runs short
+                # or a store drops translated code (which also drops the chain)
+                pc, acc, ir, executed = chain(ram, acc, pc, ir, code, invalidate, budget - retired)
+                retired += executed
+                if retired >= budget:
+                    break
+
+            entry = blocks.get(pc)
+            if entry is None:
+                if ram[pc] == HALT:
+                    ir = HALT
+                    self.halted = True
+                    break
+                entry = self._translate(pc)
+            block, length, last, _, _ = entry
+            if retired + length > budget:
+                # Not enough budget left for the whole block
+                self.pc, self.acc, self.ir = pc, acc, ir
+                self.instructions += retired
+                return retired + self._interpret(budget - retired)
+            pc, acc, executed = block(ram, acc, code, invalidate, budget - retired)
+            ir = last
+            retired += executed
+
+            # Blocks that keep being dispatched one at a time are chained,
+            # at most once every chain_after dispatches and only if a block
+            # was translated or dropped since the last chain
+            dispatched += 1
+            if dispatched >= self.chain_after and self._version != self._chained:
+                self._chain_blocks()
+                dispatched = 0
+
+        self.pc = pc
+        self.acc = acc
+        self.ir = ir
+        self.instructions += retired
+        return retired
@@ -0,0 +1,300 @@
+"""
+Compare two VCD files signal by signal
+
+Both files are streamed with VCDReader, so traces of any length can be
+compared in constant memory. Signals are paired by a name mapping, and the
+two files are aligned in one of two ways:
+
+- By time (default): timestamps are converted to femtoseconds with each
+  file's timescale and the signals are compared after every timestamp.
+  This suits a golden waveform and a new trace from the same backend.
+- By sample: each file is sampled once per clock cycle, either just before
+  each rising edge of a clock signal or every `period` time units, and the
+  n-th samples are compared, after dropping `skip` samples (e.g. reset
+  cycles). This suits traces from different backends, whose timescales,
+  clock periods and reset lengths differ.
+
+BACKEND_TRACES maps the architectural signals to their names in the
+full-design Computer.vcd of each backend, with the sampling that lines the
+four of them up: sample 0 is the first cycle after reset, as in Lockstep.py.
+
+Usage (from the repository root):
+
+    python -m SimpleCPUv1a_common.VCDDiff golden.vcd SimpleCPUv1a_myhdl/waveforms/Computer.vcd --signals PC ACC IR
+    python -m SimpleCPUv1a_common.VCDDiff a.vcd b.vcd --backends amaranth pyrtl
+    python -m SimpleCPUv1a_common.VCDDiff a.vcd b.vcd --map cpu.PC=pc_probe --clock-a clk --period-b 10
+    python -m SimpleCPUv1a_common.VCDDiff a.vcd --list
+"""
+
+import argparse
+import sys
+from collections import namedtuple
+
+from SimpleCPUv1a_common.VCDReader import VCDReader
+
+# Full-design traces written by each backend's run_test(trace=True)
+BACKEND_TRACES = {
+    "amaranth": {
+        "signals": {
+            "PC": "top.computer.cpu.counter_PC.Q",
+            "ACC": "top.computer.cpu.register8_ACC.Q",
+            "IR": "top.computer.cpu.register16_IR.Q",
+            "ADDR": "top.computer.cpu.ADDR",
+            "DATA_IN": "top.computer.cpu.DATA_IN",
+            "DATA_OUT": "top.computer.cpu.DATA_OUT",
+        },
+        "clock": "top.clk",
+        "skip": 2,
+    },
+    "myhdl": {
+        "signals": {name: f"computer0.cpu0.{name}" for name in ("PC", "ACC", "IR", "ADDR", "DATA_IN", "DATA_OUT")},
+        "clock": "computer0.clk",
+        "skip": 1,
+    },
+    "pymtl": {
+        "signals": {
+            "PC": "top.cpu.pc.Q",
+            "ACC": "top.cpu.acc.Q",
+            "IR": "top.cpu.ir.Q",
+            "ADDR": "top.cpu.ADDR",
+            "DATA_IN": "top.cpu.DATA_IN",
+            "DATA_OUT": "top.cpu.DATA_OUT",
+        },
+        "clock": "top.clk",
+        "skip": 5,
+    },
+    "pyrtl": {
+        "signals": {
+            "PC": "pc_probe",
+            "ACC": "acc_probe",
+            "IR": "ir_probe",
+            "ADDR": "addr_probe",
+            "DATA_IN": "data_in_probe",
+            "DATA_OUT": "data_out_probe",
+        },
+        "period": 10,
+        "skip": 1,
+    },
+}
+
+# Format of a mismatch:
+# - sample: Sample index after skip, or None when aligned by time
+# - time_a, time_b: Time of the mismatch in each file's own units
+# - signals: Names (as given for file a) of the signals that differ
+# - values_a, values_b: {name: value} of every compared signal
+VCDMismatch = namedtuple("VCDMismatch", "sample time_a time_b signals values_a values_b")
+
+# Format of a result:
+# - compared: Timestamps or samples that matched before the first mismatch
+# - mismatch: VCDMismatch, or None if every compared point matched
+VCDDiffResult = namedtuple("VCDDiffResult", "compared mismatch")
+
+
+def sample_clock(reader, variables, clock):
+    """
+    Sample variables just before every rising edge of a clock
+
+    Yields:
+    - (time of the edge, values before the edge)
+    """
+    variables = [reader.find(var) if isinstance(var, str) else var for var in variables]
+    clock_code = reader.find(clock).code
+    codes = {}
+    for i, var in enumerate(variables):
+        codes.setdefault(var.code, []).append(i)
+
+    values = [None] * len(variables)
+    before = tuple(values)
+    level, time = None, None
+    for change_time, code, value in reader.changes():
+        if change_time != time:
+            time, before = change_time, tuple(values)
+        if code == clock_code:
+            if level == 0 and value == 1:
+                yield time, before
+            level = value
+        for i in codes.get(code, ()):
+            values[i] = value
+
+
+def sample_period(reader, variables, period, start=0):
+    """
+    Sample variables every `period` time units from `start`
+
+    Yields:
+    - (time, values after every change up to and including that time), up
+      to the last timestamp in the file
+    """
+    next_time = start
+    values = None
+    for time, state in reader.states(variables):
+        while values is not None and next_time < time:
+            yield next_time, values
+            next_time += period
+        values = state
+    while values is not None and next_time <= time:
+        yield next_time, values
+        next_time += period
+
+
+def _sampler(reader, variables, clock=None, period=None):
+    if clock is not None:
+        return sample_clock(reader, variables, clock)
+    return sample_period(reader, variables, period)
+
+
+def _compare(names, values_a, values_b):
+    return [name for name, a, b in zip(names, values_a, values_b) if a != b]
+
+
+def diff(path_a, path_b, mapping, clock_a=None, clock_b=None, period_a=None, period_b=None, skip_a=0, skip_b=0):
+    """
+    Find the first point where two VCD files disagree
+
+    Inputs:
+    - path_a, path_b: VCD files
+    - mapping: {name in a: name in b}, or a list of names used for both;
+      names may be unique dotted suffixes (see VCDReader.find)
+    - clock_a/clock_b or period_a/period_b: Sample each file once per cycle
+      (see sample_clock and sample_period); without either, files are
+      aligned by time
+    - skip_a, skip_b: Samples to drop from the start of each file
+
+    Returns:
+    - VCDDiffResult
+    """
+    if not isinstance(mapping, dict):
+        mapping = {name: name for name in mapping}
+    names = list(mapping)
+    by_sample = any(option is not None for option in (clock_a, clock_b, period_a, period_b))
+    if by_sample and ((clock_a is None and period_a is None) or (clock_b is None and period_b is None)):
+        raise ValueError("Sampling needs a clock or a period for both files")
+
+    a, b = VCDReader(path_a), VCDReader(path_b)
+    vars_a = [a.find(name) for name in names]
+    vars_b = [b.find(mapping[name]) for name in names]
+
+    if by_sample:
+        return _diff_samples(names, _sampler(a, vars_a, clock_a, period_a), _sampler(b, vars_b, clock_b, period_b),
+                             skip_a, skip_b)
+    return _diff_times(names, a, b, vars_a, vars_b)
+
+
+def _diff_samples(names, samples_a, samples_b, skip_a, skip_b):
+    for _ in range(skip_a):
+        next(samples_a, None)
+    for _ in range(skip_b):
+        next(samples_b, None)
+
+    compared = 0
+    for (time_a, values_a), (time_b, values_b) in zip(samples_a, samples_b):
+        differs = _compare(names, values_a, values_b)
+        if differs:
+            return VCDDiffResult(compared, VCDMismatch(compared, time_a, time_b, differs,
+                                                       dict(zip(names, values_a)), dict(zip(names, values_b))))
+        compared += 1
+    return VCDDiffResult(compared, None)
+
+
+def _diff_times(names, a, b, vars_a, vars_b):
+    # Merge the two state streams on absolute time (femtoseconds)
+    stream_a = ((time * a.timescale, values) for time, values in a.states(vars_a))
+    stream_b = ((time * b.timescale, values) for time, values in b.states(vars_b))
+    next_a, next_b = next(stream_a, None), next(stream_b, None)
+    values_a = values_b = None
+
+    compared = 0
+    while next_a is not None or next_b is not None:
+        now = min(event[0] for event in (next_a, next_b) if event is not None)
+        if next_a is not None and next_a[0] == now:
+            values_a = next_a[1]
+            next_a = next(stream_a, None)
+        if next_b is not None and next_b[0] == now:
+            values_b = next_b[1]
+            next_b = next(stream_b, None)
+        if values_a is None or values_b is None:
+            continue
+
+        differs = _compare(names, values_a, values_b)
+        if differs:
+            mismatch = VCDMismatch(None, now // a.timescale, now // b.timescale, differs,
+                                   dict(zip(names, values_a)), dict(zip(names, values_b)))
+            return VCDDiffResult(compared, mismatch)
+        compared += 1
+    return VCDDiffResult(compared, None)
+
+
+def diff_backends(path_a, backend_a, path_b, backend_b, signals=None):
+    """diff() of two full-design traces, using the BACKEND_TRACES names and sampling."""
+    trace_a, trace_b = BACKEND_TRACES[backend_a], BACKEND_TRACES[backend_b]
+    signals = signals or list(trace_a["signals"])
+    mapping = {trace_a["signals"][name]: trace_b["signals"][name] for name in signals}
+    return diff(path_a, path_b, mapping,
+                trace_a.get("clock"), trace_b.get("clock"), trace_a.get("period"), trace_b.get("period"),
+                trace_a["skip"], trace_b["skip"])
+
+
+def format_mismatch(mismatch):
+    where = f"sample {mismatch.sample} (" if mismatch.sample is not None else ""
+    lines = [f"First mismatch at {where}time {mismatch.time_a} in a, {mismatch.time_b} in b"
+             f"{')' if mismatch.sample is not None else ''}"]
+    width = max(len(name) for name in mismatch.values_a)
+    for name in mismatch.values_a:
+        a, b = mismatch.values_a[name], mismatch.values_b[name]
+        mark = "  <" if name in mismatch.signals else ""
+        lines.append(f"  {name:<{width}}  {_format(a):>8}  {_format(b):>8}{mark}")
+    return "\n".join(lines)
+
+
+def _format(value):
+    return f"{value:#x}" if isinstance(value, int) else str(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report the first point where two VCD files disagree.")
+    parser.add_argument("a", help="first VCD file (e.g. the golden waveform)")
+    parser.add_argument("b", nargs="?", help="second VCD file")
+    parser.add_argument("--list", action="store_true", help="list the variables of the first file and exit")
+    parser.add_argument("--signals", nargs="+", help="names present in both files, or architectural signals "
+                                                     "with --backends")
+    parser.add_argument("--map", nargs="+", default=[], metavar="A=B", help="pairs of differently named signals")
+    parser.add_argument("--backends", nargs=2, choices=sorted(BACKEND_TRACES), metavar=("A", "B"),
+                        help="full-design traces of these backends: use their signal names and sampling")
+    parser.add_argument("--clock-a", help="sample a before each rising edge of this clock")
+    parser.add_argument("--clock-b", help="sample b before each rising edge of this clock")
+    parser.add_argument("--period-a", type=int, help="sample a every this many time units")
+    parser.add_argument("--period-b", type=int, help="sample b every this many time units")
+    parser.add_argument("--skip-a", type=int, default=0, help="samples to drop from the start of a")
+    parser.add_argument("--skip-b", type=int, default=0, help="samples to drop from the start of b")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for var in VCDReader(args.a).variables.values():
+            print(f"{var.name} [{var.width}]")
+        return
+    if args.b is None:
+        parser.error("two VCD files are needed")
+
+    try:
+        if args.backends:
+            result = diff_backends(args.a, args.backends[0], args.b, args.backends[1], args.signals)
+        else:
+            mapping = {name: name for name in args.signals or []}
+            mapping.update(pair.split("=", 1) for pair in args.map)
+            if not mapping:
+                parser.error("give --signals, --map or --backends")
+            result = diff(args.a, args.b, mapping, args.clock_a, args.clock_b, args.period_a, args.period_b,
+                          args.skip_a, args.skip_b)
+    except (KeyError, ValueError) as e:
+        parser.error(str(e).strip("'\""))
+
+    if result.mismatch is None:
+        by_sample = args.backends or args.clock_a or args.period_a
+        print(f"No mismatch in {result.compared} {'samples' if by_sample else 'timestamps'}")
+    else:
+        print(format_mismatch(result.mismatch))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
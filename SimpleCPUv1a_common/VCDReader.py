@@ -0,0 +1,192 @@
+"""
+Streaming VCD reader
+
+Reads the header of a VCD file (timescale, scopes and variables) up front
+and the value changes as a generator, one line at a time, so memory use does
+not depend on the length of the trace. It accepts the files written by the
+four backends and by VCDWriter, including their differences:
+
+- $timescale on one line ("1 fs") or spread over several ("\\n 10ps\\n")
+- identifier codes shared by several variables (Amaranth aliases)
+- multi-character identifier codes (PyRTL uses the wire names)
+- vector values written with a 0b prefix ("b0b101 !", PyMTL3)
+
+Usage:
+
+    vcd = VCDReader("waveforms/Computer.vcd")
+    pc = vcd.find("cpu.PC")
+    for time, values in vcd.states([pc]):
+        ...
+"""
+
+import re
+from collections import namedtuple
+
+# Format: full dotted name, identifier code, width in bits
+Variable = namedtuple("Variable", "name code width")
+
+TIME_UNITS = {"s": 10 ** 15, "ms": 10 ** 12, "us": 10 ** 9, "ns": 10 ** 6, "ps": 10 ** 3, "fs": 1}
+
+_TIMESCALE = re.compile(r"^(1|10|100)\s*(s|ms|us|ns|ps|fs)$")
+
+
+class VCDFormatError(ValueError):
+    """A VCD file that cannot be parsed."""
+
+
+def parse_timescale(text):
+    """'10 ps' -> 10000 (femtoseconds per time unit)."""
+    match = _TIMESCALE.match(text.strip())
+    if match is None:
+        raise VCDFormatError(f"Unsupported timescale '{text.strip()}'")
+    return int(match.group(1)) * TIME_UNITS[match.group(2)]
+
+
+def parse_value(text):
+    """
+    Value of a VCD value token, without its identifier code
+
+    Returns:
+    - An int, or the lower-cased string when any bit is x or z
+    """
+    if text[0] in "bB":
+        text = text[1:]
+        if text.startswith("0b"):  # PyMTL3
+            text = text[2:]
+    elif text[0] in "rR":
+        return float(text[1:])
+    try:
+        return int(text, 2)
+    except ValueError:
+        return text.lower()
+
+
+class VCDReader:
+    """
+    Header and value changes of one VCD file
+
+    Attributes:
+    - timescale: Femtoseconds per time unit
+    - variables: {full dotted name: Variable}, in file order
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.timescale = TIME_UNITS["s"]
+        self.variables = {}
+        self._read_header()
+
+    def _tokens(self):
+        # Each pass opens the file itself, so several generators can run at once
+        with open(self.path) as f:
+            for line in f:
+                yield from line.split()
+
+    def _read_header(self):
+        tokens = self._tokens()
+        scopes = []
+        for token in tokens:
+            if token == "$enddefinitions":
+                break
+            if not token.startswith("$"):
+                continue
+            body = []
+            for item in tokens:
+                if item == "$end":
+                    break
+                body.append(item)
+
+            if token == "$timescale":
+                self.timescale = parse_timescale("".join(body))
+            elif token == "$scope":
+                scopes.append(body[-1])
+            elif token == "$upscope":
+                scopes.pop()
+            elif token == "$var":
+                if len(body) < 4:
+                    raise VCDFormatError(f"{self.path}: malformed $var {' '.join(body)}")
+                # Format: type width code reference [bit range]
+                name = ".".join(scopes + ["".join(body[3:])])
+                self.variables[name] = Variable(name, body[2], int(body[1]))
+        else:
+            raise VCDFormatError(f"{self.path}: no $enddefinitions")
+        tokens.close()
+
+    def find(self, name):
+        """
+        Look up a variable by its full dotted name or a unique dotted suffix
+
+        "cpu.PC" finds "top.computer.cpu.PC"; several variables sharing one
+        identifier code (aliases of the same net) count as one match.
+
+        Returns:
+        - The Variable
+        """
+        if name in self.variables:
+            return self.variables[name]
+        matches = [var for full, var in self.variables.items() if full.endswith("." + name)]
+        if not matches:
+            raise KeyError(f"{self.path}: no variable named '{name}'")
+        if len({var.code for var in matches}) > 1:
+            raise KeyError(f"{self.path}: '{name}' is ambiguous: {', '.join(var.name for var in matches[:5])}")
+        return matches[0]
+
+    def changes(self):
+        """
+        Generate every value change in file order
+
+        Yields:
+        - (time, code, value); time is in this file's time units, value as
+          returned by parse_value
+        """
+        tokens = self._tokens()
+        for token in tokens:
+            if token == "$enddefinitions":
+                next(tokens)  # $end
+                break
+
+        time = 0
+        for token in tokens:
+            first = token[0]
+            if first == "#":
+                time = int(token[1:])
+            elif first in "bBrR":
+                yield time, next(tokens), parse_value(token)
+            elif first in "01xXzZ":
+                yield time, token[1:], parse_value(first)
+            elif token == "$comment":
+                for item in tokens:
+                    if item == "$end":
+                        break
+            # $dumpvars, $dumpall, $dumpon, $dumpoff and their $end carry no values
+
+    def states(self, variables):
+        """
+        Generate the values of some variables after each timestamp
+
+        Inputs:
+        - variables: Variables (or names for find()) to follow
+
+        Yields:
+        - (time, values) after the last change at each time where at least
+          one of the variables changed; values are in the order given, None
+          until first set
+        """
+        codes = {}
+        for i, var in enumerate(variables):
+            var = var if isinstance(var, Variable) else self.find(var)
+            codes.setdefault(var.code, []).append(i)
+
+        values = [None] * len(variables)
+        time, changed = None, False
+        for change_time, code, value in self.changes():
+            if change_time != time:
+                if changed:
+                    yield time, tuple(values)
+                time, changed = change_time, False
+            for i in codes.get(code, ()):
+                if values[i] != value:
+                    values[i] = value
+                    changed = True
+        if changed:
+            yield time, tuple(values)
@@ -0,0 +1,144 @@
+"""
+Streaming, signal-filtered VCD writer
+
+The full-design traces of the four backends record every net and, for PyRTL,
+hold the whole trace in memory until the end of the run. VCDWriter instead
+records a short allow-list of architectural signals, sampled once per clock
+cycle, and writes each value change to disk as it happens through a buffered
+file, so memory use does not grow with the length of the run.
+
+Usage:
+
+    with VCDWriter("waveforms/Computer.vcd", ["PC", "ACC", "IR"], windows=[(0, 300)]) as vcd:
+        for cycle in range(n):
+            step()
+            vcd.sample(cycle, [pc, acc, ir])
+"""
+
+# Architectural signals every backend can provide, with their widths
+SIGNAL_WIDTHS = {
+    "PC": 8,
+    "ACC": 8,
+    "IR": 16,
+    "ADDR": 8,
+    "DATA_IN": 16,
+    "DATA_OUT": 16,
+}
+
+DEFAULT_SIGNALS = list(SIGNAL_WIDTHS)
+
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+
+def parse_windows(text):
+    """
+    Parse a cycle-window list such as "0:300,1000:1200"
+
+    Returns:
+    - List of (start, end) tuples; end is exclusive and may be None (open)
+    """
+    windows = []
+    for part in text.split(","):
+        start, _, end = part.strip().partition(":")
+        windows.append((int(start or 0), int(end) if end else None))
+    return windows
+
+
+def _identifier(index):
+    # Printable VCD identifier codes: !, ", #, ... then two characters
+    chars = ""
+    index += 1
+    while index:
+        index, digit = divmod(index - 1, 94)
+        chars += chr(33 + digit)
+    return chars
+
+
+class VCDWriter:
+    """
+    Incremental VCD writer for a fixed set of signals
+
+    Inputs:
+    - path: Output .vcd file
+    - signals: Names to record; widths come from SIGNAL_WIDTHS, or pass a
+      {name: width} dict for other signals
+    - windows: Optional list of (start, end) cycle ranges to record; cycles
+      outside every window are skipped. None records the whole run.
+    - timescale: VCD time unit of one clock cycle
+    - scope: Module name shown in the waveform viewer
+    - buffer_size: Size of the file buffer in bytes
+
+    Behavior:
+    - sample(cycle, values) writes only the signals that changed since the
+      previous sample. At the start of each window every signal is written,
+      so a window viewed on its own shows the complete state.
+    """
+
+    def __init__(self, path, signals=None, windows=None, timescale="1 us", scope="Computer",
+                 buffer_size=DEFAULT_BUFFER_SIZE):
+        if signals is None:
+            signals = DEFAULT_SIGNALS
+        if not isinstance(signals, dict):
+            unknown = [name for name in signals if name not in SIGNAL_WIDTHS]
+            if unknown:
+                raise ValueError(f"Unknown signal(s) {', '.join(unknown)}, expected {', '.join(SIGNAL_WIDTHS)}")
+            signals = {name: SIGNAL_WIDTHS[name] for name in signals}
+
+        self.names = list(signals)
+        self.widths = [signals[name] for name in self.names]
+        self.codes = [_identifier(i) for i in range(len(self.names))]
+        self.windows = sorted(windows) if windows else None
+
+        self._last = [None] * len(self.names)
+        self._recording = False
+        self._file = open(path, "w", buffering=buffer_size)
+        self._write_header(timescale, scope)
+
+    def _write_header(self, timescale, scope):
+        lines = [f"$timescale {timescale} $end", f"$scope module {scope} $end"]
+        for name, width, code in zip(self.names, self.widths, self.codes):
+            lines.append(f"$var wire {width} {code} {name} $end")
+        lines += ["$upscope $end", "$enddefinitions $end", ""]
+        self._file.write("\n".join(lines))
+
+    def in_window(self, cycle):
+        if self.windows is None:
+            return True
+        return any(start <= cycle and (end is None or cycle < end) for start, end in self.windows)
+
+    def sample(self, cycle, values):
+        """
+        Record the signal values at the end of a clock cycle
+
+        Inputs:
+        - cycle: Clock cycle number; must increase between calls
+        - values: Integer values in the same order as the signals
+        """
+        if not self.in_window(cycle):
+            self._recording = False
+            return
+
+        changes = []
+        last = self._last
+        for i, value in enumerate(values):
+            value = int(value)
+            if not self._recording or value != last[i]:
+                last[i] = value
+                if self.widths[i] == 1:
+                    changes.append(f"{value}{self.codes[i]}")
+                else:
+                    changes.append(f"b{value:b} {self.codes[i]}")
+        self._recording = True
+
+        if changes:
+            self._file.write(f"#{cycle}\n" + "\n".join(changes) + "\n")
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
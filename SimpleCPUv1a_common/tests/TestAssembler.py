@@ -0,0 +1,104 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from simpleCPUv1a_as import assemble, AssemblerError
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.tests.TestLoader import SOURCE, EXPECTED
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Labels, .addr, comments and every opcode
+FEATURES = """
+# features
+        move 1          # comment
+        store 10
+        jump skip
+        .data 0xff
+skip:
+        load data
+        addm data
+        jumpnz skip
+        .addr 0x40
+data:
+        .data 7
+        .addr 100
+        and 0x0f
+        sub 3
+        subm 64
+        jumpc 0
+"""
+
+
+def assemble_with_cli(source, options, workdir):
+    """Assemble through the command-line tool and load its .dat output."""
+    with open(os.path.join(workdir, "prog.asm"), "w") as f:
+        f.write(source)
+    subprocess.run([sys.executable, os.path.join(REPO_ROOT, "simpleCPUv1a_as.py"), "-i", "prog.asm", "-o", "prog",
+                    *options], cwd=workdir, check=True, capture_output=True)
+    return load_image(os.path.join(workdir, "prog.dat"), cache=False)
+
+
+def run_test(trace=False):
+    print("\n=== Assembler Test Start ===\n")
+
+    image, labels = assemble(SOURCE)
+    passed = image[:len(EXPECTED)] == EXPECTED and labels == {"start": 0, "loop": 8, "end": 16}
+    print(f"{'PASS' if passed else 'FAIL':<6}  multiply program and label table")
+    assert passed, f"FAIL: multiply program\nGot labels {labels}"
+
+    # Format: (source, address, byte_addressable, CLI options, description)
+    test_vectors = [
+        (SOURCE, 0, False, [], "multiply program"),
+        (FEATURES, 0, False, [], "labels, .addr, comments and every opcode"),
+        (FEATURES, 5, False, ["-a", "5"], "address offset (-a)"),
+        (SOURCE, 0, True, ["-b"], "byte addressable (-b)"),
+    ]
+
+    workdir = tempfile.mkdtemp()
+    try:
+        for source, address, byte_addressable, options, desc in test_vectors:
+            image, labels = assemble(source, address, byte_addressable)
+            expected = assemble_with_cli(source, options, workdir)
+            if trace:
+                print(f"    {labels}")
+            passed = image == expected
+            print(f"{'PASS' if passed else 'FAIL':<6}  Same image as the command-line tool: {desc}")
+            assert passed, f"FAIL: {desc}"
+    finally:
+        shutil.rmtree(workdir)
+
+    # Format: (source, description)
+    bad_sources = [
+        ("        move 300\n", "immediate operand above 255"),
+        ("        mov 1\n", "unknown instruction"),
+        ("a:\n        move 1\na:\n", "duplicate label"),
+        ("        load nowhere\n", "undefined label"),
+        ("        move 1 2\n", "extra operand"),
+        ("        move 1\n" * 257, "program bigger than memory"),
+    ]
+    for source, desc in bad_sources:
+        try:
+            assemble(source)
+        except AssemblerError as e:
+            if trace:
+                print(f"    {e}")
+            print(f"{'PASS':<6}  Raised AssemblerError: {desc}")
+        else:
+            raise AssertionError(f"FAIL: no AssemblerError for {desc}")
+
+    count = 1000
+    start = time.perf_counter()
+    for _ in range(count):
+        assemble(SOURCE)
+    elapsed = time.perf_counter() - start
+    print(f"\nIn-process assembly: {count / elapsed:,.0f} programs/s")
+
+    print("\n=== Assembler Test Passed Successfully ===\n")
+
+
+if __name__ == "__main__":
+    run_test(trace=True)
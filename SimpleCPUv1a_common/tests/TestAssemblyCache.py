@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import time
+
+from simpleCPUv1a_as import assemble, AssemblerError
+from SimpleCPUv1a_common import AssemblyCache
+from SimpleCPUv1a_common.AssemblyCache import assemble_cached, cache_key
+from SimpleCPUv1a_common.Loader import load_image, ProgramFormatError
+from SimpleCPUv1a_common.tests.TestLoader import SOURCE, EXPECTED
+
+
+def run_test(trace=False):
+    print("\n=== Assembly Cache Test Start ===\n")
+
+    workdir = tempfile.mkdtemp()
+    cache_dir = os.path.join(workdir, "cache")
+    try:
+        # Format: (address, byte_addressable, description)
+        options = [
+            (0, False, "default options"),
+            (5, False, "address offset (-a)"),
+            (0, True, "byte addressable (-b)"),
+        ]
+        keys = {cache_key(SOURCE, address, byte_addressable) for address, byte_addressable, _ in options}
+        keys.add(cache_key(SOURCE + "\n", 0, False))
+        passed = len(keys) == len(options) + 1
+        print(f"{'PASS' if passed else 'FAIL':<6}  Options and source text give distinct keys")
+        assert passed, "FAIL: cache key collision"
+
+        for address, byte_addressable, desc in options:
+            expected = assemble(SOURCE, address, byte_addressable)
+            first = assemble_cached(SOURCE, address, byte_addressable, cache_dir=cache_dir)
+            # Drop the in-process copy so the second call reads the files back
+            AssemblyCache._programs.clear()
+            second = assemble_cached(SOURCE, address, byte_addressable, cache_dir=cache_dir)
+            passed = first == second == expected
+            print(f"{'PASS' if passed else 'FAIL':<6}  Image and labels round-trip through the cache: {desc}")
+            assert passed, f"FAIL: cached assembly differs: {desc}"
+
+        passed = len(os.listdir(cache_dir)) == 2 * len(options)
+        print(f"{'PASS' if passed else 'FAIL':<6}  One image and one label table per key")
+        assert passed, f"FAIL: unexpected cache contents {sorted(os.listdir(cache_dir))}"
+
+        image, labels = assemble_cached(SOURCE, cache_dir=cache_dir)
+        image[0] = 0xFFFF
+        labels["start"] = 99
+        passed = assemble_cached(SOURCE, cache_dir=cache_dir) == assemble(SOURCE)
+        print(f"{'PASS' if passed else 'FAIL':<6}  Callers get private copies")
+        assert passed, "FAIL: caller modified the cached program"
+
+        # A truncated image is assembled again rather than trusted
+        AssemblyCache._programs.clear()
+        image_file = os.path.join(cache_dir, cache_key(SOURCE) + ".bin")
+        with open(image_file, "r+b") as f:
+            f.truncate(100)
+        passed = assemble_cached(SOURCE, cache_dir=cache_dir) == assemble(SOURCE)
+        passed = passed and os.path.getsize(image_file) == 512
+        print(f"{'PASS' if passed else 'FAIL':<6}  Damaged entry is rebuilt")
+        assert passed, "FAIL: damaged cache entry was used"
+
+        try:
+            assemble_cached("        mov 1\n", cache_dir=cache_dir)
+        except AssemblerError as e:
+            if trace:
+                print(f"    {e}")
+            print(f"{'PASS':<6}  Raised AssemblerError for a bad source")
+        else:
+            raise AssertionError("FAIL: no AssemblerError for a bad source")
+
+        # load_image assembles .asm programs, as used by every backend's run_test
+        path = os.path.join(workdir, "prog.asm")
+        with open(path, "w") as f:
+            f.write(SOURCE)
+        passed = load_image(path) == EXPECTED + [0] * (256 - len(EXPECTED))
+        print(f"{'PASS' if passed else 'FAIL':<6}  load_image reads .asm files")
+        assert passed, "FAIL: .asm image differs from the assembled program"
+
+        with open(path, "w") as f:
+            f.write("        mov 1\n")
+        try:
+            load_image(path)
+        except ProgramFormatError as e:
+            if trace:
+                print(f"    {e}")
+            print(f"{'PASS':<6}  Raised ProgramFormatError for a bad .asm file")
+        else:
+            raise AssertionError("FAIL: no ProgramFormatError for a bad .asm file")
+
+        count = 1000
+        start = time.perf_counter()
+        for _ in range(count):
+            assemble(SOURCE)
+        assemble_time = (time.perf_counter() - start) / count
+        start = time.perf_counter()
+        for _ in range(count):
+            AssemblyCache._programs.clear()
+            assemble_cached(SOURCE, cache_dir=cache_dir)
+        cached_time = (time.perf_counter() - start) / count
+        print(f"\nAssembled: {assemble_time * 1e6:.0f} us, from the on-disk cache: {cached_time * 1e6:.0f} us")
+    finally:
+        AssemblyCache._programs.clear()
+        shutil.rmtree(workdir)
+
+    print("\n=== Assembly Cache Test Passed Successfully ===\n")
+
+
+if __name__ == "__main__":
+    run_test(trace=True)
@@ -0,0 +1,56 @@
+import random
+import time
+
+from SimpleCPUv1a_common.BatchISS import BatchISS
+from SimpleCPUv1a_common.ISS import ISS, HALT
+
+
+def random_image(rng):
+    """Random program: mostly valid opcodes, a sprinkling of data and halt words."""
+    image = [0] * 256
+    for addr in range(rng.randint(4, 64)):
+        roll = rng.random()
+        if roll < 0.05:
+            image[addr] = HALT
+        elif roll < 0.90:
+            image[addr] = (rng.randint(0, 10) << 12) | rng.randint(0, 255)
+        else:
+            image[addr] = rng.randint(0, 0xFFFF)
+    return image
+
+
+def run_test(trace=False, lanes=1000, max_instructions=2000, seed=1):
+    rng = random.Random(seed)
+    images = [random_image(rng) for _ in range(lanes)]
+
+    print("\n=== Batch ISS Test Start ===\n")
+
+    batch = BatchISS(images)
+    start = time.perf_counter()
+    steps = batch.run(max_instructions)
+    elapsed = time.perf_counter() - start
+
+    print(f"Lanes: {lanes}, lockstep steps: {steps}, halted: {int(batch.halted.sum())}")
+    print(f"Batch time: {elapsed:.6f} seconds ({int(batch.instructions.sum()) / elapsed:,.0f} instructions/s)")
+
+    # Every lane must match the scalar golden model exactly
+    for lane, image in enumerate(images):
+        iss = ISS(image)
+        iss.run(max_instructions)
+
+        expected = iss.state()
+        actual = batch.state(lane)
+        if trace:
+            print(f"{lane:<6} PC={actual['PC']:02X} ACC={actual['ACC']:02X} instr={actual['instructions']:<6} "
+                  f"halted={actual['halted']}")
+        assert actual == expected, (
+            f"Lane {lane} diverged from ISS\n"
+            f"Expected: PC={expected['PC']} ACC={expected['ACC']} instr={expected['instructions']}\n"
+            f"Got: PC={actual['PC']} ACC={actual['ACC']} instr={actual['instructions']}"
+        )
+
+    print("\n=== Batch ISS Test Passed Successfully ===\n")
+
+
+if __name__ == "__main__":
+    run_test()
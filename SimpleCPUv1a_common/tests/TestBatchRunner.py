@@ -0,0 +1,58 @@
+import os
+import time
+
+from SimpleCPUv1a_common.Backends import REPO_ROOT
+from SimpleCPUv1a_common.BatchRunner import run_suite
+from SimpleCPUv1a_common.Loader import load_image
+
+PROGRAMS = [os.path.join(REPO_ROOT, "SimpleCPUv1a_amaranth", "programs", name)
+            for name in ("adder.dat", "multiply.dat", "code.dat")]
+BACKENDS = ["amaranth", "pyrtl:compiled"]
+
+
+def run_test(trace=False, workers=2, max_cycles=100):
+    print("\n=== Batch Runner Test Start ===\n")
+
+    cwd = os.getcwd()
+    # The same images twice, so every worker gets more than one program
+    programs = {f"{os.path.basename(path)}#{copy}": path for copy in range(2) for path in PROGRAMS}
+    images = {name: load_image(path) for name, path in programs.items()}
+
+    start = time.perf_counter()
+    records = run_suite(images, BACKENDS, workers, max_cycles)
+    elapsed = time.perf_counter() - start
+    print(f"{len(records)} runs in {elapsed:.3f} seconds")
+
+    passed = os.getcwd() == cwd
+    print(f"{'PASS' if passed else 'FAIL':<6}  driver working directory unchanged")
+    assert passed, f"FAIL: working directory changed to {os.getcwd()}"
+
+    for record in records:
+        if trace:
+            print(f"        {record['backend']:<16} {record['program']:<16} PC={record.get('PC')} "
+                  f"ACC={record.get('ACC')} worker={record.get('worker')}")
+        passed = record["status"] == "ok" and record["matches_iss"]
+        print(f"{'PASS' if passed else 'FAIL':<6}  {record['backend']}: {record['program']} "
+              f"matches the ISS after {record.get('instructions')} periods")
+        assert passed, f"FAIL: {record['backend']} {record['program']}: {record.get('error', 'state differs from ISS')}"
+
+    # Sessions are elaborated once per worker and reused
+    for backend in BACKENDS:
+        pids = {record["worker"] for record in records if record["backend"] == backend}
+        passed = len(pids) <= workers
+        print(f"{'PASS' if passed else 'FAIL':<6}  {backend}: {len(programs)} programs on {len(pids)} warm workers")
+        assert passed, f"FAIL: {backend} used {len(pids)} workers, expected at most {workers}"
+
+    try:
+        run_suite(images, ["verilog"])
+        passed = False
+    except ValueError:
+        passed = True
+    print(f"{'PASS' if passed else 'FAIL':<6}  unknown backend rejected")
+    assert passed, "FAIL: unknown backend accepted"
+
+    print("\n=== Batch Runner Test Passed Successfully ===\n")
+
+
+if __name__ == "__main__":
+    run_test()
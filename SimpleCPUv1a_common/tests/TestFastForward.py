@@ -0,0 +1,97 @@
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from SimpleCPUv1a_common import Snapshot
+from SimpleCPUv1a_common.FastForward import fast_forward, hybrid_run, iss_snapshot
+from SimpleCPUv1a_common.ISS import ISS
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.Sessions import open_session
+
+# A long initialisation loop, then the region we want to see at RTL level
+SOURCE = """
+# count down from 150, then add 7 + 7 and spin
+init:
+        move 150
+        store 200
+clear:
+        load 200
+        sub 1
+        store 200
+        jumpnz clear
+region:
+        move 7
+        store 201
+        addm 201
+        store 202
+done:
+        jump done
+"""
+BACKENDS = ["amaranth", "myhdl", "pymtl", "pyrtl:fast"]
+
+
+def _rtl_checkpoint(backend, image, instructions):
+    session = open_session(backend)
+    session.run_program(image, instructions)
+    return session.snapshot()
+
+
+def run_test(trace=False):
+    print("\n=== Fast-Forward Test Start ===\n")
+
+    with tempfile.TemporaryDirectory() as folder:
+        program = os.path.join(folder, "countdown.asm")
+        with open(program, "w") as f:
+            f.write(SOURCE)
+        image = load_image(program)
+        # The assembler cannot emit the 0xFFFF halt word, so the program
+        # spins at done and every run ends on its cycle budget
+        handoff = 2 + 150 * 4
+
+        # The ISS hand-off state is the state the RTL reaches by itself
+        context = multiprocessing.get_context("spawn")
+        for backend in ("amaranth", "myhdl"):
+            with ProcessPoolExecutor(1, context) as pool:
+                rtl = pool.submit(_rtl_checkpoint, backend, image, 25).result()
+            passed = rtl == iss_snapshot(fast_forward(image, instructions=25))
+            print(f"{'PASS' if passed else 'FAIL':<6}  {backend}: state after 25 instructions matches the ISS snapshot")
+            assert passed, f"FAIL: {Snapshot.unpack(rtl)[:5]}"
+
+        # Hand off at the region label, skipping the 602-instruction loop
+        records = hybrid_run(program, BACKENDS, label="region", rtl_cycles=20, compare=True)
+        for record in records:
+            if trace:
+                print(f"        {record['backend']:<10} hand-off {record.get('handoff')}, RTL {record.get('rtl_s', 0):.3f} s, "
+                      f"from reset {record.get('full_rtl_s', 0):.3f} s")
+            # PyMTL3 takes a wrong branch in the loop when run from reset (see
+            # the README); the hybrid run never executes the loop on it
+            passed = (record["status"] == "ok" and record["handoff"] == handoff
+                      and record["instructions"] == handoff + 20 and record["matches_iss"]
+                      and record["matches_full_rtl"] != (record["backend"] == "pymtl")
+                      and record["ACC"] == 14 and record["RAM"][202] == 0x500E)
+            print(f"{'PASS' if passed else 'FAIL':<6}  {record['backend']}: handed off at instruction "
+                  f"{record['handoff']}, ends like the full run ({record.get('rtl_s', 0):.3f} s "
+                  f"vs {record.get('full_rtl_s', 0):.3f} s)")
+            assert passed, f"FAIL: {record}"
+
+    # Hand-off points
+    iss = fast_forward(image, pc=2, hits=3)
+    passed = iss.pc == 2 and iss.instructions == 2 + 2 * 4
+    print(f"{'PASS' if passed else 'FAIL':<6}  third visit of PC 2 after {iss.instructions} instructions")
+    assert passed, f"FAIL: PC {iss.pc} after {iss.instructions} instructions"
+
+    for kwargs in ({"pc": 2, "hits": 1000, "max_instructions": 10000}, {"pc": 0x80, "max_instructions": 10000}, {"pc": 2, "instructions": 3}):
+        try:
+            fast_forward(image, **kwargs)
+            passed = False
+        except ValueError:
+            passed = True
+        print(f"{'PASS' if passed else 'FAIL':<6}  unreachable hand-off point {kwargs} rejected")
+        assert passed, f"FAIL: {kwargs} accepted"
+
+    print("\n=== Fast-Forward Test Passed Successfully ===\n")
+
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,63 @@
+from SimpleCPUv1a_common.ISS import ISS, HALT, disassemble
+
+
+def make_image(words):
+    """Place a list of instruction words at address 0 of a 256-word image."""
+    image = [0] * 256
+    image[:len(words)] = words
+    return image
+
+
+def run_test(trace=False):
+    # multiply.dat: 5 * 4 by repeated addition, result stored at address 252
+    multiply = make_image([
+        0x0005, 0x50FF, 0x0004, 0x50FE, 0x40FE, 0x50FD, 0x0000, 0x50FC,
+        0x40FC, 0x60FF, 0x50FC, 0x40FD, 0x2001, 0x9010, 0x50FD, 0x8008,
+        0x40FC, HALT,
+    ])
+
+    # Format: (image, expected PC, expected ACC, {address: expected word}, description)
+    test_vectors = [
+        (make_image([0x00AA, 0x3055, HALT]), 2, 0x00, {}, "MOVE/AND: 0xAA & 0x55 = 0"),
+        (make_image([0x00FF, 0x1001, HALT]), 2, 0x00, {}, "ADD with overflow: 255 + 1 = 0"),
+        (make_image([0x000A, 0x2014, HALT]), 2, 0xF6, {}, "SUB: 10 - 20 = 246 (unsigned wrap)"),
+        (make_image([0x0007, 0x5010, HALT]), 2, 0x07, {0x10: 0x5007}, "STORE keeps IR[15:12] in the upper nibble"),
+        (make_image([0x4004, 0x6004, 0x7005, HALT, 0x0003, 0x0001]), 3, 0x05, {}, "LOAD/ADDM/SUBM: 3 + 3 - 1 = 5"),
+        (make_image([0x0000, 0x9004, 0x00FF, HALT, 0x0001, 0xA007, 0x00FF, HALT]), 7, 0x01, {},
+         "JUMPZ taken, JUMPNZ taken"),
+        (make_image([0x0001, 0x9004, 0x8005, HALT, HALT, 0x0000, 0xA002, HALT]), 7, 0x00, {},
+         "JUMPZ not taken, JUMPU, JUMPNZ not taken"),
+        (multiply, 17, 20, {252: 0x5014, 253: 0x5001, 254: 0x5004, 255: 0x5005}, "multiply.dat: 5 * 4 = 20"),
+    ]
+
+    print("\n=== ISS Test Start ===\n")
+    print(f"{'PC':>4} {'ACC':>4} {'Instr':>6} {'Cycles':>7} | Result  Description")
+    print("-" * 75)
+
+    for image, expected_pc, expected_acc, expected_ram, desc in test_vectors:
+        iss = ISS(image)
+
+        if trace:
+            for record in iss.iter_trace():
+                print(f"    {record.cycle:>5}  {record.pc:02X}  {disassemble(record.ir):<12} ACC={record.acc:02X}")
+        else:
+            iss.run()
+
+        passed = (
+            iss.halted
+            and iss.pc == expected_pc
+            and iss.acc == expected_acc
+            and all(iss.ram[addr] == word for addr, word in expected_ram.items())
+        )
+        result = "PASS" if passed else "FAIL"
+        print(f"{iss.pc:>4} {iss.acc:>4} {iss.instructions:>6} {iss.cycles:>7} | {result:<6}  {desc}")
+        assert passed, (
+            f"FAIL: {desc}\n"
+            f"Expected PC={expected_pc} ACC={expected_acc}, Got PC={iss.pc} ACC={iss.acc} halted={iss.halted}"
+        )
+
+    print("\n=== ISS Test Passed Successfully ===\n")
+
+
+if __name__ == "__main__":
+    run_test(trace=True)
@@ -0,0 +1,116 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from SimpleCPUv1a_common.Loader import load_image, parse_image, ProgramFormatError
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# multiply.dat without the hand-written halt word, which the assembler cannot emit
+SOURCE = """
+# multiply 5 * 4
+start:
+    move 5
+    store 255
+    move 4
+    store 254
+    load 254
+    store 253
+    move 0
+    store 252
+loop:
+    load 252
+    addm 255
+    store 252
+    load 253
+    sub 1
+    jumpz end
+    store 253
+    jumpu loop
+end:
+    load 252
+    .data 0x12
+"""
+
+EXPECTED = [
+    0x0005, 0x50FF, 0x0004, 0x50FE, 0x40FE, 0x50FD, 0x0000, 0x50FC,
+    0x40FC, 0x60FF, 0x50FC, 0x40FD, 0x2001, 0x9010, 0x50FD, 0x8008,
+    0x40FC, 0x0012,
+]
+
+
+def run_test(trace=False):
+    print("\n=== Loader Test Start ===\n")
+
+    workdir = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(workdir, "prog.asm"), "w") as f:
+            f.write(SOURCE)
+        subprocess.run([sys.executable, os.path.join(REPO_ROOT, "simpleCPUv1a_as.py"), "-i", "prog.asm", "-o", "prog"],
+                       cwd=workdir, check=True, capture_output=True)
+
+        expected = EXPECTED + [0] * (256 - len(EXPECTED))
+
+        # Every assembler output format yields the same image
+        for fmt in (".dat", ".asc", ".mem", ".mif"):
+            image = load_image(os.path.join(workdir, "prog" + fmt), cache=False)
+            if trace:
+                print(f"    {fmt}: {' '.join(f'{word:04X}' for word in image[:len(EXPECTED)])}")
+            passed = image == expected
+            print(f"{'PASS' if passed else 'FAIL':<6}  {fmt} output of simpleCPUv1a_as.py")
+            assert passed, f"FAIL: {fmt} image differs from the assembled program"
+
+        # Cached loads return the same image, and a rewritten file is parsed again
+        cache_dir = os.path.join(workdir, "cache")
+        path = os.path.join(workdir, "prog.dat")
+
+        start = time.perf_counter()
+        first = load_image(path, cache_dir=cache_dir)
+        parse_time = time.perf_counter() - start
+        start = time.perf_counter()
+        second = load_image(path, cache_dir=cache_dir)
+        cached_time = time.perf_counter() - start
+
+        passed = first == second == expected and len(os.listdir(cache_dir)) == 1
+        print(f"{'PASS' if passed else 'FAIL':<6}  Cached reload ({parse_time * 1e6:.0f} us parsed, "
+              f"{cached_time * 1e6:.0f} us cached)")
+        assert passed, "FAIL: cached image differs or was not written"
+
+        second[0] = 0xFFFF
+        assert load_image(path, cache_dir=cache_dir)[0] == 0x0005, "FAIL: caller modified the cached image"
+
+        with open(path, "a") as f:
+            f.write("0200 1111111111111111\n")
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+        passed = load_image(path, cache_dir=cache_dir)[200] == 0xFFFF
+        print(f"{'PASS' if passed else 'FAIL':<6}  Modified file invalidates the cache")
+        assert passed, "FAIL: stale image returned after the file changed"
+    finally:
+        shutil.rmtree(workdir)
+
+    # Format: (text, format, description)
+    bad_inputs = [
+        ("0256 0000000000000001\n", ".dat", "address outside memory"),
+        ("0001 00000000000000012\n", ".dat", "non-binary word"),
+        ("0001 11111111111111111\n", ".dat", "word wider than 16 bits"),
+        ("@0001 0500\n", ".mem", "odd byte address"),
+        ("0000 05 FF\n", ".asc", "byte-wide .asc file"),
+    ]
+    for text, fmt, desc in bad_inputs:
+        try:
+            parse_image(text, fmt)
+        except ProgramFormatError as e:
+            if trace:
+                print(f"    {e}")
+            print(f"{'PASS':<6}  Rejected {desc}")
+        else:
+            raise AssertionError(f"FAIL: accepted {desc}")
+
+    print("\n=== Loader Test Passed Successfully ===\n")
+
+
+if __name__ == "__main__":
+    run_test(trace=True)
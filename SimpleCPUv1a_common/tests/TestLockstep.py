@@ -0,0 +1,63 @@
+import os
+import time
+
+from SimpleCPUv1a_common.ISS import ISS
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.Lockstep import REPO_ROOT, cosimulate, format_divergence
+
+PROGRAMS = os.path.join(REPO_ROOT, "SimpleCPUv1a_amaranth", "programs")
+BACKENDS = ["amaranth", "myhdl:rtl", "pyrtl:compiled"]
+
+
+def run_test(trace=False):
+    print("\n=== Lockstep Test Start ===\n")
+
+    # Unknown variants and the C netlist (no per-cycle samples) are refused
+    # before any worker starts, instead of running the default variant
+    for backends in (["amaranth:typo"], ["myhdl:verilog"], ["amaranth:native"]):
+        try:
+            cosimulate(os.path.join(PROGRAMS, "adder.dat"), backends)
+            passed = False
+        except ValueError:
+            passed = True
+        print(f"{'PASS' if passed else 'FAIL':<6}  {backends[0]} rejected")
+        assert passed, f"FAIL: {backends[0]} accepted"
+
+    # The reliable backends agree with each other and the ISS up to the halt
+    for name in ("adder.dat", "multiply.dat"):
+        path = os.path.join(PROGRAMS, name)
+        instructions = ISS(load_image(path)).run()
+
+        start = time.perf_counter()
+        result = cosimulate(path, BACKENDS)
+        elapsed = time.perf_counter() - start
+
+        passed = result.divergence is None and result.cycles >= 3 * instructions
+        print(f"{'PASS' if passed else 'FAIL':<6}  {name}: {result.cycles} cycles in lockstep "
+              f"({instructions} instructions, {elapsed:.2f} s)")
+        assert passed, f"FAIL: {name}\n{format_divergence(result.divergence) if result.divergence else result}"
+
+    # PyMTL3 takes the wrong branch on multiply.dat (see the README); the
+    # first bad cycle is the JUMPZ execute, before the PC has been used
+    result = cosimulate(os.path.join(PROGRAMS, "multiply.dat"), ["amaranth", "pymtl", "pyrtl:compiled"], history=3)
+    divergence = result.divergence
+    if trace and divergence is not None:
+        print(format_divergence(divergence))
+        print()
+
+    passed = (divergence is not None and divergence.mismatched == ["pymtl"]
+              and divergence.instruction is not None and (divergence.instruction.ir >> 12) == 0x9
+              and divergence.values["pymtl"]["PC"] != divergence.expected["PC"])
+    print(f"{'PASS' if passed else 'FAIL':<6}  pymtl diverges at cycle {divergence.cycle if divergence else None} "
+          f"on a JUMPZ, with the other backends agreeing before it")
+    assert passed, f"FAIL: expected a PyMTL3 PC divergence on JUMPZ, got {divergence}"
+
+    passed = all(len(rows) == 3 for rows in divergence.history.values() if rows)
+    print(f"{'PASS' if passed else 'FAIL':<6}  {len(next(iter(divergence.history.values())))} cycles of history kept")
+    assert passed, "FAIL: history length"
+
+    print("\n=== Lockstep Test Passed Successfully ===\n")
+
+
+if __name__ == "__main__":
+    run_test()
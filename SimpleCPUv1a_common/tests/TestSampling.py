@@ -0,0 +1,108 @@
+import importlib
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.Sampling import CONTROL_LOGIC, CONTROL_SIGNALS, sample_run
+from SimpleCPUv1a_common.Sessions import open_session
+
+SOURCE = """
+# nested countdown: the inner loop stores and adds, the outer one restarts it
+outer:
+        move 9
+        store 200
+inner:
+        load 200
+        sub 1
+        store 200
+        addm 201
+        store 201
+        load 200
+        jumpnz inner
+        move 0
+        jumpz outer
+"""
+INSTRUCTIONS = 1200
+
+
+def _full_run(image):
+    """Subprocess: control-signal toggles of an uninterrupted Amaranth run."""
+    session = open_session("amaranth")
+    monitor = importlib.import_module("ActivityMonitor").ActivityMonitor(session.sim)
+    with monitor:
+        session.run_program(image, INSTRUCTIONS)
+    counts = monitor.signal_counts()
+    return {name: counts.get(f"{CONTROL_LOGIC}/{name}", (0, 0))[0] for name in CONTROL_SIGNALS}
+
+
+def run_test(trace=False):
+    print("\n=== Sampling Test Start ===\n")
+
+    with tempfile.TemporaryDirectory() as folder:
+        program = os.path.join(folder, "loops.asm")
+        with open(program, "w") as f:
+            f.write(SOURCE)
+        image = load_image(program)
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(1, context) as pool:
+            full = pool.submit(_full_run, image).result()
+
+        # Back-to-back windows cover the whole run, so the estimates are the
+        # full run's counts; each window is measured after its one-period
+        # warm-up, so the census covers periods 1-1200 instead of 0-1199
+        census = sample_run(program, "amaranth", period=10, window=10, max_instructions=INSTRUCTIONS)
+        cpi = census.estimates["CPI"]
+        passed = census.windows == INSTRUCTIONS // 10 and cpi.mean == 3 and cpi.total == 3 * INSTRUCTIONS
+        print(f"{'PASS' if passed else 'FAIL':<6}  census: {census.windows} windows, CPI {cpi.mean}, "
+              f"{cpi.total:.0f} cycles")
+        assert passed, f"FAIL: {census.windows} windows, CPI {cpi}"
+
+        totals = {name: census.estimates[f"signal/{name}"].total for name in CONTROL_SIGNALS}
+        if trace:
+            for name, total in totals.items():
+                print(f"        {name:<8} full run {full[name]:>5}, census {total:>7.1f}")
+        passed = all(abs(total - full[name]) <= 4 for name, total in totals.items())
+        print(f"{'PASS' if passed else 'FAIL':<6}  census: {len(totals)} control-signal totals match the full run")
+        assert passed, f"FAIL: {totals} != {full}"
+
+        # A sparse sample simulates a fraction of the run in detail; its
+        # period is prime so the windows do not alias with the 67-instruction
+        # outer loop
+        sparse = sample_run(program, "amaranth", period=83, window=10, max_instructions=INSTRUCTIONS)
+        misses = []
+        for name in CONTROL_SIGNALS:
+            e = sparse.estimates[f"signal/{name}"]
+            if trace:
+                print(f"        {name:<8} full run {full[name]:>5}, estimate {e.total:>7.1f} +/- {e.total_half_width:.1f}")
+            if abs(e.total - full[name]) > max(e.total_half_width, 0.1 * full[name]):
+                misses.append(name)
+        fraction = sparse.detailed / INSTRUCTIONS
+        passed = fraction <= 0.15 and not misses
+        print(f"{'PASS' if passed else 'FAIL':<6}  sparse: {fraction:.1%} in detail, control-signal totals within "
+              f"their intervals")
+        assert passed, f"FAIL: {fraction:.1%} in detail, outside the interval: {misses}"
+
+        # Backends without an activity monitor still estimate the cycle count
+        result = sample_run(program, "pyrtl:fast", period=50, window=5, max_instructions=INSTRUCTIONS)
+        passed = list(result.estimates) == ["CPI"] and result.estimates["CPI"].total == 3 * INSTRUCTIONS
+        print(f"{'PASS' if passed else 'FAIL':<6}  pyrtl:fast: {result.windows} windows, "
+              f"{result.estimates['CPI'].total:.0f} cycles")
+        assert passed, f"FAIL: {result.estimates}"
+
+        for kwargs in ({"warmup": 0}, {"period": 2000}, {"offset": 50, "period": 50}):
+            try:
+                sample_run(program, **{"max_instructions": INSTRUCTIONS, **kwargs})
+                passed = False
+            except ValueError:
+                passed = True
+            print(f"{'PASS' if passed else 'FAIL':<6}  {kwargs} rejected")
+            assert passed, f"FAIL: {kwargs} accepted"
+
+    print("\n=== Sampling Test Passed Successfully ===\n")
+
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,119 @@
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from SimpleCPUv1a_common import Snapshot
+from SimpleCPUv1a_common.Backends import REPO_ROOT
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.Sessions import open_session
+
+PROGRAM = os.path.join(REPO_ROOT, "SimpleCPUv1a_amaranth", "programs", "multiply.dat")
+CHECKPOINT = 10    # Instruction periods simulated before the snapshot
+
+
+def _checkpoint_run(backend, mem, foreign=None):
+    """
+    Subprocess: run mem to the end, and again from its own snapshot (and
+    optionally a snapshot from another backend), on one warm session
+
+    Returns:
+    - {"final", "checkpoint", "resumed", "repeated", "foreign"}: snapshot blobs
+    """
+    session = open_session(backend)
+
+    blobs = {}
+    session.run_program(mem, 500)
+    blobs["final"] = session.snapshot()
+
+    session.run_program(mem, CHECKPOINT)
+    blobs["checkpoint"] = checkpoint = session.snapshot()
+
+    # Restoring a state and reading it back is lossless
+    session.restore(checkpoint)
+    blobs["restored"] = session.snapshot()
+    session.resume(500)
+    blobs["resumed"] = session.snapshot()
+
+    # The same prefix reused by a second run
+    session.restore(checkpoint)
+    session.resume(500)
+    blobs["repeated"] = session.snapshot()
+
+    if foreign is not None:
+        session.restore(foreign)
+        session.resume(500)
+        blobs["foreign"] = session.snapshot()
+    return blobs
+
+
+def _run(backend, *args):
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(1, context) as pool:
+        return pool.submit(_checkpoint_run, backend, *args).result()
+
+
+def run_test(trace=False):
+    print("\n=== Snapshot Test Start ===\n")
+
+    mem = load_image(PROGRAM)
+
+    # Blob format
+    state = Snapshot.MachineState(0x12, 0x34, 0x5678, Snapshot.DECODE, 123456, list(range(0, 512, 2)))
+    blob = Snapshot.pack(state)
+    passed = len(blob) == Snapshot.SIZE == 526 and Snapshot.unpack(blob) == state
+    print(f"{'PASS' if passed else 'FAIL':<6}  pack/unpack round trip in {len(blob)} bytes")
+    assert passed, f"FAIL: {Snapshot.unpack(blob)} != {state}"
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "state.snap")
+        Snapshot.save(path, state)
+        passed = Snapshot.load(path) == blob
+    print(f"{'PASS' if passed else 'FAIL':<6}  save/load")
+    assert passed, "FAIL: saved snapshot differs"
+
+    for bad, reason in ((blob[:-1], "truncated"), (b"XXXX" + blob[4:], "bad magic"),
+                        (blob[:4] + bytes([Snapshot.VERSION + 1]) + blob[5:], "newer version")):
+        try:
+            Snapshot.unpack(bad)
+            passed = False
+        except Snapshot.SnapshotError:
+            passed = True
+        print(f"{'PASS' if passed else 'FAIL':<6}  {reason} blob rejected")
+        assert passed, f"FAIL: {reason} blob accepted"
+
+    # PyRTL's run loop stops one clock edge past the budget, in the decode
+    # stage, so its checkpoint also exercises a mid-instruction restore on
+    # the other backends
+    results = {"pyrtl": _run("pyrtl", mem)}
+    foreign = results["pyrtl"]["checkpoint"]
+    for backend in ("amaranth", "myhdl", "myhdl:rtl", "pymtl", "pyrtl:fast"):
+        results[backend] = _run(backend, mem, foreign)
+
+    for backend, blobs in results.items():
+        checkpoint = Snapshot.unpack(blobs["checkpoint"])
+        if trace:
+            final = Snapshot.unpack(blobs["final"])
+            print(f"        {backend:<10} checkpoint PC={checkpoint.pc} ACC={checkpoint.acc} IR={checkpoint.ir:#06x} "
+                  f"ring={checkpoint.ring:03b} cycles={checkpoint.cycles}; final cycles={final.cycles}")
+
+        passed = blobs["restored"] == blobs["checkpoint"]
+        print(f"{'PASS' if passed else 'FAIL':<6}  {backend}: snapshot after restore() is the restored state")
+        assert passed, f"FAIL: {backend}: {Snapshot.unpack(blobs['restored'])} != {checkpoint}"
+
+        passed = blobs["resumed"] == blobs["repeated"] == blobs["final"]
+        print(f"{'PASS' if passed else 'FAIL':<6}  {backend}: resumed from cycle {checkpoint.cycles}, "
+              f"twice, ends as the uninterrupted run")
+        assert passed, f"FAIL: {backend}: {Snapshot.unpack(blobs['resumed'])[:5]} != {Snapshot.unpack(blobs['final'])[:5]}"
+
+        if "foreign" in blobs:
+            passed = blobs["foreign"] == blobs["final"]
+            print(f"{'PASS' if passed else 'FAIL':<6}  {backend}: resumed from the pyrtl snapshot "
+                  f"(ring={Snapshot.unpack(foreign).ring:03b}), ends as its own run")
+            assert passed, f"FAIL: {backend}: {Snapshot.unpack(blobs['foreign'])[:5]}"
+
+    print("\n=== Snapshot Test Passed Successfully ===\n")
+
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,109 @@
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from SimpleCPUv1a_common.Backends import REPO_ROOT
+from SimpleCPUv1a_common.ISS import ISS
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.Sessions import open_session
+from SimpleCPUv1a_common.Streaming import stream_run
+
+MULTIPLY = os.path.join(REPO_ROOT, "SimpleCPUv1a_amaranth", "programs", "multiply.dat")
+
+SOURCE = """
+# never halts
+start:
+        add 1
+        store 200
+        jump start
+"""
+BACKENDS = ["amaranth", "pyrtl:fast", "pyrtl:compiled"]
+
+
+def _final_state(session):
+    # The compiled PyRTL engine cannot take snapshots; compare what it reports
+    try:
+        return session.snapshot()
+    except ValueError:
+        return session.state()
+
+
+def _stream(backend, spin, multiply):
+    """Subprocess: chunked and uninterrupted runs on one session."""
+    session = open_session(backend)
+    results = {"chunked": list(stream_run(session, spin, max_cycles=2500, every=1000))}
+    results["chunked_snapshot"] = _final_state(session)
+    session.run_program(spin, 2500)
+    results["whole_snapshot"] = _final_state(session)
+
+    results["multiply"] = list(stream_run(session, multiply, every=15))
+    # multiply.dat halts in its 40th period, the end of the fourth chunk
+    results["boundary"] = list(stream_run(session, multiply, every=10))
+    results["timeout"] = list(stream_run(session, spin, timeout=0, every=100))
+    return results
+
+
+def run_test(trace=False):
+    print("\n=== Streaming Test Start ===\n")
+
+    with tempfile.TemporaryDirectory() as folder:
+        program = os.path.join(folder, "spin.asm")
+        with open(program, "w") as f:
+            f.write(SOURCE)
+        spin = load_image(program)
+    multiply = load_image(MULTIPLY)
+    reference = ISS(multiply)
+    reference.run()
+
+    context = multiprocessing.get_context("spawn")
+    for backend in BACKENDS:
+        with ProcessPoolExecutor(1, context) as pool:
+            results = pool.submit(_stream, backend, spin, multiply).result()
+        if trace:
+            for progress in results["chunked"] + results["multiply"]:
+                print(f"        {backend:<10} {progress}")
+
+        # Chunks end where the budget says and do not change the simulation
+        chunked = results["chunked"]
+        passed = ([(p.periods, p.status) for p in chunked] == [(1000, "running"), (2000, "running"), (2500, "budget")]
+                  and results["chunked_snapshot"] == results["whole_snapshot"])
+        print(f"{'PASS' if passed else 'FAIL':<6}  {backend}: 2500 periods in 3 records, same state as one run")
+        assert passed, f"FAIL: {chunked}"
+
+        # A halting program stops early, with the reference model's state
+        last = results["multiply"][-1]
+        passed = (last.status == "halted" and len(results["multiply"]) == 3
+                  and (last.PC, last.ACC) == (reference.pc, reference.acc)
+                  and all(p.status == "running" for p in results["multiply"][:-1]))
+        print(f"{'PASS' if passed else 'FAIL':<6}  {backend}: multiply.dat halted after {last.instructions} "
+              f"instructions, PC={last.PC} ACC={last.ACC}")
+        assert passed, f"FAIL: {results['multiply']}"
+
+        # A halt on the last period of a chunk is reported as such
+        boundary = results["boundary"]
+        passed = ([(p.periods, p.instructions, p.status) for p in boundary]
+                  == [(10, 10, "running"), (20, 20, "running"), (30, 30, "running"), (40, 39, "halted")]
+                  and (boundary[-1].PC, boundary[-1].ACC) == (reference.pc, reference.acc))
+        print(f"{'PASS' if passed else 'FAIL':<6}  {backend}: multiply.dat in chunks of 10 halts on a chunk boundary")
+        assert passed, f"FAIL: {boundary}"
+
+        # The timeout is checked after every chunk
+        passed = [(p.periods, p.status) for p in results["timeout"]] == [(100, "timeout")]
+        print(f"{'PASS' if passed else 'FAIL':<6}  {backend}: timeout ends the run after one chunk")
+        assert passed, f"FAIL: {results['timeout']}"
+
+    for kwargs in ({"every": 0}, {"max_cycles": 0}, {"max_cycles": 2 ** 32}):
+        try:
+            next(stream_run(None, spin, **kwargs))
+            passed = False
+        except ValueError:
+            passed = True
+        print(f"{'PASS' if passed else 'FAIL':<6}  {kwargs} rejected")
+        assert passed, f"FAIL: {kwargs} accepted"
+
+    print("\n=== Streaming Test Passed Successfully ===\n")
+
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,162 @@
+import os
+import random
+import time
+
+from SimpleCPUv1a_common.Backends import REPO_ROOT
+from SimpleCPUv1a_common.ISS import ISS, HALT
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.Translator import TRANSLATION_CACHE, TranslatingISS, TranslationCache
+from SimpleCPUv1a_common.tests.TestISS import make_image
+
+MULTIPLY = os.path.join(REPO_ROOT, "SimpleCPUv1a_amaranth", "programs", "multiply.dat")
+
+
+def random_image(rng):
+    """Random program: mostly valid opcodes, a sprinkling of data and halt words (as in TestBatchISS)."""
+    image = [0] * 256
+    for addr in range(rng.randint(4, 64)):
+        roll = rng.random()
+        if roll < 0.05:
+            image[addr] = HALT
+        elif roll < 0.90:
+            image[addr] = (rng.randint(0, 10) << 12) | rng.randint(0, 255)
+        else:
+            image[addr] = rng.randint(0, 0xFFFF)
+    return image
+
+
+def run_test(trace=False, programs=500, max_instructions=2000, seed=2):
+    print("\n=== Translator Test Start ===\n")
+
+    # Random programs exercise every opcode, stray data words and stores
+    # into code; the final state must match the interpreter exactly, with
+    # blocks dispatched one at a time, chained after every dispatch, and
+    # chained from the image's table by a second instance
+    rng = random.Random(seed)
+    invalidated = chains = 0
+    for n in range(programs):
+        image = random_image(rng)
+        expected = ISS(image)
+        expected.run(max_instructions)
+        cache = TranslationCache()
+        for actual in (TranslatingISS(image), TranslatingISS(image, cache, chain_after=1),
+                       TranslatingISS(image, cache, chain_after=1)):
+            actual.run(max_instructions)
+            invalidated += actual.invalidated
+            chains += actual.chains
+            assert actual.state() == expected.state(), f"FAIL: program {n} diverged from ISS\n{image[:64]}"
+    print(f"PASS    {programs} random programs match the ISS ({invalidated} blocks invalidated by stores, "
+          f"{chains} chains built)")
+
+    # Budgets that end inside blocks, and single steps, fall back to the interpreter
+    image = random_image(rng)
+    expected = ISS(image)
+    actual = TranslatingISS(image)
+    for budget in (1, 7, 3, 64, 1, 1, 500):
+        expected.run(budget)
+        actual.run(budget)
+    records = list(TranslatingISS(image).iter_trace(100)) == list(ISS(image).iter_trace(100))
+    passed = actual.state() == expected.state() and records
+    print(f"{'PASS' if passed else 'FAIL':<6}  split budgets and iter_trace() match the ISS")
+    assert passed, "FAIL: split run diverged"
+
+    # Self-modifying code: the STORE at 3 turns the translated ADD at 0 into
+    # "store 1", which on the second pass overwrites the next instruction
+    program = make_image([0x1001, 0x8003, HALT, 0x5000, 0x8000])
+    expected = ISS(program)
+    expected.run(200)
+    actual = TranslatingISS(program)
+    actual.run(200)
+    passed = (actual.state() == expected.state() and actual.invalidated > 0
+              and actual.ram[:2] == [0x5001, 0x5001] and actual.halted)
+    if trace:
+        print(f"        PC={actual.pc} ACC={actual.acc} instructions={actual.instructions} "
+              f"translated={actual.translated} invalidated={actual.invalidated}")
+    print(f"{'PASS' if passed else 'FAIL':<6}  self-modifying program: {actual.invalidated} blocks invalidated, "
+          f"state matches the ISS")
+    assert passed, f"FAIL: {actual.state()} != {expected.state()}"
+
+    # Translations are cached on the block's words, and the blocks found in
+    # the unmodified image are cached on the image; only the blocks rebuilt
+    # after the self-modifying stores are translated again
+    cache = TranslationCache()
+    first = TranslatingISS(program, cache)
+    first.run(200)
+    compiled = len(cache.blocks)
+    second = TranslatingISS(program, cache)
+    second.run(200)
+    passed = (len(cache.blocks) == compiled and second.state() == first.state()
+              and 0 < second.translated < first.translated)
+    print(f"{'PASS' if passed else 'FAIL':<6}  second run reuses all {compiled} cached translations and "
+          f"{first.translated - second.translated} of {first.translated} blocks")
+    assert passed, f"FAIL: cache grew from {compiled} to {len(cache.blocks)}, {second.translated} blocks translated"
+
+    # The cache is bounded: the shared one after the random programs, and a
+    # small one that has to drop translations still in use by earlier
+    # programs, whose results must not change
+    shared = (len(TRANSLATION_CACHE.blocks) <= TRANSLATION_CACHE.max_blocks
+              and len(TRANSLATION_CACHE.images) <= TRANSLATION_CACHE.max_images)
+    cache = TranslationCache(max_blocks=32, max_images=4)
+    images = [random_image(rng) for _ in range(50)]
+    matched = True
+    for image in images + images:
+        expected = ISS(image)
+        expected.run(max_instructions)
+        actual = TranslatingISS(image, cache, chain_after=1)
+        actual.run(max_instructions)
+        matched = matched and actual.state() == expected.state()
+    passed = (shared and matched and len(cache.blocks) == 32 and len(cache.images) == 4
+              and tuple(images[-1]) in cache.images and tuple(images[0]) not in cache.images)
+    print(f"{'PASS' if passed else 'FAIL':<6}  cache bounded: {len(TRANSLATION_CACHE.blocks)} blocks and "
+          f"{len(TRANSLATION_CACHE.images)} images shared, a 32-block, 4-image cache drops the least recently used")
+    assert passed, (f"FAIL: shared={shared} matched={matched} "
+                    f"blocks={len(cache.blocks)} images={len(cache.images)}")
+
+    # A short loop from a warm cache: the instance starts from the image's
+    # chained blocks, so a run does not return to the dispatcher between
+    # blocks and reset() does not look the image up again
+    multiply = load_image(MULTIPLY)
+    TranslatingISS(multiply).run()
+    timings = {}
+    for cls in (ISS, TranslatingISS):
+        iss = cls(multiply)
+        best = None
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(200):
+                iss.reset()
+                iss.run()
+            elapsed = (time.perf_counter() - start) / 200
+            best = elapsed if best is None else min(best, elapsed)
+        timings[cls.__name__] = best
+    expected = ISS(multiply)
+    expected.run()
+    speedup = timings["ISS"] / timings["TranslatingISS"]
+    passed = iss.translated == 0 and iss.chains == 0 and iss.state() == expected.state() and speedup > 1.5
+    print(f"{'PASS' if passed else 'FAIL':<6}  multiply.dat, {iss.instructions} instructions: ISS "
+          f"{timings['ISS'] * 1e6:.1f} us, translated {timings['TranslatingISS'] * 1e6:.1f} us per reset and run "
+          f"({speedup:.1f}x)")
+    assert passed, f"FAIL: {iss.translated} blocks translated again, {iss.chains} chains built, {speedup:.1f}x"
+
+    # Loop-heavy program: 255 * 255 by repeated addition, with the counter
+    # and the product in memory
+    loop = make_image([
+        0x00FF, 0x50F0, 0x0000, 0x50F1,
+        0x40F1, 0x10FF, 0x50F1, 0x40F0, 0x2001, 0x50F0, 0xA004, 0x0000, 0x90FE,
+    ])
+    timings = {}
+    for cls in (ISS, TranslatingISS):
+        iss = cls(loop)
+        start = time.perf_counter()
+        iss.run(1_000_000)
+        timings[cls.__name__] = time.perf_counter() - start
+    speedup = timings["ISS"] / timings["TranslatingISS"]
+    print(f"{'PASS' if speedup > 1 else 'FAIL':<6}  counting loop: ISS {timings['ISS']:.3f} s, "
+          f"translated {timings['TranslatingISS']:.3f} s ({speedup:.1f}x)")
+    assert speedup > 1, "FAIL: the translated run is slower than the interpreter"
+
+    print("\n=== Translator Test Passed Successfully ===\n")
+
+
+if __name__ == "__main__":
+    run_test()
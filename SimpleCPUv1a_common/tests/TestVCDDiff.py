@@ -0,0 +1,119 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+from SimpleCPUv1a_common.ISS import ISS
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.VCDDiff import diff, diff_backends
+from SimpleCPUv1a_common.VCDReader import VCDReader
+from SimpleCPUv1a_common.VCDWriter import VCDWriter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Header and value quirks of the backends' VCD files
+QUIRKS = """$date today $end
+$timescale
+ 10ps
+$end
+$scope module top $end
+$var reg 1 ! clk $end
+$scope module cpu $end
+$var reg 1 ! clk $end
+$var reg 8 #H PC $end
+$var wire 16 data_in_probe DATA_IN [15:0] $end
+$upscope $end
+$upscope $end
+$enddefinitions $end
+$comment written by hand $end
+$dumpvars
+0!
+b0b0 #H
+bx data_in_probe
+$end
+#50
+1!
+b0b101 #H
+b1010 data_in_probe
+#100
+0!
+"""
+
+
+def write_cycles(path, image, cycles, corrupt=None):
+    """Write the ISS's PC/ACC/IR once per instruction, as a backend's VCDWriter would."""
+    iss = ISS(image)
+    with VCDWriter(path, ["PC", "ACC", "IR"]) as vcd:
+        for record in iss.iter_trace(cycles):
+            values = [record.pc, record.acc, record.ir]
+            if record.cycle == corrupt:
+                values[1] ^= 0x80
+            vcd.sample(record.cycle, values)
+
+
+def run_test(trace=False, cycles=20_000):
+    print("\n=== VCD Diff Test Start ===\n")
+
+    with tempfile.TemporaryDirectory() as folder:
+        # Parser: multi-line timescale, aliased and multi-character codes, 0b-prefixed and x values
+        path = os.path.join(folder, "quirks.vcd")
+        with open(path, "w") as f:
+            f.write(QUIRKS)
+        vcd = VCDReader(path)
+        changes = list(vcd.changes())
+        passed = (vcd.timescale == 10_000 and vcd.find("cpu.PC").width == 8
+                  and vcd.find("clk").code == "!" and vcd.find("DATA_IN[15:0]").code == "data_in_probe"
+                  and changes == [(0, "!", 0), (0, "#H", 0), (0, "data_in_probe", "x"),
+                                  (50, "!", 1), (50, "#H", 5), (50, "data_in_probe", 10), (100, "!", 0)])
+        if trace:
+            print(f"        {changes}")
+        print(f"{'PASS' if passed else 'FAIL':<6}  parsed {len(vcd.variables)} variables and {len(changes)} changes")
+        assert passed, f"FAIL: unexpected parse {vcd.variables} {changes}"
+
+        # Golden regression: identical traces, then a single flipped ACC bit
+        image = load_image(os.path.join(REPO_ROOT, "SimpleCPUv1a_amaranth", "programs", "code.dat"))
+        golden, same, bad = (os.path.join(folder, name) for name in ("golden.vcd", "same.vcd", "bad.vcd"))
+        corrupt = 3 * (cycles - 10)
+        write_cycles(golden, image, cycles)
+        write_cycles(same, image, cycles)
+        write_cycles(bad, image, cycles, corrupt)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = diff(golden, same, ["PC", "ACC", "IR"])
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        size = os.path.getsize(golden)
+        passed = result.mismatch is None and result.compared > 0 and peak < size / 4
+        print(f"{'PASS' if passed else 'FAIL':<6}  identical: {result.compared:,} timestamps in {elapsed:.3f} s, "
+              f"{peak / 1024:.0f} KiB peak for a {size / 1024:.0f} KiB file")
+        assert passed, f"FAIL: {result} with {peak} bytes peak"
+
+        result = diff(golden, bad, {"Computer.PC": "PC", "Computer.ACC": "ACC", "Computer.IR": "IR"})
+        mismatch = result.mismatch
+        passed = mismatch is not None and mismatch.time_a == corrupt and mismatch.signals == ["Computer.ACC"]
+        print(f"{'PASS' if passed else 'FAIL':<6}  corrupted ACC found at time {mismatch.time_a if mismatch else None}")
+        assert passed, f"FAIL: expected an ACC mismatch at {corrupt}, got {mismatch}"
+
+        # The same samples, with every instruction period (3 time units) as one sample
+        result = diff(golden, bad, ["PC", "ACC", "IR"], period_a=3, period_b=3)
+        passed = result.mismatch is not None and result.mismatch.sample == corrupt // 3
+        print(f"{'PASS' if passed else 'FAIL':<6}  sampled every period: mismatch at sample {result.mismatch.sample}")
+        assert passed, f"FAIL: {result}"
+
+    # Cross-backend: the shipped Amaranth and MyHDL waveforms, aligned on
+    # their clocks with the reset cycles dropped
+    amaranth = os.path.join(REPO_ROOT, "SimpleCPUv1a_amaranth", "waveforms", "Computer.vcd")
+    myhdl = os.path.join(REPO_ROOT, "SimpleCPUv1a_myhdl", "waveforms", "Computer.vcd")
+    result = diff_backends(amaranth, "amaranth", myhdl, "myhdl")
+    passed = result.mismatch is None and result.compared > 100
+    print(f"{'PASS' if passed else 'FAIL':<6}  amaranth and myhdl waveforms agree for {result.compared} cycles")
+    assert passed, f"FAIL: {result}"
+
+    print("\n=== VCD Diff Test Passed Successfully ===\n")
+
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+
+from SimpleCPUv1a_common.VCDWriter import VCDWriter, parse_windows
+
+
+def read_changes(path):
+    """Return the header lines and a list of (time, [value lines]) from a VCD file."""
+    with open(path) as f:
+        header, _, body = f.read().partition("$enddefinitions $end\n")
+
+    changes = []
+    for line in body.splitlines():
+        if line.startswith("#"):
+            changes.append((int(line[1:]), []))
+        else:
+            changes[-1][1].append(line)
+    return header.splitlines(), changes
+
+
+def run_test(trace=False):
+    print("\n=== VCD Writer Test Start ===\n")
+
+    # (PC, ACC, IR) at the end of cycles 0..7
+    samples = [(0, 0, 0), (0, 0, 5), (1, 0, 5), (1, 5, 5), (1, 5, 0x50FF), (2, 5, 0x50FF), (2, 5, 0x50FF), (3, 5, 4)]
+
+    # Format: (windows, expected [(time, value lines)], description)
+    test_vectors = [
+        (None, [
+            (0, ["b0 !", "b0 \"", "b0 #"]), (1, ["b101 #"]), (2, ["b1 !"]), (3, ["b101 \""]),
+            (4, ["b101000011111111 #"]), (5, ["b10 !"]), (7, ["b11 !", "b100 #"]),
+        ], "Only changed values are written; unchanged cycles are skipped"),
+        ([(2, 4), (6, None)], [
+            (2, ["b1 !", "b0 \"", "b101 #"]), (3, ["b101 \""]),
+            (6, ["b10 !", "b101 \"", "b101000011111111 #"]), (7, ["b11 !", "b100 #"]),
+        ], "Every signal is written at the start of each window"),
+    ]
+
+    assert parse_windows("0:300, 1000:") == [(0, 300), (1000, None)]
+
+    fd, path = tempfile.mkstemp(suffix=".vcd")
+    os.close(fd)
+    try:
+        for windows, expected, desc in test_vectors:
+            with VCDWriter(path, ["PC", "ACC", "IR"], windows=windows) as vcd:
+                for cycle, values in enumerate(samples):
+                    vcd.sample(cycle, values)
+
+            header, changes = read_changes(path)
+            if trace:
+                print("\n".join(header))
+                for time, lines in changes:
+                    print(f"#{time} {' '.join(lines)}")
+
+            assert "$var wire 16 # IR $end" in header
+            passed = changes == expected
+            print(f"{'PASS' if passed else 'FAIL':<6}  {desc}")
+            assert passed, f"FAIL: {desc}\nExpected: {expected}\nGot: {changes}"
+    finally:
+        os.remove(path)
+
+    try:
+        VCDWriter(os.devnull, ["PC", "FLAGS"])
+    except ValueError:
+        print(f"{'PASS':<6}  Unknown signal names are rejected")
+    else:
+        raise AssertionError("FAIL: VCDWriter accepted an unknown signal name")
+
+    print("\n=== VCD Writer Test Passed Successfully ===\n")
+
+
+if __name__ == "__main__":
+    run_test(trace=True)
@@ -36,6 +36,14 @@ def merge_16(A, B, C, D, E, F, G, H, I, J, K, L, M, N, O, P, Y):
         Y.next = concat(P, O, N, M, L, K, J, I, H, G, F, E, D, C, B, A)
     return logic
 
+# Component models: "gate" builds a component from gates and flip-flops, as
+# drawn in the schematics; "rtl" is one behavioral generator per component
+MODELS = ("gate", "rtl")
+
+def check_model(model):
+    if model not in MODELS:
+        raise ValueError(f"Unknown model '{model}', expected one of {', '.join(MODELS)}")
+
 @block
 def clock_driver(clk, period = 1000):
     @always(delay(period//2))  # 500 ns high, 50 ns low → 1000 ns full period
@@ -44,6 +52,67 @@ def clock_driver(clk, period = 1000):
 
     return toggle
 
+HALT_WORD = 0xFFFF
+
+
+@block
+def halt_detector(IR, rst, HALTED, predicate=None, on_halt=None, stop=False):
+    """
+    Event-driven halt detector
+
+    Inputs:
+    - IR: Instruction register of the cpu
+    - rst: Reset; HALTED is cleared while it is high
+    - predicate: Optional callable, checked whenever IR changes; returning
+      True halts as if 0xFFFF had been latched
+    - on_halt: Optional callback, called once at the moment of the halt
+    - stop: Raise StopSimulation at the halt instead of only flagging it
+
+    Outputs:
+    - HALTED: Set when the IR latches 0xFFFF or the predicate fires
+
+    The detector only wakes when IR or rst changes, so it adds no per-cycle work.
+    """
+    @instance
+    def watch():
+        while True:
+            yield IR, rst
+            if rst:
+                HALTED.next = False
+            elif not HALTED and (IR == HALT_WORD or (predicate is not None and predicate())):
+                HALTED.next = True
+                if on_halt is not None:
+                    on_halt()
+                if stop:
+                    raise StopSimulation("Halt instruction latched")
+
+    return watch
+
+
+@block
+def gated_clock_driver(clk, HALTED, period = 1000):
+    """
+    Clock driver that freezes the design while HALTED is high
+
+    While halted it schedules no events until HALTED falls (apart from one
+    far-future wakeup that keeps the simulation resumable), so run_sim() with
+    a cycle budget returns as soon as the program halts. On resume the clock
+    restarts low, exactly like a fresh simulation.
+    """
+    @instance
+    def toggle():
+        while True:
+            yield delay(period//2)
+            if HALTED:
+                clk.next = False
+                while HALTED:
+                    yield HALTED.negedge, delay(1 << 60)
+                continue
+            clk.next = not clk
+
+    return toggle
+
+
 @block
 def reset_pulse(reset):
     @instance
@@ -5,7 +5,8 @@ from components.OneHotDecoder import decoder_1hot_4_16
 
 
 @block
-def control_logic(clk, rst, A, Z, IR_EN, ROM_EN, RAM_EN, RAM_WR, ADDR_SEL, DATA_SEL, PC_EN, PC_LD, ACC_EN, ACC_CTL):
+def control_logic(clk, rst, A, Z, IR_EN, ROM_EN, RAM_EN, RAM_WR, ADDR_SEL, DATA_SEL, PC_EN, PC_LD, ACC_EN, ACC_CTL,
+                  model="gate"):
     """
     Multi-stage control logic block for a simple CPU using ring counter and one-hot decoding
 
@@ -27,6 +28,10 @@ def control_logic(clk, rst, A, Z, IR_EN, ROM_EN, RAM_EN, RAM_WR, ADDR_SEL, DATA_
     - ACC_EN: Accumulator enable
     - ACC_CTL: 3-bit control signal for accumulator operation
 
+    Parameters:
+    - model: "gate" (default) or "rtl", which keeps the ring counter but
+      replaces the decoder and the gate network with one behavioral generator
+
     Internal behavior:
     - A 3-bit ring counter advances the current stage of instruction execution.
     - A 4-bit one-hot decoder activates one of 16 instruction decode lines.
@@ -38,6 +43,11 @@ def control_logic(clk, rst, A, Z, IR_EN, ROM_EN, RAM_EN, RAM_WR, ADDR_SEL, DATA_
     instruction decoding and control signal generation in a stepwise manner.
     """
 
+    check_model(model)
+    if model == "rtl":
+        return control_logic_rtl(clk, rst, A, Z, IR_EN, ROM_EN, RAM_EN, RAM_WR, ADDR_SEL, DATA_SEL, PC_EN, PC_LD,
+                                 ACC_EN, ACC_CTL)
+
 
     # Internals
     Q = Signal(intbv(0)[3:])
@@ -88,3 +98,37 @@ def control_logic(clk, rst, A, Z, IR_EN, ROM_EN, RAM_EN, RAM_WR, ADDR_SEL, DATA_
     )
 
     return rc, dec, *schematic, bus
+
+
+@block
+def control_logic_rtl(clk, rst, A, Z, IR_EN, ROM_EN, RAM_EN, RAM_WR, ADDR_SEL, DATA_SEL, PC_EN, PC_LD, ACC_EN, ACC_CTL):
+    """
+    Behavioral control logic with the same ports and timing as control_logic
+
+    The ring counter is kept; the one-hot decoder and gate network become a
+    single combinational generator driven by the stage, opcode and Z flag.
+    """
+
+    Q = Signal(intbv(0)[3:])
+    rc = ring_counter(clk, rst, Q)
+
+    @always_comb
+    def decode():
+        op = int(A)
+        fetch, decode_stage, execute = bool(Q[0]), bool(Q[1]), bool(Q[2])
+        sub = op == 6 or op == 7
+        memory = op == 4 or op == 5 or sub
+        jump = op == 8 or (op == 9 and bool(Z)) or (op == 10 and not Z)
+
+        IR_EN.next = fetch
+        ROM_EN.next = fetch
+        RAM_EN.next = memory and (decode_stage or execute)
+        ADDR_SEL.next = memory and (decode_stage or execute)
+        RAM_WR.next = op == 5 and execute
+        DATA_SEL.next = op == 4 or sub
+        PC_LD.next = jump
+        PC_EN.next = (jump and execute) or (not jump and decode_stage)
+        ACC_EN.next = (op <= 4 or sub) and execute
+        ACC_CTL.next = ((op == 0 or op == 4) << 2) | ((op == 3) << 1) | (op == 2 or op == 7)
+
+    return rc, decode
@@ -110,7 +110,7 @@ def add_sub_8(A, B, CTL, SUM):
 
 
 @block
-def alu(A, B, CTL, Y):
+def alu(A, B, CTL, Y, model="gate"):
     """
     8-bit Arithmetic Logic Unit (ALU) supporting ADD, SUB, AND, and PASS B operations
 
@@ -119,12 +119,29 @@ def alu(A, B, CTL, Y):
 
     io: Captures internal named signals (e.g., ADD_SUB, AND) for waveform visibility
 
+    model: "gate" (default) or "rtl" for a single behavioral generator
+
     Operations:
     - Uses add_sub_8 for arithmetic based on CTL[0]
     - Uses and_2_8 for bitwise AND
     - Selects output with a 3-input 8-bit multiplexer (based on CTL[1:])
     """
 
+    check_model(model)
+    if model == "rtl":
+        @always_comb
+        def logic():
+            if CTL[2]:
+                Y.next = B
+            elif CTL[1]:
+                Y.next = A & B
+            elif CTL[0]:
+                Y.next = (A - B) % 256
+            else:
+                Y.next = (A + B) % 256
+
+        return logic
+
     ADD_SUB = Signal(intbv(0)[8:])
     AND = Signal(intbv(0)[8:])
 
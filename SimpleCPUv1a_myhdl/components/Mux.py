@@ -32,7 +32,7 @@ def mux_2_1(A, B, SEL, Y):
 
 
 @block
-def mux_2_8(A, B, SEL, Y):
+def mux_2_8(A, B, SEL, Y, model="gate"):
     """
     2-to-1 multiplexer for 8-bit buses using two levels of mux_2_8
 
@@ -41,11 +41,20 @@ def mux_2_8(A, B, SEL, Y):
     - B: 8-bit data input
     - SEL: 1-bit data input
     - Y: 8-bit data output
+    - model: "gate" (default) or "rtl" for a single behavioral generator
 
     Behaviour:
     - Select A or B based on SEL
     """
 
+    check_model(model)
+    if model == "rtl":
+        @always_comb
+        def logic():
+            Y.next = B if SEL else A
+
+        return logic
+
     Y_bits = [Signal(False) for _ in range(8)]
     bus = merge_8(*Y_bits, Y)
 
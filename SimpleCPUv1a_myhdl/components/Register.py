@@ -5,7 +5,24 @@ from components.Math import add_8
 from Utils import *
 
 @block
-def register_8(clk, CE, D, rst, Q):
+def register_rtl(clk, rst, CE, D, Q):
+    """
+    Behavioral n-bit register with clock enable and asynchronous clear
+
+    Same ports and timing as register_8/register_16, as a single generator
+    instead of one FDCE per bit plus a merge block.
+    """
+    @always(clk.posedge, rst.posedge)
+    def logic():
+        if rst == 1:
+            Q.next = 0
+        elif CE == 1:
+            Q.next = D
+
+    return logic
+
+@block
+def register_8(clk, CE, D, rst, Q, model="gate"):
     """
     8-bit register with clock enable and asynchronous clear
 
@@ -15,6 +32,7 @@ def register_8(clk, CE, D, rst, Q):
     - CE: Clock enable
     - D: 8-bit data input
     - Q: 8-bit data output
+    - model: "gate" (default) or "rtl" for the behavioral register_rtl
 
 
     Behavior:
@@ -23,6 +41,10 @@ def register_8(clk, CE, D, rst, Q):
     - Clears Q when rst is high
     """
 
+    check_model(model)
+    if model == "rtl":
+        return register_rtl(clk, rst, CE, D, Q)
+
     Q_bits = [Signal(False) for _ in range(8)]
     bus = merge_8(*Q_bits, Q)
 
@@ -40,7 +62,7 @@ def register_8(clk, CE, D, rst, Q):
     return schematic, bus
 
 @block
-def register_16(clk, rst, CE, D, Q):
+def register_16(clk, rst, CE, D, Q, model="gate"):
     """
     16-bit register with clock enable and asynchronous clear
 
@@ -50,6 +72,7 @@ def register_16(clk, rst, CE, D, Q):
     - CE: Clock enable
     - D: 16-bit data input
     - Q: 16-bit data output
+    - model: "gate" (default) or "rtl" for the behavioral register_rtl
 
 
     Behavior:
@@ -58,6 +81,10 @@ def register_16(clk, rst, CE, D, Q):
     - Clears Q when rst is high
     """
 
+    check_model(model)
+    if model == "rtl":
+        return register_rtl(clk, rst, CE, D, Q)
+
     Y_bits = [Signal(False) for _ in range(16)]
     bus = merge_16(*Y_bits, Q)
 
@@ -83,7 +110,7 @@ def register_16(clk, rst, CE, D, Q):
     return schematic, bus
 
 @block
-def counter_8(clk, rst, CE, LD, D, Q):
+def counter_8(clk, rst, CE, LD, D, Q, model="gate"):
     """
     8-bit counter with load, enable, and asynchronous clear
 
@@ -94,6 +121,7 @@ def counter_8(clk, rst, CE, LD, D, Q):
     - LD: Load control signal (1 = load D, 0 = increment)
     - D: 8-bit data input
     - Q: 8-bit data output
+    - model: "gate" (default) or "rtl" for a single behavioral generator
 
     Behavior:
     - When LD is high: loads input D into Q
@@ -102,6 +130,17 @@ def counter_8(clk, rst, CE, LD, D, Q):
     - Built from multiplexer, adder, and 8-bit register
     """
 
+    check_model(model)
+    if model == "rtl":
+        @always(clk.posedge, rst.posedge)
+        def logic():
+            if rst == 1:
+                Q.next = 0
+            elif CE == 1:
+                Q.next = D if LD else (Q + 1) % 256
+
+        return logic
+
     notLD = Signal(False)
     MUX = Signal(intbv(0)[8:])
     SUM = Signal(intbv(0)[8:])
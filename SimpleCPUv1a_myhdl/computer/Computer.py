@@ -4,7 +4,7 @@ from Utils import *
 
 
 @block
-def computer(rst, clk, DATA_IN, DATA_OUT, init_ram=None):
+def computer(rst, clk, DATA_IN, DATA_OUT, init_ram=None, ram=None, model="gate"):
     """
     Top-level computer system integrating CPU, RAM, clock, and control logic
 
@@ -12,6 +12,8 @@ def computer(rst, clk, DATA_IN, DATA_OUT, init_ram=None):
     - io: IO_Capture object to collect and expose internal signals for debugging or visualization
     - PWR: Power control signal (Signal(bool)); enables clock and system behavior when high
     - init_ram: Optional dictionary or list to preload RAM contents for simulation
+    - ram: Optional list of 256 Signals used as RAM storage (see ram_256x16)
+    - model: CPU component models, "gate" (default) or "rtl" (see cpu)
 
     Internals:
     - DATA_IN / DATA_OUT: 16-bit system data bus
@@ -48,6 +50,7 @@ def computer(rst, clk, DATA_IN, DATA_OUT, init_ram=None):
         RAM_EN=RAM_EN,
         RAM_WR=RAM_WR,
         ROM_EN=ROM_EN,
+        model=model,
         ),
 
         ram_256x16(
@@ -57,7 +60,8 @@ def computer(rst, clk, DATA_IN, DATA_OUT, init_ram=None):
         DATA_OUT=DATA_IN,
         EN=Signal(True),
         WE=RAM_WR,
-        init_data=init_ram
+        init_data=init_ram,
+        mem=ram
         )
     )
 
@@ -2,12 +2,22 @@ from Utils import *
 
 
 @block
-def ram_256x16(clk, ADDR_IN, DATA_IN, DATA_OUT, EN, WE, init_data=None):
+def ram_256x16(clk, ADDR_IN, DATA_IN, DATA_OUT, EN, WE, init_data=None, mem=None):
+    """
+    256 x 16-bit RAM with combinational read and write
 
-    if init_data is None:
-        mem = [Signal(intbv(0)[16:]) for _ in range(256)]  # 256 words = 512 bytes
-    else:
-        mem = [Signal(intbv(value)[16:]) for value in init_data]
+    Inputs:
+    - init_data: Optional list of 256 words to preload
+    - mem: Optional list of 256 Signals to use as storage. Keeping a reference to
+      this list lets a testbench rewrite the contents between runs without
+      re-elaborating the design.
+    """
+
+    if mem is None:
+        if init_data is None:
+            mem = [Signal(intbv(0)[16:]) for _ in range(256)]  # 256 words = 512 bytes
+        else:
+            mem = [Signal(intbv(value)[16:]) for value in init_data]
 
     @always_comb
     #@always_seq(clk.negedge, reset=None)
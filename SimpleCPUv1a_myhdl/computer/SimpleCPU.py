@@ -6,7 +6,7 @@ from Utils import *
 
 
 @block
-def cpu(DATA_IN, clk, rst, DATA_OUT, ADDR, RAM_EN, RAM_WR, ROM_EN):
+def cpu(DATA_IN, clk, rst, DATA_OUT, ADDR, RAM_EN, RAM_WR, ROM_EN, model="gate"):
     """
     Top-level CPU block with 8-bit datapath and 16-bit instruction word
 
@@ -22,6 +22,10 @@ def cpu(DATA_IN, clk, rst, DATA_OUT, ADDR, RAM_EN, RAM_WR, ROM_EN):
     - RAM_WR: RAM write enable
     - ROM_EN: ROM enable
 
+    Parameters:
+    - model: "gate" (default) builds the registers, ALU, multiplexers and
+      control logic from gates; "rtl" uses their behavioral models
+
     io (IO_Capture):
     - Captures internal signals for waveform/debugging
 
@@ -57,14 +61,14 @@ def cpu(DATA_IN, clk, rst, DATA_OUT, ADDR, RAM_EN, RAM_WR, ROM_EN):
     bus = merge_3(DATA_OUT_0, DATA_OUT_1, DATA_OUT_2, DATA_OUT)
 
     schematic = (
-        register_16(clk, rst, IR_EN, DATA_IN, IR),
-        register_8(clk, ACC_EN, ALU, rst, ACC),
-        counter_8(clk, rst, PC_EN, PC_LD, IR(8, 0), PC),
-        alu(ACC, DATA, ACC_CTL, ALU),
-        mux_2_8(IR(8, 0), DATA_IN(8, 0), DATA_SEL, DATA),
-        mux_2_8(PC, IR(8, 0), ADDR_SEL, ADDR),
+        register_16(clk, rst, IR_EN, DATA_IN, IR, model=model),
+        register_8(clk, ACC_EN, ALU, rst, ACC, model=model),
+        counter_8(clk, rst, PC_EN, PC_LD, IR(8, 0), PC, model=model),
+        alu(ACC, DATA, ACC_CTL, ALU, model=model),
+        mux_2_8(IR(8, 0), DATA_IN(8, 0), DATA_SEL, DATA, model=model),
+        mux_2_8(PC, IR(8, 0), ADDR_SEL, ADDR, model=model),
         control_logic(clk, rst, IR(16, 12), Z, IR_EN, ROM_EN, RAM_EN, RAM_WR, ADDR_SEL, DATA_SEL, PC_EN, PC_LD, ACC_EN,
-                      ACC_CTL),
+                      ACC_CTL, model=model),
         nor_8(ACC, Z),
         buf_1(IR(16, 12), DATA_OUT_2),
         buf_1(Signal(intbv(0)[4:]), DATA_OUT_1),
@@ -0,0 +1,128 @@
+import os
+import random
+
+from myhdl import block, instance, delay, Signal, intbv, StopSimulation
+from components.ControlLogic import control_logic
+from components.Math import alu
+from components.Mux import mux_2_8
+from components.Register import register_8, register_16, counter_8
+from computer.Computer import computer
+from tests.TestComputer import cpu_signal, load_dat_file
+from Utils import clock_driver
+
+PERIOD = 1000
+CYCLES = 1000
+PROGRAM_CYCLES = 3 * 40
+
+
+def signals(*widths):
+    return [Signal(intbv(0)[width:]) if width > 1 else Signal(False) for width in widths]
+
+
+@block
+def ComponentModels(program_path="programs/multiply.dat", seed=1):
+    """
+    Gate-level and behavioral (model="rtl") components driven side by side
+
+    Every pair shares its inputs and the outputs are compared in the middle of
+    each clock cycle, once any combinational logic has settled. Two complete
+    computers, one per model, then run the same program in lockstep.
+    """
+    clk = Signal(False)
+    rst = Signal(False)
+    CE, LD, SEL, Z = signals(1, 1, 1, 1)
+    A8, B8, OP = signals(8, 8, 4)
+    D16 = Signal(intbv(0)[16:])
+    CTL = Signal(intbv(0)[3:])
+
+    # MyHDL only accepts sub-blocks instantiated directly in this function, so
+    # each pair is built by the loop below rather than by a helper
+    names = ["register_16", "register_8", "counter_8", "mux_2_8", "alu", "control_logic"]
+    widths = [[16], [8], [8], [8], [8], [1, 1, 1, 1, 1, 1, 1, 1, 1, 3]]
+    outputs = {model: [signals(*w) for w in widths] for model in ("gate", "rtl")}
+    insts = [clock_driver(clk, PERIOD)]
+
+    for model in ("gate", "rtl"):
+        o = outputs[model]
+        insts += [
+            register_16(clk, rst, CE, D16, o[0][0], model=model),
+            register_8(clk, CE, A8, rst, o[1][0], model=model),
+            counter_8(clk, rst, CE, LD, A8, o[2][0], model=model),
+            mux_2_8(A8, B8, SEL, o[3][0], model=model),
+            alu(A8, B8, CTL, o[4][0], model=model),
+            control_logic(clk, rst, OP, Z, *o[5], model=model),
+        ]
+
+    # Format: (name, gate outputs, rtl outputs)
+    pairs = list(zip(names, outputs["gate"], outputs["rtl"]))
+
+    mem = load_dat_file(program_path)
+    computers = {}
+    for model in ("gate", "rtl"):
+        DATA_IN, DATA_OUT = signals(16, 16)
+        ram = [Signal(intbv(word)[16:]) for word in mem]
+        comp_inst = computer(rst, clk, DATA_IN, DATA_OUT, ram=ram, model=model)
+        computers[model] = ([cpu_signal(comp_inst, name) for name in ("PC", "ACC", "IR")], ram)
+        insts.append(comp_inst)
+
+    @instance
+    def stimulus():
+        print("\n=== Component Models Test Start ===\n")
+        rng = random.Random(seed)
+
+        rst.next = True
+        yield delay(PERIOD)
+        rst.next = False
+
+        mismatches = {name: 0 for name, _, _ in pairs}
+        for cycle in range(CYCLES):
+            # Change inputs just after the rising edge, compare mid-cycle
+            yield clk.posedge
+            yield delay(PERIOD // 8)
+            if cycle >= PROGRAM_CYCLES:
+                rst.next = rng.random() < 0.02
+            CE.next, LD.next, SEL.next, Z.next = (rng.random() < 0.5 for _ in range(4))
+            A8.next, B8.next = rng.randrange(256), rng.randrange(256)
+            D16.next = rng.randrange(1 << 16)
+            CTL.next = rng.randrange(8)
+            OP.next = rng.randrange(16)
+
+            yield clk.negedge
+            for name, gate, rtl in pairs:
+                if [int(sig) for sig in gate] != [int(sig) for sig in rtl]:
+                    mismatches[name] += 1
+
+            # The computers share rst, so only compare them until the stimulus pulses it
+            if cycle < PROGRAM_CYCLES:
+                (gate_regs, gate_ram), (rtl_regs, rtl_ram) = computers["gate"], computers["rtl"]
+                gate_state = [int(sig) for sig in gate_regs]
+                rtl_state = [int(sig) for sig in rtl_regs]
+                assert gate_state == rtl_state, (
+                    f"FAIL: computers diverged at cycle {cycle}\n"
+                    f"gate PC/ACC/IR {gate_state}, rtl PC/ACC/IR {rtl_state}"
+                )
+                if cycle == PROGRAM_CYCLES - 1:
+                    passed = [int(sig) for sig in gate_ram] == [int(sig) for sig in rtl_ram]
+                    print(f"{'PASS' if passed else 'FAIL':<6}  computer: same PC/ACC/IR every cycle and same RAM "
+                          f"after {PROGRAM_CYCLES} cycles of {program_path}")
+                    assert passed, "FAIL: computers finished with different RAM contents"
+
+        for name, count in mismatches.items():
+            print(f"{'PASS' if count == 0 else 'FAIL':<6}  {name}: gate and rtl outputs agree over {CYCLES} cycles")
+            assert count == 0, f"FAIL: {name} models disagreed on {count} cycles"
+
+        print("\n=== Component Models Test Passed Successfully ===\n")
+        raise StopSimulation()
+
+    return insts, stimulus
+
+
+def run_test(trace=False):
+    tb = ComponentModels()
+    tb.config_sim(trace=trace)
+    tb.run_sim()
+
+    # Place vcd file in the waveforms directory
+    if trace and os.path.exists("ComponentModels.vcd"):
+        os.replace("ComponentModels.vcd", "waveforms/ComponentModels.vcd")
+        print(f"VCD trace written to: waveforms")
@@ -1,52 +1,277 @@
 import os
-
+import sys
 import time
 
 from myhdl import *
+from myhdl._block import _Block
 from computer.Computer import computer
-from Utils import clock_driver
+from Utils import clock_driver, gated_clock_driver, halt_detector
+from Profiler import BlockProfiler
+
+# The shared tools (SimpleCPUv1a_common) live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.VCDWriter import VCDWriter
+from SimpleCPUv1a_common import Snapshot
+
+PERIOD = 1000              # Clock period (ns)
+INSTRUCTION_PERIOD = 3 * PERIOD
+
+def cpu_signal(comp_inst, name):
+    """Look up an internal signal of the cpu inside an elaborated computer block."""
+    cpu_inst = next(sub for sub in comp_inst.subs if sub.name.startswith("cpu"))
+    return cpu_inst.sigdict[name]
+
+
+def _blocks(block, func_name):
+    for sub in block.subs:
+        if isinstance(sub, _Block):
+            if sub.func.__name__ == func_name:
+                yield sub
+            yield from _blocks(sub, func_name)
+
+
+def state_signals(cpu_inst):
+    """
+    Signals holding the state of an elaborated cpu, for snapshots
+
+    Returns:
+    - {field: (bus, bits)}: the register or ring-counter output and, for the
+      gate-level registers, the FDCE outputs merged into it (LSB first);
+      bits is empty when a single generator drives the bus
+    """
+    signals = {}
+    for field, name, func_name in (("pc", "PC", "counter_8"), ("acc", "ACC", "register_8"),
+                                   ("ir", "IR", "register_16")):
+        register = next(sub for sub in cpu_inst.subs if isinstance(sub, _Block) and sub.func.__name__ == func_name)
+        # fdce(clk, rst, CE, D, Q), in bit order
+        signals[field] = (cpu_inst.sigdict[name], [fdce.args[4] for fdce in _blocks(register, "fdce")])
+
+    # ring_counter(clk, rst, Q)
+    ring = next(_blocks(cpu_inst, "ring_counter"))
+    signals["ring"] = (ring.args[2], [])
+    return signals
+
+
+@block
+def vcd_sampler(clk, sigs, vcd):
+    """Write sigs to a VCDWriter at every rising clock edge, before the registers update."""
+    @instance
+    def sample():
+        cycle = 0
+        while True:
+            yield clk.posedge
+            vcd.sample(cycle, sigs)
+            cycle += 1
+
+    return sample
+
 
 @block
-def Computer(program_path):
+def Computer(program_path, max_cycles=500, predicate=None, vcd=None, model="gate"):
     # Create signals
     rst = Signal(False)
     clk = Signal(False)
     DATA_IN = Signal(intbv(0)[16:])
     DATA_OUT = Signal(intbv(0)[16:])
+    HALTED = Signal(False)
 
     # Load memory from .dat file
     ram = load_dat_file(program_path)
 
     # Instantiate computer with loaded RAM
-    comp_inst = computer(rst, clk, DATA_IN, DATA_OUT, init_ram=ram)
+    comp_inst = computer(rst, clk, DATA_IN, DATA_OUT, init_ram=ram, model=model)
+
+    # Stop the simulation the moment the IR latches the termination instruction (0xFFFF)
+    halt_inst = halt_detector(cpu_signal(comp_inst, "IR"), rst, HALTED, predicate=predicate, stop=True)
 
     @instance
     def stimulus():
         # Reset the computer
         rst.next = True
-        yield delay(1000)
+        yield delay(PERIOD)
         rst.next = False
 
-        # Run the program until it reaches the termination instruction (0xFFFF)
-        for _ in range(500): # Always stop after 500 cycles
-            # Wait for next instruction
-            yield delay(3000)
-            # Check for termination instruction
-            if int(DATA_IN) == 0xFFFF:
-                break
-        else:
-            print("Cycle limit reached")
+        # Cycle budget: only reached if the program never halts
+        yield delay(max_cycles * INSTRUCTION_PERIOD)
+        print("Cycle limit reached")
 
         raise StopSimulation()
 
-    return comp_inst, clock_driver(clk), stimulus
+    insts = [comp_inst, clock_driver(clk, PERIOD), halt_inst, stimulus]
+    if vcd is not None:
+        insts.append(vcd_sampler(clk, [cpu_signal(comp_inst, name) for name in vcd.names], vcd))
+    return insts
+
+
+@block
+def ComputerHarness(rst, clk, DATA_IN, DATA_OUT, ram, HALTED, predicate=None, on_halt=None, model="gate"):
+    # Computer with externally owned RAM, driven by ComputerSession; the clock
+    # freezes when the halt detector fires
+    comp_inst = computer(rst, clk, DATA_IN, DATA_OUT, ram=ram, model=model)
+    halt_inst = halt_detector(cpu_signal(comp_inst, "IR"), rst, HALTED, predicate=predicate, on_halt=on_halt)
+
+    return comp_inst, gated_clock_driver(clk, HALTED, PERIOD), halt_inst
+
+
+class ComputerSession:
+    """
+    Reusable MyHDL simulation of the computer
+
+    The block hierarchy is elaborated once in __init__; each call to
+    run_program() rewrites the RAM signals, pulses rst and runs the program,
+    so batch runs pay the elaboration cost only once.
+
+    A halt detector freezes the clock when the IR latches 0xFFFF (or the
+    optional predicate fires), so run() simulates a whole cycle budget with a
+    single run_sim() call and no per-instruction polling.
+
+    model="rtl" elaborates the behavioral component models instead of the
+    gate-level ones (see cpu). profile=True attaches a BlockProfiler (see
+    Profiler.py) as self.profiler.
+
+    snapshot() and restore() save and load the whole machine state (see
+    SimpleCPUv1a_common/Snapshot.py); run() or resume() carries on from a
+    restored state.
+
+    MyHDL allows a single Simulation per process, so call close() before
+    creating another session (or running run_test) in the same process.
+    """
+
+    def __init__(self, trace=False, predicate=None, model="gate", profile=False):
+        self.rst = Signal(False)
+        self.clk = Signal(False)
+        self.DATA_IN = Signal(intbv(0)[16:])
+        self.DATA_OUT = Signal(intbv(0)[16:])
+        self.HALTED = Signal(False)
+        self.ram = [Signal(intbv(0)[16:]) for _ in range(256)]
+        self.start_time = 0
+        self.halt_time = None
+
+        self.tb = ComputerHarness(self.rst, self.clk, self.DATA_IN, self.DATA_OUT, self.ram, self.HALTED,
+                                  predicate=predicate, on_halt=self._on_halt, model=model)
+        self.profiler = BlockProfiler(self.tb) if profile else None
+        self.tb.config_sim(trace=trace)
+        self.trace = trace
+
+        self.cpu = next(sub for sub in self.tb.subs[0].subs if sub.name.startswith("cpu"))
+        self.state_signals = state_signals(self.cpu)
+        self.restored = None
+
+        # Creating the Simulation discards pending signal updates, so start it
+        # here with an initial reset rather than on the first load()
+        self.reset()
+
+    def load(self, mem):
+        """Schedule new RAM contents; they take effect on the next run."""
+        for sig, value in zip(self.ram, mem):
+            sig.next = value
+
+    def _on_halt(self):
+        self.halt_time = now()
+
+    def reset(self):
+        """Hold rst for one clock period, as the Computer testbench does."""
+        self.rst.next = True
+        self.tb.run_sim(PERIOD, quiet=1)
+        self.rst.next = False
+        self.start_time = now()
+        self.halt_time = None
+
+    def run(self, max_cycles=500):
+        """
+        Run until the IR latches the termination instruction (0xFFFF)
+
+        Inputs:
+        - max_cycles: Budget in 3-tick instruction periods, counted from reset
+
+        Returns:
+        - Number of instruction periods simulated, including the one that
+          fetched 0xFFFF
+        """
+        self.restored = None
+        remaining = self.start_time + max_cycles * INSTRUCTION_PERIOD - now()
+        if remaining > 0:
+            self.tb.run_sim(remaining, quiet=1)
+
+        if self.halt_time is None:
+            return max_cycles
+        return (self.halt_time - self.start_time) // INSTRUCTION_PERIOD + 1
+
+    def resume(self, max_cycles=500):
+        """Run on from a restored state; the same as run()."""
+        return self.run(max_cycles)
+
+    def run_program(self, mem, max_cycles=500):
+        self.load(mem)
+        self.reset()
+        return self.run(max_cycles)
+
+    @property
+    def halted(self):
+        """Whether the last run ended on the termination instruction."""
+        return self.halt_time is not None
+
+    def state(self):
+        """Architectural state after the last run (PC, ACC, IR, RAM)."""
+        return {
+            "PC": int(self.cpu.sigdict["PC"]),
+            "ACC": int(self.cpu.sigdict["ACC"]),
+            "IR": int(self.cpu.sigdict["IR"]),
+            "RAM": [int(sig) for sig in self.ram],
+        }
+
+    def cycles(self):
+        """Rising clock edges since reset; the clock stops when the program halts."""
+        end = self.halt_time if self.halt_time is not None else now()
+        # Edges fall half a period into each cycle, so round up
+        return -(-(end - self.start_time) // PERIOD)
+
+    def snapshot(self):
+        """Machine state after the last run (or restore()), as a Snapshot blob."""
+        if self.restored is not None:
+            # Not applied to the signals until the next run
+            return self.restored
+        return Snapshot.pack(Snapshot.MachineState(
+            cycles=self.cycles(),
+            ram=[int(sig) for sig in self.ram],
+            **{field: int(bus) for field, (bus, _) in self.state_signals.items()},
+        ))
+
+    def restore(self, blob):
+        """
+        Load a Snapshot blob; call resume() to run on from it
+
+        The session is reset first (which also clears a halt), then every
+        flip-flop output is scheduled with .next, so the state takes effect
+        at the start of the next run, as the RAM contents of load() do.
+        """
+        state = Snapshot.unpack(blob)
+        self.reset()
+        self.load(state.ram)
+        for field, (bus, bits) in self.state_signals.items():
+            value = getattr(state, field)
+            bus.next = value
+            for sig, bit in zip(bits, Snapshot.bits(value, len(bits))):
+                sig.next = bool(bit)
+        self.start_time = now() - state.cycles * PERIOD
+        self.restored = bytes(blob)
+
+    def close(self):
+        self.tb.quit_sim()
+
+        # Place vcd file in the waveforms directory
+        if self.trace and os.path.exists("ComputerHarness.vcd"):
+            os.replace("ComputerHarness.vcd", "waveforms/ComputerHarness.vcd")
+            print(f"VCD trace written to: waveforms")
 
 
 def load_dat_file(filename):
     """
-    Load a .dat file into memory.
+    Load a program file into memory.
 
-    The .dat file format is:
+    Accepts the .dat, .asc, .mem and .mif outputs of simpleCPUv1a_as.py; see
+    SimpleCPUv1a_common/Loader.py. The .dat file format is:
     <address> <binary_data>
 
     Example:
@@ -57,43 +282,79 @@ def load_dat_file(filename):
     Returns:
     - A list of 16-bit values representing memory contents
     """
-    mem = [0 for _ in range(256)]  # Initialize memory with 256 words of 0
-
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    parts = line.split()
-                    if len(parts) == 2:
-                        addr = int(parts[0], 10)  # Parse address as decimal
-                        data = int(parts[1], 2)  # Parse data as binary
-                        mem[addr] = data
-
-
+        mem = load_image(filename)
         print(f"Memory loaded from {filename}: {len([x for x in mem if x != 0])} non-zero words")
     except FileNotFoundError:
         print(f"Warning: File {filename} not found.")
+        mem = [0 for _ in range(256)]  # Initialize memory with 256 words of 0
 
     return mem
 
 
-def run_test(trace=False, program_path="programs/code.dat"):
-    tb = Computer(program_path)
-    tb.config_sim(trace=trace)
+def run_test(trace=False, program_path="programs/code.dat", max_cycles=500, signals=None, windows=None, model="gate",
+             profile=False):
+    """
+    Run a program on the Computer testbench
+
+    Inputs:
+    - trace: Write waveforms/Computer.vcd
+    - signals: Optional allow-list (e.g. ["PC", "ACC", "IR"]); with trace, only
+      these signals are streamed to the VCD instead of the whole design
+    - windows: Optional list of (start, end) clock-cycle ranges to record
+    - model: "gate" (default) or "rtl" for the behavioral component models
+    - profile: Print per-block wake, update and time counts after the run
+      (Profiler.py), by block type and by cpu component
+    """
+    vcd = VCDWriter("waveforms/Computer.vcd", signals, windows) if trace and signals else None
+
+    tb = Computer(program_path, max_cycles, vcd=vcd, model=model)
+    profiler = BlockProfiler(tb) if profile else None
+    tb.config_sim(trace=trace and vcd is None)
 
     start_time = time.perf_counter()
 
-    tb.run_sim()
+    try:
+        tb.run_sim()
+    finally:
+        if vcd is not None:
+            vcd.close()
 
     end_time = time.perf_counter()
     elapsed = end_time - start_time
 
     # Place vcd file in the waveforms directory
-    if os.path.exists("Computer.vcd"):
+    if vcd is not None:
+        print(f"VCD trace written to: waveforms")
+    elif os.path.exists("Computer.vcd"):
         os.replace("Computer.vcd", "waveforms/Computer.vcd")
         print(f"VCD trace written to: waveforms")
     else:
         print("Warning: VCD file not found after simulation.")
 
-    print(f"Simulation time: {elapsed:.6f} seconds")
\ No newline at end of file
+    print(f"Simulation time: {elapsed:.6f} seconds")
+
+    if profiler is not None:
+        print(f"\n{profiler.report(by='type', run_time=elapsed)}")
+        print(f"\n{profiler.report(by='instance', depth=4, run_time=elapsed)}")
+
+
+def run_batch(program_paths, trace=False, model="gate"):
+    """Run several programs on a single elaborated computer."""
+    start_time = time.perf_counter()
+    session = ComputerSession(trace=trace, model=model)
+    print(f"Elaboration time: {time.perf_counter() - start_time:.6f} seconds")
+
+    results = {}
+    try:
+        for program_path in program_paths:
+            start_time = time.perf_counter()
+            session.run_program(load_dat_file(program_path))
+            elapsed = time.perf_counter() - start_time
+
+            results[program_path] = session.state()
+            print(f"{program_path}: simulation time {elapsed:.6f} seconds")
+    finally:
+        session.close()
+
+    return results
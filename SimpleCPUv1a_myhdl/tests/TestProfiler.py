@@ -0,0 +1,46 @@
+from tests.TestComputer import ComputerSession, load_dat_file
+
+
+def run_test(trace=False):
+    print("\n=== Profiler Test Start ===\n")
+
+    session = ComputerSession(profile=True)
+    try:
+        periods = session.run_program(load_dat_file("programs/multiply.dat"))
+    finally:
+        session.close()
+    profiler = session.profiler
+
+    if trace:
+        print(profiler.report(by="type", limit=None))
+        print()
+
+    by_type = profiler.totals(by="type")
+    by_component = profiler.totals(by="instance", depth=4)
+
+    # The initial reset in ComputerSession.__init__ and run_program's reset
+    # each hold rst for one clock period
+    cycles = 3 * periods
+    wakes = by_type["ring_counter"][1]
+    passed = cycles <= wakes <= cycles + 4
+    print(f"{'PASS' if passed else 'FAIL':<6}  ring_counter woke {wakes} times in {periods} instruction periods")
+    assert passed, f"FAIL: expected about {cycles} ring counter wakes, got {wakes}"
+
+    passed = by_type["fdce"][0] == 32
+    print(f"{'PASS' if passed else 'FAIL':<6}  {by_type['fdce'][0]} fdce generators (IR, ACC and PC)")
+    assert passed, "FAIL: expected 32 fdce generators"
+
+    # Every grouping covers the same generators and counts
+    type_sums = [sum(group[i] for group in by_type.values()) for i in range(3)]
+    component_sums = [sum(group[i] for group in by_component.values()) for i in range(3)]
+    passed = type_sums == component_sums and type_sums[1] > 0
+    print(f"{'PASS' if passed else 'FAIL':<6}  {type_sums[0]} generators, {type_sums[1]:,} wakes and "
+          f"{type_sums[2]:,} updates in both groupings")
+    assert passed, f"FAIL: groupings disagree: {type_sums} vs {component_sums}"
+
+    alu = next(key for key in by_component if key.endswith("/alu0"))
+    passed = by_component[alu][1] > 0
+    print(f"{'PASS' if passed else 'FAIL':<6}  cpu components are summed at depth 4 ({alu})")
+    assert passed, "FAIL: no activity recorded for the ALU"
+
+    print("\n=== Profiler Test Passed Successfully ===\n")
@@ -55,7 +55,7 @@ class ControlLogic(Component):
         s.ROM_EN //= s.q[0]
 
         @update
-        def logic():
+        def comb_logic():
             # === Control logic ===
             s.sub     @= s.y[6] | s.y[7]
             s.notZ    @= ~s.Z
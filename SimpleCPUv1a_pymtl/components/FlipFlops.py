@@ -7,20 +7,20 @@ class FDC(Component):
         s.Q = OutPort()       # Data output
         s.CLR = InPort()      # Clear (active high)
 
-        s.reg = Wire()
+        s.state = Wire()
         
         # Update block for synchronous logic with clear
         @update_ff
         def update_reg():
             if s.CLR:
-                s.reg <<= 0
+                s.state <<= 0
             else:
-                s.reg <<= s.D
+                s.state <<= s.D
                 
         # Connect the output
         @update
         def update_out():
-            s.Q @= s.reg
+            s.Q @= s.state
 
 
 
@@ -31,20 +31,20 @@ class FDP(Component):
         s.Q = OutPort()       # Data output
         s.PRE = InPort()      # Clear (active high)
 
-        s.reg = Wire()
+        s.state = Wire()
         
         # Update block for synchronous logic with clear
         @update_ff
         def update_reg():
             if s.PRE:
-                s.reg <<= 1
+                s.state <<= 1
             else:
-                s.reg <<= s.D
+                s.state <<= s.D
                 
         # Connect the output
         @update
         def update_out():
-            s.Q @= s.reg
+            s.Q @= s.state
 
 
 class FDCE(Component):
@@ -55,20 +55,20 @@ class FDCE(Component):
         s.CLR  = InPort()     # Asynchronous Clear
         s.Q    = OutPort()    # Data output
 
-        s.reg = Wire()
+        s.state = Wire()
 
         # Synchronous process for capturing D
         @update_ff
         def ff_block():
             if s.CLR:
-                s.reg <<= 0
+                s.state <<= 0
             elif s.CE:
-                s.reg <<= s.D
+                s.state <<= s.D
 
         # Combinational output assignment
         @update
         def comb_block():
-            s.Q @= s.reg
+            s.Q @= s.state
 
 
 class RingCounter3(Component):
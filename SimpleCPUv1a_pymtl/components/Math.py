@@ -12,7 +12,7 @@ class HalfAdder(Component):
         s.COUT = OutPort()
         
         @update
-        def logic():
+        def comb_logic():
             # Sum is XOR of inputs
             s.S @= s.A ^ s.B
             # Carry out is AND of inputs
@@ -52,7 +52,7 @@ class Counter8bit(Component):
         s.notLD = Wire(1)
 
         # Subcomponents
-        s.reg   = Register8bit()
+        s.register = Register8bit()
         s.adder = FullAdder8bit()
         s.mux   = Mux2_8()
 
@@ -67,13 +67,13 @@ class Counter8bit(Component):
         s.adder.CIN //= s.notLD   # Increment when LD is low
 
         # Register stores result
-        s.reg.D  //= s.adder.S
-        s.reg.CE //= s.CE
-        s.reg.CLR //= s.CLR
+        s.register.D  //= s.adder.S
+        s.register.CE //= s.CE
+        s.register.CLR //= s.CLR
 
         # Output
-        s.Q //= s.reg.Q
+        s.Q //= s.register.Q
 
         @update
-        def logic():
+        def comb_logic():
             s.notLD @= ~s.LD
@@ -1,6 +1,7 @@
 from pymtl3 import *
 from computer.Memory import SimpleRAM
 from computer.SimpleCPU import SimpleCPU
+from computer.HaltDetector import HaltDetector
 
 class Computer(Component):
     def construct(s, init_data=None):
@@ -10,6 +11,7 @@ class Computer(Component):
         
         s.ram = SimpleRAM(init_data)
         s.cpu = SimpleCPU()
+        s.halt = HaltDetector()
 
         s.cpu.CLR //= s.CLR
         s.cpu.DATA_IN //= s.ram.DATA_OUT
@@ -18,3 +20,6 @@ class Computer(Component):
         s.ram.DATA_IN //= s.cpu.DATA_OUT
         s.ram.WE //= s.cpu.RAM_WR
         s.ram.EN //= 1
+
+        s.halt.CLR //= s.CLR
+        s.halt.IR //= s.cpu.IR
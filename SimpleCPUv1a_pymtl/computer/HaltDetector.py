@@ -0,0 +1,49 @@
+from pymtl3 import *
+
+HALT_WORD = 0xFFFF
+
+
+class HaltDetector(Component):
+    """
+    Halt detector with a cycle budget, evaluated inside the simulator
+
+    Inputs:
+    - CLR: Clears the cycle counter, tied to the computer's CLR
+    - IR: Instruction register of the cpu
+    - BUDGET: Clock cycles allowed after reset before TIMEOUT is raised
+
+    Outputs:
+    - HALTED: IR holds 0xFFFF
+    - TIMEOUT: CYCLES has reached BUDGET
+    - DONE: HALTED | TIMEOUT
+    - CYCLES: Clock cycles since reset; stops counting once DONE
+
+    The testbench only has to read DONE after each tick, rather than decode
+    the IR and count instruction periods itself.
+    """
+    def construct(s):
+        # Interface
+        s.CLR = InPort()
+        s.IR = InPort(16)
+        s.BUDGET = InPort(32)
+
+        s.HALTED = OutPort()
+        s.TIMEOUT = OutPort()
+        s.DONE = OutPort()
+        s.CYCLES = OutPort(32)
+
+        s.count = Wire(32)
+
+        @update
+        def update_done():
+            s.HALTED @= s.IR == HALT_WORD
+            s.TIMEOUT @= s.count >= s.BUDGET
+            s.DONE @= s.HALTED | s.TIMEOUT
+            s.CYCLES @= s.count
+
+        @update_ff
+        def update_count():
+            if s.CLR:
+                s.count <<= 0
+            elif ~s.DONE:
+                s.count <<= s.count + 1
@@ -15,6 +15,9 @@ class SimpleCPU(Component):
         s.RAM_EN = OutPort()
         s.RAM_WR = OutPort()
         s.ROM_EN = OutPort()
+        s.IR = OutPort(16)      # Instruction register, observed by the testbench
+        s.PC = OutPort(8)       # Program counter, observed by the testbench
+        s.ACC = OutPort(8)      # Accumulator, observed by the testbench
 
         # Submodules
         s.ir = Register16bit()
@@ -72,3 +75,6 @@ class SimpleCPU(Component):
         s.RAM_EN  //= s.ctrl.RAM_EN
         s.RAM_WR  //= s.ctrl.RAM_WR
         s.ROM_EN  //= s.ctrl.ROM_EN
+        s.IR      //= s.ir.Q
+        s.PC      //= s.pc.Q
+        s.ACC     //= s.acc.Q
@@ -1,14 +1,35 @@
+import hashlib
+import os
+import shutil
+import sys
 import time
+from contextlib import contextmanager
+from importlib import metadata
 
 from pymtl3 import *
+from pymtl3.passes.backends.verilog import (
+    VerilogTranslationPass,
+    VerilogTranslationImportPass,
+    VerilogVerilatorImportPass,
+)
 from computer.Computer import Computer
 
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUILD_DIR = os.path.join(PROJECT_DIR, 'verilator_build')
+
+# The shared tools (SimpleCPUv1a_common) live in the repository root
+sys.path.append(os.path.dirname(PROJECT_DIR))
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.VCDWriter import VCDWriter
+from SimpleCPUv1a_common import Snapshot
+
 
 def load_dat_file(filename):
     """
-    Load a .dat file into memory.
+    Load a program file into memory.
 
-    The .dat file format is:
+    Accepts the .dat, .asc, .mem and .mif outputs of simpleCPUv1a_as.py; see
+    SimpleCPUv1a_common/Loader.py. The .dat file format is:
     <address> <binary_data>
 
     Example:
@@ -19,32 +40,80 @@ def load_dat_file(filename):
     Returns:
     - A list of 16-bit values representing memory contents
     """
-    mem = [0 for _ in range(256)]  # Initialize memory with 256 words of 0
-
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    parts = line.split()
-                    if len(parts) == 2:
-                        addr = int(parts[0], 10)  # Parse address as decimal
-                        data = int(parts[1], 2)  # Parse data as binary
-                        mem[addr] = data
-
+        mem = load_image(filename)
         print(f"Memory loaded from {filename}: {len([x for x in mem if x != 0])} non-zero words")
     except FileNotFoundError:
         print(f"Warning: File {filename} not found. Using default memory.")
+        mem = [0 for _ in range(256)]  # Initialize memory with 256 words of 0
 
     return mem
 
-def setup_test(trace, program_file):
-    instr_vector = load_dat_file(program_file)
+def source_hash():
+    """Hash of the PyMTL sources that make up the CPU, used to key the Verilator build cache."""
+    digest = hashlib.sha256(metadata.version('pymtl3').encode())
+    for folder in ('components', 'computer'):
+        for name in sorted(os.listdir(os.path.join(PROJECT_DIR, folder))):
+            if name.endswith('.py'):
+                with open(os.path.join(PROJECT_DIR, folder, name), 'rb') as f:
+                    digest.update(name.encode())
+                    digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+@contextmanager
+def working_directory(path):
+    # The Verilator import pass writes and imports its wrappers from the cwd
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def import_cpu(dut, trace=False):
+    """
+    Translate dut.cpu to Verilog and replace it with a Verilator-compiled model
+
+    Builds are kept in verilator_build/<source hash>/, so Verilator and the C++
+    compiler only run again when the CPU sources change. The RAM stays a
+    Python model, as its contents come from the program file.
+
+    Returns:
+    - The elaborated top-level component with the imported cpu
+    """
+    build_dir = os.path.join(BUILD_DIR, source_hash())
+    os.makedirs(build_dir, exist_ok=True)
+
+    dut.cpu.set_metadata(VerilogTranslationImportPass.enable, True)
+    dut.cpu.set_metadata(VerilogTranslationPass.explicit_file_name, os.path.join(build_dir, 'SimpleCPU.v'))
+    if trace:
+        dut.cpu.set_metadata(VerilogVerilatorImportPass.vl_trace, True)
+        dut.cpu.set_metadata(VerilogVerilatorImportPass.vl_trace_filename,
+                             os.path.join(PROJECT_DIR, 'waveforms', 'SimpleCPU_verilator'))
+
+    with working_directory(build_dir):
+        return VerilogTranslationImportPass()(dut)
+
+
+def setup_test(trace, program_file, backend='python'):
+    return build_computer(load_dat_file(program_file), trace, backend)
 
+
+def build_computer(instr_vector=None, trace=False, backend='python'):
     # Create and elaborate the model
     dut = Computer(instr_vector)
     dut.elaborate()
 
+    if backend == 'verilator':
+        if shutil.which('verilator') is None:
+            print("Warning: verilator not found. Using the Python simulation.")
+        else:
+            dut = import_cpu(dut, trace)
+    elif backend != 'python':
+        raise ValueError(f"Unknown backend '{backend}', expected 'python' or 'verilator'")
+
     if trace:
         dut.apply(DefaultPassGroup(
             linetrace=True,  # Enable text-based line tracing
@@ -59,40 +128,185 @@ def setup_test(trace, program_file):
     return dut
 
 
-def test_cpu(dut):
+def reset_computer(dut):
     # Reset the simulator and set CLR signal
     dut.CLR @= 1
     dut.sim_tick()
     dut.CLR @= 0
 
-    # Run simulation for specified number of cycles or until a termination condition
-    try:
-        for _ in range(500):  # Add a maximum cycle limit to prevent infinite loops
-            dut.sim_eval_combinational()
 
-            # Check for termination instruction
-            if int(dut.cpu.ir.Q) == 0xFFFF:
-                break
+def trace_values(dut):
+    """Current values of the architectural signals the streaming VCDWriter can record."""
+    cpu = dut.cpu
+    return {
+        'PC': cpu.PC,
+        'ACC': cpu.ACC,
+        'IR': cpu.IR,
+        'ADDR': cpu.ADDR,
+        'DATA_IN': cpu.DATA_IN,
+        'DATA_OUT': cpu.DATA_OUT,
+    }
 
-            # Advance simulation by three clock cycles
-            dut.sim_tick()
+
+def run_computer(dut, max_cycles=500, vcd=None):
+    """
+    Run until the termination instruction (0xFFFF) is latched in the IR
+
+    The HaltDetector counts cycles against the budget in the model, so the
+    loop only ticks and reads its DONE output. The IR can only latch 0xFFFF
+    on a fetch edge (cycle count 1 mod 3) and the budget is a whole number
+    of periods, so DONE is read once per instruction period, not per tick.
+    With a VCDWriter, the selected signals are recorded before every tick.
+
+    Returns:
+    - Number of 3-tick instruction periods simulated, including the one
+      that fetched 0xFFFF
+    """
+    budget = max_cycles * 3
+    dut.halt.BUDGET @= budget
+    dut.sim_eval_combinational()
+
+    while not dut.halt.DONE:
+        cycles = int(dut.halt.CYCLES)
+        if vcd is not None:
+            values = trace_values(dut)
+            vcd.sample(cycles, [values[name] for name in vcd.names])
             dut.sim_tick()
+            continue
+        # Ticks up to the next fetch edge or the end of the budget
+        for _ in range(min((-cycles) % 3 + 1, budget - cycles)):
             dut.sim_tick()
-        else:
-            print("Cycle limit reached")
 
+    if vcd is not None:
+        values = trace_values(dut)
+        vcd.sample(int(dut.halt.CYCLES), [values[name] for name in vcd.names])
+
+    if dut.halt.TIMEOUT:
+        return max_cycles
+    return int(dut.halt.CYCLES) // 3 + 1
+
+
+class ComputerSession:
+    """
+    Reusable PyMTL3 simulation of the computer
+
+    The model is elaborated (and, with backend='verilator', imported) once in
+    __init__; each call to run_program() rewrites the SimpleRAM contents,
+    pulses CLR and runs the program, so batch runs pay the elaboration cost
+    only once.
+
+    snapshot() and restore() save and load the whole machine state (see
+    SimpleCPUv1a_common/Snapshot.py), and resume() runs on from a restored
+    state. They need the Python simulation: a Verilator-imported cpu does
+    not expose its flip-flops.
+    """
+
+    def __init__(self, backend='python'):
+        self.backend = backend
+        self.dut = build_computer(backend=backend)
+
+    def run_program(self, mem, max_cycles=500):
+        """Run one program image and return the number of instruction periods."""
+        self.dut.ram.mem[:] = list(mem) + [0] * (len(self.dut.ram.mem) - len(mem))
+        reset_computer(self.dut)
+        return run_computer(self.dut, max_cycles)
+
+    @property
+    def halted(self):
+        """Whether the last run ended on the termination instruction."""
+        return bool(self.dut.halt.HALTED)
+
+    def state(self):
+        """Architectural state after the last run (PC, ACC, IR, RAM)."""
+        cpu = self.dut.cpu
+        return {
+            'PC': int(cpu.PC),
+            'ACC': int(cpu.ACC),
+            'IR': int(cpu.IR),
+            'RAM': list(self.dut.ram.mem),
+        }
 
+    def _state_flops(self):
+        # Every flip-flop of the machine, as (state wires LSB first) per field
+        if not hasattr(self.dut.cpu, 'ctrl'):
+            raise ValueError("Snapshots read and write the gate-level flip-flops, which the Verilator "
+                             "import compiles away; build the session with backend='python'")
+        cpu = self.dut.cpu
+        rc = cpu.ctrl.rc
+        return {
+            'pc': [fdce.state for fdce in cpu.pc.register.fdces],
+            'acc': [fdce.state for fdce in cpu.acc.fdces],
+            'ir': [fdce.state for fdce in cpu.ir.fdces],
+            'ring': [rc.fdp.state, rc.fdc1.state, rc.fdc2.state],
+        }
 
+    def snapshot(self):
+        """Machine state after the last run, as a Snapshot blob."""
+        flops = self._state_flops()
+        return Snapshot.pack(Snapshot.MachineState(
+            cycles=int(self.dut.halt.count),
+            ram=[int(word) for word in self.dut.ram.mem],
+            **{field: Snapshot.from_bits(wires) for field, wires in flops.items()},
+        ))
+
+    def restore(self, blob):
+        """Load a Snapshot blob; call resume() to run on from it."""
+        state = Snapshot.unpack(blob)
+        flops = self._state_flops()
+        self.dut.ram.mem[:] = state.ram
+
+        # Flip-flops only copy their next value on a tick (pymtl3 Bits._next),
+        # so both values are set, or a disabled FDCE would revert on the next
+        # edge
+        def poke(wire, value):
+            wire @= value
+            wire._next = value
+
+        for field, wires in flops.items():
+            for wire, bit in zip(wires, Snapshot.bits(getattr(state, field), len(wires))):
+                poke(wire, bit)
+        poke(self.dut.halt.count, state.cycles)
+        self.dut.CLR @= 0
+        self.dut.sim_eval_combinational()
+
+    def resume(self, max_cycles=500):
+        """Tick on from the poked flip-flops and halt-detector count, without a reset."""
+        return run_computer(self.dut, max_cycles)
+
+
+def test_cpu(dut, max_cycles=500, vcd=None):
+    reset_computer(dut)
+
+    # Run simulation for specified number of cycles or until a termination condition
+    try:
+        run_computer(dut, max_cycles, vcd)
+        if dut.halt.TIMEOUT:
+            print("Cycle limit reached")
     except Exception as e:
         print(f"Simulation stopped due to error: {e}")
 
 
-def run_test(trace=False, program_path = "programs/code.dat"):
-    dut = setup_test(trace, program_path)
+def run_test(trace=False, program_path = "programs/code.dat", backend='python', max_cycles=500,
+             signals=None, windows=None):
+    """
+    Run a program on the Computer testbench
+
+    Inputs:
+    - trace: Write waveforms/Computer.vcd
+    - signals: Optional allow-list (e.g. ['PC', 'ACC', 'IR']); with trace, only
+      these signals are streamed to the VCD instead of the whole design
+    - windows: Optional list of (start, end) clock-cycle ranges to record
+    """
+    vcd = VCDWriter('waveforms/Computer.vcd', signals, windows) if trace and signals else None
+    dut = setup_test(trace and vcd is None, program_path, backend)
 
     start = time.perf_counter()
 
-    test_cpu(dut)  # Runs simulation (e.g., calls Simulation(...).run())
+    try:
+        test_cpu(dut, max_cycles, vcd)  # Runs simulation (e.g., calls Simulation(...).run())
+    finally:
+        if vcd is not None:
+            vcd.close()
 
     end = time.perf_counter()
     elapsed = end - start
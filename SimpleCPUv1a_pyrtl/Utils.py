@@ -1,4 +1,14 @@
+import ctypes
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import astuple
+from importlib import metadata
+
 import pyrtl
+from pyrtl.compilesim import CompiledSimulation
 
 
 def concat(*args):
@@ -27,4 +37,251 @@ def reset_pulse(reset):
     # But we can define it for compatibility
     with pyrtl.conditional_assignment:
         with pyrtl.probe(reset) == 1:
-            reset.next <<= 0
\ No newline at end of file
+            reset.next <<= 0
+
+
+# -------------------------------------------------------------------------
+# Simulation engines
+# -------------------------------------------------------------------------
+
+SIM_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sim_cache')
+
+
+def _pyrtl_version():
+    try:
+        return metadata.version('pyrtl')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+def reset_design():
+    """
+    Reset the working block and PyRTL's global name counters
+
+    Temporary wire names and memory ids come from global counters, so a design
+    rebuilt after reset_design() produces the same netlist_hash() every time.
+    """
+    pyrtl.reset_working_block()
+    pyrtl.wire._reset_wire_indexers()
+    pyrtl.memory._reset_memory_indexer()
+
+
+def netlist_hash(block=None):
+    """
+    Stable hash of a PyRTL netlist
+
+    Nets are hashed in sorted textual form so the result does not depend on
+    set iteration order. Build the design after reset_design() for the hash
+    to be reproducible.
+    """
+    block = pyrtl.working_block(block)
+    digest = hashlib.sha256(_pyrtl_version().encode())
+    for net in sorted(str(net) for net in block.logic):
+        digest.update(net.encode())
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+class CachedFastSimulation(pyrtl.FastSimulation):
+    """
+    FastSimulation whose generated Python source is cached on disk
+
+    The source only refers to wires by name, so it is reused for any netlist
+    with the same netlist_hash() and the same traced wires.
+    """
+
+    def __init__(self, *args, cache_dir=SIM_CACHE_DIR, **kwargs):
+        self.cache_dir = cache_dir
+        super().__init__(*args, **kwargs)
+
+    def _compiled(self):
+        path = os.path.join(self.cache_dir, f'{_cache_key(self.block, self.tracer)}.py')
+        if os.path.exists(path):
+            with open(path) as f:
+                return f.read()
+
+        source = super()._compiled()
+        _write_atomic(path, source.encode())
+        return source
+
+
+class CachedCompiledSimulation(CompiledSimulation):
+    """
+    CompiledSimulation whose shared library is cached on disk
+
+    Behavior:
+    - The library is keyed on the netlist hash, the traced wires and the
+      register reset values, so gcc only runs once per design.
+    - Memory contents are not compiled in; memory_value_map is written into
+      the hash maps after loading, so one library serves every program.
+    - Each instance loads a private copy of the library, because the
+      generated C keeps the design state in globals.
+    """
+
+    def __init__(self, tracer=True, register_value_map=None, memory_value_map=None,
+                 default_value=0, block=None, cache_dir=SIM_CACHE_DIR):
+        self.cache_dir = cache_dir
+        super().__init__(tracer=tracer, register_value_map=register_value_map,
+                         default_value=default_value, block=block)
+
+        memory_value_map = memory_value_map or {}
+        self.tracer._set_initial_values(default_value, register_value_map or {}, memory_value_map)
+        for mem, values in memory_value_map.items():
+            self.load_mem(mem, values)
+
+    def load_mem(self, mem, values):
+        """Write {address: value} pairs into a memory of the running simulation."""
+        limbs = self._limbs(mem)
+        mem_ptr = ctypes.c_void_p.in_dll(self._dll, self.var_names[mem])
+        for addr, value in values.items():
+            words = (ctypes.c_uint64 * limbs)(*((value >> (64 * i)) & 0xFFFFFFFFFFFFFFFF for i in range(limbs)))
+            self._mem_insert(mem_ptr, addr, words)
+
+    def _create_dll(self):
+        reset_values = sorted((reg.name, value) for reg, value in self._register_value_map.items())
+        base = os.path.join(self.cache_dir, _cache_key(self.block, self.tracer, reset_values))
+        if not (os.path.exists(base + '.so') and os.path.exists(base + '.json')):
+            super()._create_dll()
+            self._store(base)
+        else:
+            self._dir = tempfile.mkdtemp()
+            shutil.copy(base + '.so', os.path.join(self._dir, 'pyrtlsim.so'))
+            self._restore(base)
+            self._dll = ctypes.CDLL(os.path.join(self._dir, 'pyrtlsim.so'))
+            self._sim_run_all = self._dll.sim_run_all
+            self._sim_run_all.restype = None
+            self._initialize_mems = self._dll.initialize_mems
+            self._initialize_mems.restype = None
+            self._mem_lookup = self._dll.lookup
+            self._mem_lookup.restype = ctypes.POINTER(ctypes.c_uint64)
+
+        self._mem_insert = self._dll.insert
+        self._mem_insert.restype = None
+
+    def _store(self, base):
+        # The generated C is laid out in set iteration order, so the library's
+        # interface is saved alongside it rather than regenerated on a cache hit
+        layout = {
+            'inputs': {name: astuple(meta) for name, meta in self._inputs_metadata.items()},
+            'outputs': {name: astuple(meta) for name, meta in self._outputs_metadata.items()},
+            'inputs_length': self._inputs_array_length,
+            'outputs_length': self._outputs_array_length,
+            'mems': {obj.name: name for obj, name in self.var_names.items() if isinstance(obj, pyrtl.MemBlock)},
+        }
+        with open(os.path.join(self._dir, 'pyrtlsim.so'), 'rb') as f:
+            _write_atomic(base + '.so', f.read())
+        _write_atomic(base + '.json', json.dumps(layout).encode())
+
+    def _restore(self, base):
+        with open(base + '.json') as f:
+            layout = json.load(f)
+        self._inputs_metadata = {name: self.InputMetadata(*meta) for name, meta in layout['inputs'].items()}
+        self._outputs_metadata = {name: self.OutputMetadata(*meta) for name, meta in layout['outputs'].items()}
+        self._inputs_array_length = layout['inputs_length']
+        self._outputs_array_length = layout['outputs_length']
+        mems = {net.op_param[1] for net in self.block.logic_subset('m@')}
+        self.var_names = {mem: layout['mems'][mem.name] for mem in mems if mem.name in layout['mems']}
+
+
+def _cache_key(block, tracer, *extra):
+    # Generated code also depends on which wires are traced
+    digest = hashlib.sha256(netlist_hash(block).encode())
+    if tracer is not None:
+        digest.update(repr(sorted(tracer.trace)).encode())
+    for item in extra:
+        digest.update(repr(item).encode())
+    return digest.hexdigest()
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+ENGINES = {
+    'interpreted': pyrtl.Simulation,
+    'fast': CachedFastSimulation,
+    'compiled': CachedCompiledSimulation,
+}
+
+
+def load_memory(sim, mem, values):
+    """
+    Replace the contents of a memory in a running simulation
+
+    Inputs:
+    - values: {address: value} pairs; every other address reads as 0
+    """
+    if isinstance(sim, CachedCompiledSimulation):
+        sim.load_mem(mem, {addr: values.get(addr, 0) for addr in range(1 << mem.addrwidth)})
+    else:
+        # The interpreted and fast engines return their live dictionary
+        contents = sim.inspect_mem(mem)
+        contents.clear()
+        contents.update(values)
+
+
+def find_register(name, block=None):
+    """
+    Register behind a named wire
+
+    The registers of components/Register.py are anonymous; their output
+    reaches the named wires (cpu_pc, ctrl_ring, cycles, ...) through plain
+    assignments, which are followed back to the Register.
+    """
+    block = pyrtl.working_block(block)
+    wire = block.get_wirevector_by_name(name)
+    sources = block.net_connections()[0]
+    while not isinstance(wire, pyrtl.Register):
+        net = sources.get(wire)
+        if net is None or net.op != 'w':
+            raise ValueError(f"'{name}' is not driven by a register")
+        wire = net.args[0]
+    return wire
+
+
+def get_registers(sim, regs):
+    """Current values of some Registers in a running simulation."""
+    if isinstance(sim, CachedCompiledSimulation):
+        raise ValueError("The compiled engine keeps its registers in C statics, where they cannot be read; "
+                         "use engine='interpreted' or 'fast'")
+    if isinstance(sim, pyrtl.FastSimulation):
+        return [sim.regs[reg.name] for reg in regs]
+    # regvalue holds the value each register takes on the next step
+    return [sim.regvalue[reg] for reg in regs]
+
+
+def set_registers(sim, values):
+    """Overwrite Registers of a running simulation, from {Register: value}."""
+    if isinstance(sim, CachedCompiledSimulation):
+        raise ValueError("The compiled engine keeps its registers in C statics, where they cannot be written; "
+                         "use engine='interpreted' or 'fast'")
+    for reg, value in values.items():
+        if isinstance(sim, pyrtl.FastSimulation):
+            sim.regs[reg.name] = value
+        else:
+            sim.regvalue[reg] = value
+
+
+def make_simulation(engine='interpreted', tracer=None, **kwargs):
+    """
+    Create a PyRTL simulation of the working block
+
+    Inputs:
+    - engine: 'interpreted' (pyrtl.Simulation), 'fast' (FastSimulation) or
+      'compiled' (CompiledSimulation, needs gcc)
+    - tracer: SimulationTrace to record, or None for no waveform
+    - kwargs: register_value_map / memory_value_map, passed through
+
+    The compiled engine can only inspect traced wires, so without a tracer it
+    records the Output wires only.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {', '.join(ENGINES)}")
+
+    if engine == 'compiled' and tracer is None:
+        tracer = pyrtl.SimulationTrace(wires_to_track=list(pyrtl.working_block().wirevector_subset(pyrtl.Output)))
+    return ENGINES[engine](tracer=tracer, **kwargs)
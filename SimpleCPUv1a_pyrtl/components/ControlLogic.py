@@ -35,7 +35,7 @@ def control_logic(rst, a, z, ir_en, rom_en, ram_en, ram_wr, addr_sel,
     - Includes conditional logic based on the Zero flag (z) to manage program flow.
     """
     # Internals
-    q = pyrtl.WireVector(3)
+    q = pyrtl.WireVector(3, 'ctrl_ring')
     y = pyrtl.WireVector(16)
     not_z = pyrtl.WireVector(1)
     buf_pc_ld = pyrtl.WireVector(1)
@@ -0,0 +1,39 @@
+import pyrtl
+
+HALT_WORD = 0xFFFF
+
+
+def halt_detector(rst, ir, budget, halted, timeout, done, cycles):
+    """
+    Halt detector with a cycle budget, evaluated inside the simulator
+
+    Inputs:
+    - rst: Clears the cycle counter
+    - ir: Bus(16) — instruction register of the cpu
+    - budget: Bus(32) — clock cycles allowed after reset
+
+    Outputs:
+    - halted: ir holds 0xFFFF
+    - timeout: cycles has reached budget
+    - done: halted | timeout
+    - cycles: Bus(32) — clock cycles since reset; stops counting once done
+    """
+    count = pyrtl.Register(32)
+    is_halt = pyrtl.WireVector(1)
+    over = pyrtl.WireVector(1)
+    stop = pyrtl.WireVector(1)
+
+    is_halt <<= ir == HALT_WORD
+    over <<= count >= budget
+    stop <<= is_halt | over
+
+    with pyrtl.conditional_assignment:
+        with rst:
+            count.next |= 0
+        with ~stop:
+            count.next |= count + 1
+
+    halted <<= is_halt
+    timeout <<= over
+    done <<= stop
+    cycles <<= count
@@ -23,9 +23,9 @@ def cpu(data_in, rst, data_out, addr, ram_en, ram_wr, rom_en):
     - rom_en: ROM enable
     """
     # Internal signals
-    ir = pyrtl.WireVector(16)
-    pc = pyrtl.WireVector(8)
-    acc = pyrtl.WireVector(8)
+    ir = pyrtl.WireVector(16, 'cpu_ir')
+    pc = pyrtl.WireVector(8, 'cpu_pc')
+    acc = pyrtl.WireVector(8, 'cpu_acc')
     alu_out = pyrtl.WireVector(8)
     data = pyrtl.WireVector(8)
     acc_ctl = pyrtl.WireVector(3)
@@ -1,8 +1,9 @@
 import pyrtl
 from components.Math import alu
+from Utils import make_simulation
 
 
-def test_ALU():
+def test_ALU(engine='interpreted'):
     """
     Test bench for the ALU component.
     Tests basic operations (ADD, SUB, AND, PASS B) with various inputs.
@@ -23,7 +24,7 @@ def test_ALU():
     sim_trace = pyrtl.SimulationTrace()
 
     # Create a simulator
-    sim = pyrtl.Simulation(tracer=sim_trace)
+    sim = make_simulation(engine, tracer=sim_trace)
 
     # Define test vectors (a_val, b_val, ctl_val, expected_result, description)
     test_vectors = [
@@ -66,11 +67,11 @@ def test_ALU():
     return sim_trace
 
 
-def run_test(trace=False):
+def run_test(trace=False, engine='interpreted'):
     """Run the ALU test with optional trace display."""
     print("\n--- ALU Test Start ---\n")
 
-    sim_trace = test_ALU()
+    sim_trace = test_ALU(engine)
 
     if trace:
         # Create a VCD file for waveform viewing in external tools
@@ -1,38 +1,59 @@
+import os
+import sys
 import time
 
 import pyrtl
 from computer.Computer import computer
+from computer.HaltDetector import halt_detector
+from Utils import find_register, get_registers, load_memory, make_simulation, reset_design, set_registers
+
+# The shared tools (SimpleCPUv1a_common) live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from SimpleCPUv1a_common.Loader import load_image
+from SimpleCPUv1a_common.VCDWriter import VCDWriter
+from SimpleCPUv1a_common import Snapshot
+
+# Architectural signal -> Output probe, for the streaming VCDWriter
+TRACE_PROBES = {
+    'PC': 'pc_probe',
+    'ACC': 'acc_probe',
+    'IR': 'ir_probe',
+    'ADDR': 'addr_probe',
+    'DATA_IN': 'data_in_probe',
+    'DATA_OUT': 'data_out_probe',
+}
 
 
 def load_program_from_dat(filename):
-    """Load a program from a .dat file into a dictionary format for memory initialization."""
-    program = {}
+    """
+    Load a program file into a dictionary format for memory initialization.
+
+    Accepts the .dat, .asc, .mem and .mif outputs of simpleCPUv1a_as.py; see
+    SimpleCPUv1a_common/Loader.py. .dat addresses are decimal.
+    """
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                if line.strip() == '':
-                    continue
-
-                parts = line.strip().split()
-                if len(parts) >= 2:
-                    addr = int(parts[0], 16)
-                    instr = int(parts[1], 2)
-                    program[addr] = instr
-
-        print(f"Loaded {len(program)} instructions from {filename}")
-        return program
+        image = load_image(filename)
     except Exception as e:
         print(f"Error loading program from {filename}: {e}")
         return {}
 
+    program = {addr: instr for addr, instr in enumerate(image) if instr}
+    print(f"Loaded {len(program)} instructions from {filename}")
+    return program
+
+
+def build_computer():
+    """
+    Build the computer, its probes and the halt detector in a fresh working block
 
-def setup_sim(program_path):
-    # Reset PyRTL working block
-    pyrtl.reset_working_block()
+    Returns:
+    - The RAM MemBlock
+    """
+    # Reset PyRTL working block (and name counters, so cached simulations are reused)
+    reset_design()
 
     # Create reset signal and computer
     rst = pyrtl.Input(1, 'rst')
-    test_program = load_program_from_dat(program_path)
     mem = computer(rst)
 
     # Access key wires for monitoring
@@ -45,42 +66,204 @@ def setup_sim(program_path):
     addr_probe = pyrtl.Output(8, 'addr_probe')
     data_in_probe = pyrtl.Output(16, 'data_in_probe')
     data_out_probe = pyrtl.Output(16, 'data_out_probe')
+    pc_probe = pyrtl.Output(8, 'pc_probe')
+    acc_probe = pyrtl.Output(8, 'acc_probe')
+    ir_probe = pyrtl.Output(16, 'ir_probe')
 
     # Connect probes
     addr_probe <<= addr
     data_in_probe <<= data_in
     data_out_probe <<= data_out
+    pc_probe <<= block.get_wirevector_by_name('cpu_pc')
+    acc_probe <<= block.get_wirevector_by_name('cpu_acc')
+    ir_probe <<= block.get_wirevector_by_name('cpu_ir')
+
+    # Halt detector: the 0xFFFF compare and cycle budget are part of the netlist
+    budget = pyrtl.Input(32, 'budget')
+    halted = pyrtl.Output(1, 'halted')
+    timeout = pyrtl.Output(1, 'timeout')
+    done = pyrtl.Output(1, 'done')
+    cycles = pyrtl.Output(32, 'cycles')
+    halt_detector(rst, block.get_wirevector_by_name('cpu_ir'), budget, halted, timeout, done, cycles)
+
+    return mem
+
+
+def setup_sim(program_path, engine='interpreted', trace=True):
+    test_program = load_program_from_dat(program_path)
+    mem = build_computer()
 
-    sim_trace = pyrtl.SimulationTrace()
-    sim = pyrtl.Simulation(tracer=sim_trace, memory_value_map={mem: test_program})
+    sim_trace = pyrtl.SimulationTrace() if trace else None
+    sim = make_simulation(engine, tracer=sim_trace, memory_value_map={mem: test_program})
 
     return sim, sim_trace
 
-def test_computer(sim):
+def reset_computer(sim):
     # Reset cycle
-    sim.step({'rst': 1})
+    sim.step({'rst': 1, 'budget': 0})
 
-    # Run simulation cycles
-    for _ in range(500):  # Limit to 500 cycles
-        # Check for termination instruction
-        if sim.inspect('data_in_probe') == 0xFFFF:
+
+def run_computer(sim, max_cycles=500, vcd=None, lag=0):
+    """
+    Run until the termination instruction (0xFFFF) is latched in the IR
+
+    The halt detector counts cycles against the budget in the netlist, so the
+    loop only steps and reads its done output. The IR can only latch 0xFFFF
+    on a fetch edge (cycle count 1 mod 3) and the budget is a whole number
+    of periods, so without a VCDWriter the loop steps one instruction period
+    at a time with step_multiple() and reads done once per period. With a
+    VCDWriter, the selected probes are recorded after every step.
+
+    Outputs read after a step describe the state before it, so the run ends
+    one clock edge past the cycle that raised done, with the cycles register
+    frozen one edge behind the rest of the machine.
+
+    Inputs:
+    - lag: Clock edges the cycles register is behind the machine, from
+      earlier runs without a reset (see ComputerSession.resume)
+
+    Returns:
+    - Number of 3-step instruction periods simulated, including the one
+      that fetched 0xFFFF, or max_cycles if the budget ran out (the timeout
+      output is then set)
+    """
+    budget = max_cycles * 3
+    inputs = {'rst': 0, 'budget': max(budget - lag, 0)}
+
+    cycle = 0
+    sim.step(inputs)
+    while True:
+        if vcd is not None:
+            vcd.sample(cycle, [sim.inspect(TRACE_PROBES[name]) for name in vcd.names])
+        if sim.inspect('done'):
             break
-        # Step simulation (3 steps for consistency with original)
-        for step in range(3):
-            sim.step({'rst': 0})
-    else:
+        cycle += 1
+        if vcd is not None:
+            sim.step(inputs)
+            continue
+        # Steps until done has been evaluated on the next fetch edge or the
+        # end of the budget
+        seen = sim.inspect('cycles') + lag
+        steps = min((-seen) % 3 + 1, budget - seen)
+        sim.step_multiple({name: [value] * steps for name, value in inputs.items()}, nsteps=steps)
+
+    if sim.inspect('timeout'):
+        return max_cycles
+    return (sim.inspect('cycles') + lag) // 3 + 1
+
+
+class ComputerSession:
+    """
+    Reusable PyRTL simulation of the computer
+
+    The netlist and the simulation are built once in __init__; each call to
+    run_program() rewrites the RAM contents, pulses rst and runs the program,
+    so batch runs pay the build (and, for 'fast' and 'compiled', the code
+    generation) cost only once.
+
+    snapshot() and restore() save and load the whole machine state (see
+    SimpleCPUv1a_common/Snapshot.py), and resume() runs on from a restored
+    state or from where the last run stopped. snapshot() and restore() need
+    the 'interpreted' or 'fast' engine: the compiled engine keeps its
+    registers in the shared library, out of reach.
+
+    Each run ends one clock edge past the halt detector's count (see
+    run_computer). The session keeps that lag itself rather than writing the
+    cycles register, so resume() works on every engine.
+
+    PyRTL keeps the design in a global working block, so use one session per
+    process.
+    """
+
+    def __init__(self, engine='interpreted'):
+        self.mem = build_computer()
+        self.sim = make_simulation(engine, memory_value_map={self.mem: {}})
+
+        # Snapshot field -> Register
+        self.registers = {field: find_register(name) for field, name in
+                          (('pc', 'cpu_pc'), ('acc', 'cpu_acc'), ('ir', 'cpu_ir'), ('ring', 'ctrl_ring'),
+                           ('cycles', 'cycles'))}
+        self.lag = 0
+
+    def run_program(self, mem, max_cycles=500):
+        """Run one program image and return the number of instruction periods."""
+        load_memory(self.sim, self.mem, {addr: value for addr, value in enumerate(mem) if value})
+        reset_computer(self.sim)
+        self.lag = 0
+        return self.resume(max_cycles)
+
+    @property
+    def halted(self):
+        """Whether the last run ended on the termination instruction."""
+        return bool(self.sim.inspect('halted'))
+
+    def state(self):
+        """Architectural state after the last run (PC, ACC, IR, RAM)."""
+        ram = self.sim.inspect_mem(self.mem)
+        return {
+            'PC': self.sim.inspect('pc_probe'),
+            'ACC': self.sim.inspect('acc_probe'),
+            'IR': self.sim.inspect('ir_probe'),
+            'RAM': [ram.get(addr, 0) for addr in range(256)],
+        }
+
+    def snapshot(self):
+        """Machine state after the last run, as a Snapshot blob."""
+        state = dict(zip(self.registers, get_registers(self.sim, self.registers.values())))
+        state['cycles'] += self.lag
+        ram = self.sim.inspect_mem(self.mem)
+        return Snapshot.pack(Snapshot.MachineState(ram=[ram.get(addr, 0) for addr in range(256)], **state))
+
+    def restore(self, blob):
+        """Load a Snapshot blob; call resume() to run on from it."""
+        state = Snapshot.unpack(blob)
+        set_registers(self.sim, {reg: getattr(state, field) for field, reg in self.registers.items()})
+        load_memory(self.sim, self.mem, {addr: value for addr, value in enumerate(state.ram) if value})
+        self.lag = 0
+
+    def resume(self, max_cycles=500):
+        """Step on from the current register values, without a reset."""
+        periods = run_computer(self.sim, max_cycles, lag=self.lag)
+        self.lag += 1
+        return periods
+
+
+def test_computer(sim, max_cycles=500, vcd=None):
+    reset_computer(sim)
+
+    # Run simulation cycles
+    run_computer(sim, max_cycles, vcd)
+    if sim.inspect('timeout'):
         print("Cycle limit reached")
 
-def run_test(trace=False, program_path='programs/code.dat'):
-    print("\n=== Computer Test Start ===")
-    sim, sim_trace = setup_sim(program_path)
+def run_test(trace=False, program_path='programs/code.dat', engine='interpreted', max_cycles=500,
+             signals=None, windows=None):
+    """
+    Run a program on the Computer testbench
+
+    Inputs:
+    - trace: Write waveforms/Computer.vcd
+    - signals: Optional allow-list (e.g. ['PC', 'ACC', 'IR']); with trace, only
+      these signals are streamed to the VCD instead of building the whole
+      SimulationTrace in memory
+    - windows: Optional list of (start, end) clock-cycle ranges to record
+    """
+    print(f"\n=== Computer Test Start ({engine}) ===")
+    vcd = VCDWriter('waveforms/Computer.vcd', signals, windows) if trace and signals else None
+    sim, sim_trace = setup_sim(program_path, engine, trace and vcd is None)
 
     start = time.perf_counter()
-    test_computer(sim)
+    try:
+        test_computer(sim, max_cycles, vcd)
+    finally:
+        if vcd is not None:
+            vcd.close()
     end = time.perf_counter()
     elapsed = end - start
 
-    if trace:
+    if vcd is not None:
+        print("VCD file generated.")
+    elif trace:
         with open('waveforms/Computer.vcd', 'w') as f:
             sim_trace.print_vcd(f)
         print("VCD file generated.")
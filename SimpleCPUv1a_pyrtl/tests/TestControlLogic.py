@@ -1,7 +1,8 @@
 import pyrtl
 from components.ControlLogic import control_logic
+from Utils import make_simulation
 
-def test_control_logic():
+def test_control_logic(engine='interpreted'):
     pyrtl.reset_working_block()
 
     # Inputs
@@ -31,7 +32,7 @@ def test_control_logic():
 
     # Set up trace and sim
     sim_trace = pyrtl.SimulationTrace()
-    sim = pyrtl.Simulation(tracer=sim_trace)
+    sim = make_simulation(engine, tracer=sim_trace)
 
     # Instruction test vectors: (opcode, z_flag, description)
     test_vectors = [
@@ -114,8 +115,8 @@ def test_control_logic():
     return sim_trace
 
 
-def run_test(trace=False):
-    sim_trace = test_control_logic()
+def run_test(trace=False, engine='interpreted'):
+    sim_trace = test_control_logic(engine)
 
     if trace:
         with open("waveforms/ControlLogic.vcd", "w") as f:
@@ -1,7 +1,8 @@
 import pyrtl
 from components.Register import counter_8
+from Utils import make_simulation
 
-def test_counter_8():
+def test_counter_8(engine='interpreted'):
     pyrtl.reset_working_block()
 
     # Inputs
@@ -16,7 +17,7 @@ def test_counter_8():
     counter_8(rst, ce, ld, d, q)
 
     sim_trace = pyrtl.SimulationTrace()
-    sim = pyrtl.Simulation(tracer=sim_trace)
+    sim = make_simulation(engine, tracer=sim_trace)
 
     # Test vectors: (rst, ce, ld, d, expected, description)
     test_vectors = [
@@ -99,8 +100,8 @@ def test_counter_8():
     return sim_trace
 
 
-def run_test(trace=False):
-    sim_trace = test_counter_8()
+def run_test(trace=False, engine='interpreted'):
+    sim_trace = test_counter_8(engine)
 
     if trace:
         with open("waveforms/Counter8.vcd", "w") as f:
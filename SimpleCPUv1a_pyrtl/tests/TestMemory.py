@@ -1,7 +1,8 @@
 import pyrtl
 from computer.Memory import simple_ram  # Adjust path as needed
+from Utils import make_simulation
 
-def test_simple_ram():
+def test_simple_ram(engine='interpreted'):
     pyrtl.reset_working_block()
 
     # Signals
@@ -16,7 +17,7 @@ def test_simple_ram():
 
     # Simulation
     sim_trace = pyrtl.SimulationTrace()
-    sim = pyrtl.Simulation(tracer=sim_trace)
+    sim = make_simulation(engine, tracer=sim_trace)
 
     # Test vectors: (addr, data_in, en, we, expected_out, description)
     test_vectors = [
@@ -53,8 +54,8 @@ def test_simple_ram():
     return sim_trace
 
 
-def run_test(trace=False):
-    sim_trace = test_simple_ram()
+def run_test(trace=False, engine='interpreted'):
+    sim_trace = test_simple_ram(engine)
 
     if trace:
         with open("waveforms/RAM.vcd", "w") as f:
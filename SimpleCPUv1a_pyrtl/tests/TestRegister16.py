@@ -1,8 +1,9 @@
 import pyrtl
 from components.Register import register
+from Utils import make_simulation
 
 
-def test_register16():
+def test_register16(engine='interpreted'):
     pyrtl.reset_working_block()
 
     # Inputs
@@ -17,7 +18,7 @@ def test_register16():
     register(rst, ce, d, q, 16)
 
     sim_trace = pyrtl.SimulationTrace()
-    sim = pyrtl.Simulation(tracer=sim_trace)
+    sim = make_simulation(engine, tracer=sim_trace)
 
     # Test vectors: (rst, ce, d, expected_q_next, description)
     test_vectors = [
@@ -85,9 +86,9 @@ def test_register16():
     return sim_trace, result == "PASS"
 
 
-def run_test(trace=False):
+def run_test(trace=False, engine='interpreted'):
     print("\n=== Register16 Test Start ===\n")
-    sim_trace, passed = test_register16()
+    sim_trace, passed = test_register16(engine)
 
     if trace:
         with open('waveforms/Register16.vcd', 'w') as f:
@@ -1,8 +1,9 @@
 import pyrtl
 from components.Register import ring_counter
+from Utils import make_simulation
 
 
-def test_ring_counter():
+def test_ring_counter(engine='interpreted'):
     pyrtl.reset_working_block()
 
     # Inputs
@@ -14,7 +15,7 @@ def test_ring_counter():
     ring_counter(rst, q)
 
     sim_trace = pyrtl.SimulationTrace()
-    sim = pyrtl.Simulation(tracer=sim_trace)
+    sim = make_simulation(engine, tracer=sim_trace)
 
     # Test vectors: (rst_val, expected_q_next, description)
     test_vectors = [
@@ -70,9 +71,9 @@ def test_ring_counter():
     return sim_trace, result == "PASS"
 
 
-def run_test(trace=False):
+def run_test(trace=False, engine='interpreted'):
     print("\n=== Ring Counter Test Start ===\n")
-    sim_trace, passed = test_ring_counter()
+    sim_trace, passed = test_ring_counter(engine)
 
     if trace:
         with open('waveforms/RingCounter3.vcd', 'w') as f:
@@ -23,10 +23,28 @@ import re
 # JUMPNZ  1    0    1    0    X    X    X    X    A    A    A    A    A    A    A    A
 # JUMPC   1    0    1    1    X    X    X    X    A    A    A    A    A    A    A    A
 
+instr_names = ['move', 'add', 'sub', 'and', 'load', 'store', 'addm', 'subm', 
+               'jump', 'jumpu', 'jumpz', 'jumpnz', 'jumpc', 
+               '.data', '.addr']
+
+self_mod_opcodes = [ "0000", "0001", "0010", "0011", "0100", "0101", "0110", "0111", 
+                     "1000", "1001", "1010", "1011", "1100", "1101", "1110", "1111"  ]
+
+MEMORY_SIZE = 256
+
 #############
 # FUNCTIONS #
 #############
 
+class AssemblerError(Exception):
+  """Error in the assembly source, raised instead of exiting."""
+
+  def __init__(self, message, words=None):
+    if words is not None:
+      message = message + ": " + str(words)
+    super().__init__(message)
+    self.words = words
+
 def convertData(data):
   try:
     if '0x' not in data:
@@ -34,10 +52,247 @@ def convertData(data):
     else:
       return int(data, 16) 
   except:
-    print("Error: invalid operand (hex)")
-    print(words) 
-    sys.exit(1)
+    raise AssemblerError("invalid operand (hex)", data)
 	
+
+def first_pass(lines, address=0, byte_addressable=False):
+  """
+  Scan the source, assign addresses to labels and replace the labels
+
+  Inputs:
+  - lines: Source lines, with their line endings
+  - address: Address of the first instruction (-a)
+  - byte_addressable: Step addresses by 2 (-b)
+
+  Returns:
+  - (label_dictionary, tmp_lines), where tmp_lines is the program in the
+    format of tmp.asm
+  """
+  label_dictionary = {}
+  instruction_address = address
+
+  for line in lines:
+    line = re.sub(r'#', '# ', line.lower()) 
+    line = re.sub(r'\s+', ' ', line)
+
+    if len(line) > 1 and line[0] == ' ':
+      line = line[1:]
+		  
+    if line[0] =='#' or line[0] ==' ':
+      continue
+		  
+    if ".addr" in line:
+      instruction_address = convertData(line.split()[1])
+      continue
+
+    if ":" in line:
+      key = re.sub(r':.$', '', line)
+      if key in label_dictionary:
+        raise AssemblerError("duplicate labels", key)
+      label_dictionary[key] = instruction_address
+    else:
+      words = line.split(' ')
+      if words[0] in instr_names:
+        if byte_addressable:
+          instruction_address += 2
+        else:
+          instruction_address += 1 		
+      else:
+        raise AssemblerError("invalid instruction", words)
+		
+  # replace lables with addresses, collect the code for tmp_file
+	  
+  tmp_lines = []
+  instruction_address = address
+
+  for line in lines:
+    line = re.sub(r'#', '# ', line.lower()) 
+    line = re.sub(r'\s+', ' ', line)
+
+		
+    if len(line) > 1 and line[0] == ' ':
+      line = line[1:]
+		  
+    if line[0] =='#' or line[0] ==' ':
+      continue
+
+    if ":" in line:
+      continue
+		    
+    if ".addr" in line:
+      instruction_address = convertData(line.split()[1]) 
+      continue
+
+    words = line.split(' ')	
+    outputString = str.format('{:03}', instruction_address) + " "
+
+    for i in range(0, len(words)):
+      if words[i] in label_dictionary:
+        key = words[i]
+        outputString = outputString + " " + str(label_dictionary[key])
+      else:
+        if words[i] != '':
+          outputString = outputString + " " + words[i]
+
+    outputString = outputString + "\n"
+    tmp_lines.append( outputString )			
+    if byte_addressable:
+      instruction_address += 2
+    else:
+      instruction_address += 1 	
+  
+
+  # limit test #
+
+  if byte_addressable:
+    if instruction_address >  128:
+      raise AssemblerError("program bigger than memory limit: (" + str(instruction_address) + ")")
+  else:
+    if instruction_address >  256:
+      raise AssemblerError("program bigger than memory limit: (" + str(instruction_address) + ")")
+
+  return label_dictionary, tmp_lines
+
+
+def second_pass(tmp_lines):
+  """
+  Encode a program in the format of tmp.asm into machine code
+
+  Returns:
+  - List of (address, instruction, words) in program order
+  """
+  program = []
+
+  for line in tmp_lines:
+    line = re.sub(r'\s+', ' ', line)
+
+    words = line.split(' ')
+
+    instr = 0
+    imm   = False
+    abs   = False
+    dat   = False
+
+    #print words
+    if words[0].isdigit():
+
+      # match opcode #
+      if words[1] == "move":
+        imm = True
+        instr = instr | int('0000000000000000', 2)       
+      elif words[1] == "add":
+        imm = True
+        instr = int('0001000000000000', 2)
+      elif words[1] == "sub":
+        imm = True
+        instr = int('0010000000000000', 2)
+      elif words[1] == "and":
+        imm = True
+        instr = int('0011000000000000', 2)
+      elif words[1] == "load":
+        abs = True
+        instr = int('0100000000000000', 2)
+      elif words[1] == "store":
+        abs = True
+        if words[3] == '' or words[3] == '#':
+          instr = int('0101000000000000', 2)
+        else:
+          if int(words[3]) < 16 and int(words[3]) >= 0:
+            instr = int('0101' + self_mod_opcodes[int(words[3])] + '000000000000', 2) 
+          else:
+            raise AssemblerError("invalid opcode", words)
+      elif words[1] == "addm":
+        abs = True
+        instr = int('0110000000000000', 2)
+      elif words[1] == "subm":
+        abs = True
+        instr = int('0111000000000000', 2)
+      elif words[1] == "jump":
+        abs = True 
+        instr = int('1000000000000000', 2)
+      elif words[1] == "jumpu":
+        abs = True
+        instr = int('1000000000000000', 2)
+      elif words[1] == "jumpz":
+        abs = True
+        instr = int('1001000000000000', 2)
+      elif words[1] == "jumpnz":
+        abs = True
+        instr = int('1010000000000000', 2)
+      elif words[1] == "jumpc":
+        abs = True
+        instr = int('1011000000000000', 2)
+      elif words[1] == ".data":
+        dat = True
+        instr = int('0000000000000000', 2)
+      else:
+        raise AssemblerError("invalid opcode", words)
+
+      length = 0 
+      for i in range(len(words)):
+        length = length + 1
+        if words[i] == "#":
+          break
+
+      if (length < 2):
+        raise AssemblerError("invalid operand (len<2)", words)
+
+      else:
+        data = 0
+        if (length == 4) and imm:   
+          data = words[2].rstrip()     
+        elif (length == 4) and abs:
+          data = words[2].rstrip()
+        elif (length == 4) and dat:
+          data = words[2].rstrip()		
+        else:
+          raise AssemblerError("invalid operand (len)", words)
+
+        operand = convertData(data) 
+			
+        if imm and (operand > 255):
+          raise AssemblerError("invalid immediate operand (>MAX)", words)
+			
+        if abs and (operand > 255):
+          raise AssemblerError("invalid absolute operand (>MAX)", words)
+			
+        if dat and (operand > 255):
+          raise AssemblerError("invalid data operand (>MAX)", words)
+			
+        instr = instr | operand
+
+        program.append((int(words[0]), instr, words))
+
+  return program
+
+
+def assemble(source, address=0, byte_addressable=False):
+  """
+  Assemble a program in memory
+
+  Inputs:
+  - source: Assembly source text
+  - address: Address of the first instruction (-a)
+  - byte_addressable: Step addresses by 2 (-b)
+
+  Returns:
+  - (image, labels): the 256-word memory image, as loaded from the .dat
+    output, and the label table {name: address}
+
+  Raises:
+  - AssemblerError for any error the command-line assembler reports
+  """
+  # keep line endings: a label is its line up to the ':' and the character after it
+  labels, tmp_lines = first_pass(source.splitlines(True), address, byte_addressable)
+
+  image = [0] * MEMORY_SIZE
+  for instruction_address, instr, words in second_pass(tmp_lines):
+    if instruction_address >= MEMORY_SIZE:
+      raise AssemblerError("address outside memory: (" + str(instruction_address) + ")", words)
+    image[instruction_address] = instr
+
+  return image, labels
+
 ################
 # MAIN PROGRAM #
 ################
@@ -82,13 +337,6 @@ def simpleCPUv1a_as(argv):
 
   label_dictionary = {}
 
-  instr_names = ['move', 'add', 'sub', 'and', 'load', 'store', 'addm', 'subm', 
-                 'jump', 'jumpu', 'jumpz', 'jumpnz', 'jumpc', 
-                 '.data', '.addr']
-
-  self_mod_opcodes = [ "0000", "0001", "0010", "0011", "0100", "0101", "0110", "0111", 
-                       "1000", "1001", "1010", "1011", "1100", "1101", "1110", "1111"  ]
-
   # Assembler Mode
   # Mode = 0 : full function, normal two pass
   # Mode = 1 : first pass only, generate tmp.asm file
@@ -154,54 +402,21 @@ def simpleCPUv1a_as(argv):
       mem_file = open(mem_filename, "w")
       data_file = open(data_filename, "w")
       mif_file = open(mif_filename, "w")
-      tmp_file = open(tmp_filename, "w")
     except IOError: 
       print("Error: Could not open output files")
       sys.exit(1)
 
+    source_lines = source_file.readlines()
+
     # scan through code, count instruction, check opcodes
 	# and identify labels and assign addresses.
 
     if mode != 2:
-      instruction_address = address
-    
-      while True:
-        line = source_file.readline() 
-        line = re.sub(r'#', '# ', line.lower()) 
-        line = re.sub(r'\s+', ' ', line)
-
-        if line == '': 
-          break
-
-        if len(line) > 1 and line[0] == ' ':
-          line = line[1:]
-		  
-        if line[0] =='#' or line[0] ==' ':
-          continue
-		  
-        if ".addr" in line:
-          instruction_address = convertData(line.split()[1])
-          continue
-
-        if ":" in line:
-          key = re.sub(r':.$', '', line)
-          if key in label_dictionary:
-            print("Error: duplicate labels")
-            print(key)
-            sys.exit(1)
-          else:
-            label_dictionary[key] = instruction_address
-        else:
-          words = line.split(' ')
-          if words[0] in instr_names:
-            if byte_addressable:
-              instruction_address += 2
-            else:
-              instruction_address += 1 		
-          else:
-            print("Error: invalid instruction") 
-            print(words)
-            sys.exit(1)
+      try:
+        label_dictionary, tmp_lines = first_pass(source_lines, address, byte_addressable)
+      except AssemblerError as e:
+        print("Error: " + str(e))
+        sys.exit(1)
 
       if debug > 0:
         print(" ")
@@ -219,64 +434,16 @@ def simpleCPUv1a_as(argv):
           print( nameString )
         print(" ")
 		
-      # replace lables with addresses, write code to tmp_file
-	  
-      source_file.seek(0) 
-      instruction_address = address
-
-      while True:
-        line = source_file.readline() 
-        line = re.sub(r'#', '# ', line.lower()) 
-        line = re.sub(r'\s+', ' ', line)
-
-        if line == '': 
-          break
-		
-        if len(line) > 1 and line[0] == ' ':
-          line = line[1:]
-		  
-        if line[0] =='#' or line[0] ==' ':
-          continue
-
-        if ":" in line:
-          continue
-		    
-        if ".addr" in line:
-          instruction_address = convertData(line.split()[1]) 
-          continue
-
-        words = line.split(' ')	
-        outputString = str.format('{:03}', instruction_address) + " "
+      # write code to tmp_file
 
-        for i in range(0, len(words)):
-          if words[i] in label_dictionary:
-            key = words[i]
-            outputString = outputString + " " + str(label_dictionary[key])
-          else:
-            if words[i] != '':
-              outputString = outputString + " " + words[i]
-
-        outputString = outputString + "\n"
-        tmp_file.write( outputString )			
-        if byte_addressable:
-          instruction_address += 2
-        else:
-          instruction_address += 1 	
-  
-      source_file.close() 
+      try:
+        tmp_file = open(tmp_filename, "w")
+      except IOError: 
+        print("Error: Could not open output files")
+        sys.exit(1)
+      tmp_file.writelines(tmp_lines)
       tmp_file.close()  
 
-      # limit test #
-
-      if byte_addressable:
-        if instruction_address >  128:
-          print("Error: program bigger than memory limit: (" + str(instruction_address) + ")")
-          sys.exit(1)
-      else:
-        if instruction_address >  256:
-          print("Error: program bigger than memory limit: (" + str(instruction_address) + ")")
-          sys.exit(1)
-
     if mode == 1:
       print("Exit: first pass complete")
       sys.exit(0)
@@ -296,6 +463,12 @@ def simpleCPUv1a_as(argv):
         print("Error: could not output temp file")
         sys.exit(1)
 
+    try:
+      program = second_pass(tmp_file.readlines())
+    except AssemblerError as e:
+      print("Error: " + str(e))
+      sys.exit(1)
+
     instruction_count = 0
     byte_count = 0
 	
@@ -312,175 +485,57 @@ def simpleCPUv1a_as(argv):
       print("  ADDR   OP   RD/ADDR  RS/IMM                       |      MACHINE CODE       ")
       print("----------------------------------------------------|-------------------------")
 	  
-    while True:
-      line = tmp_file.readline()
-      line = re.sub(r'\s+', ' ', line)
-
-      if line == '':
-        break 
-
-      words = line.split(' ')
+    for instruction_address, instr, words in program:
 
-      instr = 0
-      imm   = False
-      abs   = False
-      dat   = False
-
-      #print words
-      if words[0].isdigit():
-
-        # match opcode #
-        if words[1] == "move":
-          imm = True
-          instr = instr | int('0000000000000000', 2)       
-        elif words[1] == "add":
-          imm = True
-          instr = int('0001000000000000', 2)
-        elif words[1] == "sub":
-          imm = True
-          instr = int('0010000000000000', 2)
-        elif words[1] == "and":
-          imm = True
-          instr = int('0011000000000000', 2)
-        elif words[1] == "load":
-          abs = True
-          instr = int('0100000000000000', 2)
-        elif words[1] == "store":
-          abs = True
-          if words[3] == '' or words[3] == '#':
-            instr = int('0101000000000000', 2)
-          else:
-            print(words[3])
-            if int(words[3]) < 16 and int(words[3]) >= 0:
-              instr = int('0101' + self_mod_opcodes[int(words[3])] + '000000000000', 2) 
-            else:
-              print("Error: invalid opcode") 
-              print(words) 
-              sys.exit(1)
-        elif words[1] == "addm":
-          abs = True
-          instr = int('0110000000000000', 2)
-        elif words[1] == "subm":
-          abs = True
-          instr = int('0111000000000000', 2)
-        elif words[1] == "jump":
-          abs = True 
-          instr = int('1000000000000000', 2)
-        elif words[1] == "jumpu":
-          abs = True
-          instr = int('1000000000000000', 2)
-        elif words[1] == "jumpz":
-          abs = True
-          instr = int('1001000000000000', 2)
-        elif words[1] == "jumpnz":
-          abs = True
-          instr = int('1010000000000000', 2)
-        elif words[1] == "jumpc":
-          abs = True
-          instr = int('1011000000000000', 2)
-        elif words[1] == ".data":
-          dat = True
-          instr = int('0000000000000000', 2)
+      if debug > 1:
+        instructionString = " " + str(words)
+        instructionStringLen = len( instructionString )
+        if instructionStringLen > 50:
+          instructionString = instructionString[0:50]
         else:
-          print("Error: invalid opcode") 
-          print(words) 
-          sys.exit(1)
-
-        length = 0 
-        for i in range(len(words)):
-          length = length + 1
-          if words[i] == "#":
-            break
-
-        if (length < 2):
-          print("Error: invalid operand (len<2)")
-          print(words) 
-          sys.exit(1)
-
-        else:
-          data = 0
-          if (length == 4) and imm:   
-            data = words[2].rstrip()     
-          elif (length == 4) and abs:
-            data = words[2].rstrip()
-          elif (length == 4) and dat:
-            data = words[2].rstrip()		
-          else:
-            print("Error: invalid operand (len)")
-            print(words)
-            print(length)
-            sys.exit(1)
+          for i in range(50 - instructionStringLen):
+            instructionString = instructionString + " "
+        instructionString = instructionString + "  |    " + str.format('{:016b}', instr)
+        print( instructionString )
+
+      if instruction_count == 0:
+        # write start address to file #
+        word_file.write(str.format('{:04X}', instruction_address) + ' ')
+        high_byte_file.write(str.format('{:04X}', instruction_address) + ' ')
+        low_byte_file.write(str.format('{:04X}', instruction_address) + ' ')
+
+      if byte_count == 16:
+        byte_count = 0
+        word_file.write("\n")
+        high_byte_file.write("\n")
+        low_byte_file.write("\n")
+
+        addressString = str.format('{:04X}', instruction_address) + ' '
+        word_file.write(addressString)
+        high_byte_file.write(addressString)
+        low_byte_file.write(addressString)
+
+      data_file.write(str.format('{:04}', instruction_address) + ' ')
+      bin_value = str.format('{:016b}', instr) 
+      data_file.write( bin_value )
+      data_file.write("\n")
+
+      # update EPROM files #
+      word_file.write(str.format('{:04X}', instr ) + ' ')
+      high_byte_file.write(str.format('{:02X}', (instr & 0xFF00) >> 8 ) + ' ')
+      low_byte_file.write(str.format('{:02X}', (instr & 0xFF) ) + ' ')
+
+      # update mem file
+      data_string = str.format('{:04X}', instr ) + ' '
+      mem_file.write('@' + str.format('{:04X}', (instruction_address * 2)) + ' ')
+      mem_file.write(data_string[3] + data_string[2] + data_string[1] + data_string[0] + "\n")
+      
+      #update mif file
+      mif_file.write(str.format('{:04X}', instruction_address) + " : ")
+      mif_file.write( str.format('{:016b}', instr) + ";\n"  )
 
-          operand = convertData(data) 
-			
-          if imm and (operand > 255):
-            print("Error: invalid immediate operand (>MAX)")
-            print(words) 
-            sys.exit(1)
-			
-          if abs and (operand > 255):
-            print("Error: invalid absolute operand (>MAX)")
-            print(words) 
-            sys.exit(1)
-			
-          if dat and (operand > 255):
-            print("Error: invalid data operand (>MAX)")
-            print(words) 
-            sys.exit(1)
-			
-          instr = instr | operand
-		  
-          if debug > 1:
-            instructionString = " " + str(words)
-            instructionStringLen = len( instructionString )
-            if instructionStringLen > 50:
-              instructionString = instructionString[0:50]
-            else:
-              for i in range(50 - instructionStringLen):
-                instructionString = instructionString + " "
-            instructionString = instructionString + "  |    " + str.format('{:016b}', instr)
-            print( instructionString )
-
-          instruction_address = int(words[0])
-		  
-          if instruction_count == 0:
-            # write start address to file #
-            word_file.write(str.format('{:04X}', instruction_address) + ' ')
-            high_byte_file.write(str.format('{:04X}', instruction_address) + ' ')
-            low_byte_file.write(str.format('{:04X}', instruction_address) + ' ')
-
-          if byte_count == 16:
-            byte_count = 0
-            word_file.write("\n")
-            high_byte_file.write("\n")
-            low_byte_file.write("\n")
-
-            addressString = str.format('{:04X}', instruction_address) + ' '
-            word_file.write(addressString)
-            high_byte_file.write(addressString)
-            low_byte_file.write(addressString)
-
-          data_file.write(str.format('{:04}', instruction_address) + ' ')
-          bin_value = str.format('{:016b}', instr) 
-          data_file.write( bin_value )
-          data_file.write("\n")
-
-          # update EPROM files #
-          word_file.write(str.format('{:04X}', instr ) + ' ')
-          high_byte_file.write(str.format('{:02X}', (instr & 0xFF00) >> 8 ) + ' ')
-          low_byte_file.write(str.format('{:02X}', (instr & 0xFF) ) + ' ')
-
-          # update mem file
-          data_string = str.format('{:04X}', instr ) + ' '
-          mem_file.write('@' + str.format('{:04X}', (instruction_address * 2)) + ' ')
-          mem_file.write(data_string[3] + data_string[2] + data_string[1] + data_string[0] + "\n")
-          
-          #update mif file
-          mif_file.write(str.format('{:04X}', instruction_address) + " : ")
-          mif_file.write( str.format('{:016b}', instr) + ";\n"  )
-
-          instruction_count += 1
-          byte_count += 1
+      instruction_count += 1
+      byte_count += 1
 
     mif_file.write( "END;\n" )
 